@@ -18,6 +18,7 @@ const ClientBooking = () => {
   const [selectedService, setSelectedService] = useState('')
   const [selectedDate, setSelectedDate] = useState('')
   const [availableTimes, setAvailableTimes] = useState([])
+  const [availabilityByDate, setAvailabilityByDate] = useState({})
   const [selectedTime, setSelectedTime] = useState('')
   
   const [formData, setFormData] = useState({
@@ -32,29 +33,33 @@ const ClientBooking = () => {
   const [bookingLoading, setBookingLoading] = useState(false)
   const [error, setError] = useState('')
   const [success, setSuccess] = useState(false)
+  const [waitlistWindow, setWaitlistWindow] = useState({ window_start: '08:00', window_end: '18:00' })
+  const [waitlistMessage, setWaitlistMessage] = useState('')
 
   useEffect(() => {
     fetchProfessionalData()
   }, [professionalId])
 
   useEffect(() => {
-    if (selectedService && selectedDate) {
+    if (selectedService) {
       fetchAvailability()
     }
-  }, [selectedService, selectedDate])
+  }, [selectedService])
+
+  useEffect(() => {
+    setAvailableTimes(availabilityByDate[selectedDate] || [])
+  }, [selectedDate, availabilityByDate])
 
   const fetchProfessionalData = async () => {
     try {
       // Buscar dados do profissional
-      const profResponse = await fetch(`http://localhost:5000/api/professionals/directory`)
-      const profData = await profResponse.json()
-      
-      const prof = profData.professionals.find(p => p.id === parseInt(professionalId))
-      if (!prof) {
+      const profResponse = await fetch(`http://localhost:5000/api/professionals/directory/${professionalId}`)
+      if (!profResponse.ok) {
         setError('Profissional não encontrado')
         return
       }
       
+      const { professional: prof } = await profResponse.json()
       setProfessional(prof)
       setServices(prof.services || [])
       
@@ -66,19 +71,21 @@ const ClientBooking = () => {
   }
 
   const fetchAvailability = async () => {
+    // Busca a disponibilidade dos próximos 30 dias em uma única requisição
+    const dates = getAvailableDates()
     try {
       const response = await fetch(
-        `http://localhost:5000/api/professionals/${professionalId}/availability?date=${selectedDate}&service_id=${selectedService}`
+        `http://localhost:5000/api/professionals/${professionalId}/availability/range?from=${dates[0]}&to=${dates[dates.length - 1]}&service_id=${selectedService}`
       )
       const data = await response.json()
       
       if (response.ok) {
-        setAvailableTimes(data.available_times)
+        setAvailabilityByDate(data.availability)
       } else {
-        setAvailableTimes([])
+        setAvailabilityByDate({})
       }
     } catch (error) {
-      setAvailableTimes([])
+      setAvailabilityByDate({})
     }
   }
 
@@ -123,6 +130,42 @@ const ClientBooking = () => {
     }
   }
 
+  const handleJoinWaitlist = async () => {
+    setError('')
+    setWaitlistMessage('')
+
+    if (!formData.client_name || !formData.client_phone) {
+      setError('Preencha seu nome e telefone para entrar na lista de espera')
+      return
+    }
+
+    try {
+      const response = await fetch('http://localhost:5000/api/waitlist', {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({
+          professional_id: parseInt(professionalId),
+          service_id: parseInt(selectedService),
+          desired_date: selectedDate,
+          ...waitlistWindow,
+          ...formData
+        })
+      })
+
+      const data = await response.json()
+
+      if (response.ok) {
+        setWaitlistMessage('Você entrou na lista de espera. Se um horário vagar, o agendamento será feito e você receberá a confirmação pelo WhatsApp.')
+      } else {
+        setError(data.error || 'Erro ao entrar na lista de espera')
+      }
+    } catch (error) {
+      setError('Erro de conexão. Tente novamente.')
+    }
+  }
+
   // Gerar próximos 30 dias
   const getAvailableDates = () => {
     const dates = []
@@ -294,9 +337,37 @@ const ClientBooking = () => {
               <div className="space-y-2">
                 <Label>Horário *</Label>
                 {availableTimes.length === 0 ? (
-                  <p className="text-sm text-gray-600">
-                    Nenhum horário disponível para esta data
-                  </p>
+                  <div className="space-y-3">
+                    <p className="text-sm text-gray-600">
+                      Nenhum horário disponível para esta data
+                    </p>
+                    <div className="grid grid-cols-2 gap-4">
+                      <div className="space-y-2">
+                        <Label htmlFor="window_start">Aceito a partir de</Label>
+                        <Input
+                          id="window_start"
+                          type="time"
+                          value={waitlistWindow.window_start}
+                          onChange={(e) => setWaitlistWindow({ ...waitlistWindow, window_start: e.target.value })}
+                        />
+                      </div>
+                      <div className="space-y-2">
+                        <Label htmlFor="window_end">Até</Label>
+                        <Input
+                          id="window_end"
+                          type="time"
+                          value={waitlistWindow.window_end}
+                          onChange={(e) => setWaitlistWindow({ ...waitlistWindow, window_end: e.target.value })}
+                        />
+                      </div>
+                    </div>
+                    <Button type="button" variant="outline" onClick={handleJoinWaitlist}>
+                      Entrar na lista de espera
+                    </Button>
+                    {waitlistMessage && (
+                      <p className="text-sm text-green-700">{waitlistMessage}</p>
+                    )}
+                  </div>
                 ) : (
                   <Select value={selectedTime} onValueChange={setSelectedTime}>
                     <SelectTrigger>
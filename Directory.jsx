@@ -6,41 +6,37 @@ import { Input } from '@/components/ui/input'
 import { Badge } from '@/components/ui/badge'
 import { Search, MapPin, Phone, Mail, Calendar, Star } from 'lucide-react'
 
+const PER_PAGE = 12
+
 const Directory = () => {
-  const [professionals, setProfessionals] = useState([])
   const [filteredProfessionals, setFilteredProfessionals] = useState([])
   const [searchTerm, setSearchTerm] = useState('')
+  const [page, setPage] = useState(1)
+  const [pages, setPages] = useState(1)
+  const [total, setTotal] = useState(0)
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState('')
 
   useEffect(() => {
-    fetchProfessionals()
-  }, [])
+    // Busca e paginação são feitas no servidor; espera o usuário parar de digitar
+    const timeout = setTimeout(() => fetchProfessionals(searchTerm, page), 300)
+    return () => clearTimeout(timeout)
+  }, [searchTerm, page])
 
-  useEffect(() => {
-    // Filtrar profissionais baseado no termo de busca
-    if (searchTerm.trim() === '') {
-      setFilteredProfessionals(professionals)
-    } else {
-      const filtered = professionals.filter(prof => 
-        prof.name.toLowerCase().includes(searchTerm.toLowerCase()) ||
-        prof.description.toLowerCase().includes(searchTerm.toLowerCase()) ||
-        prof.services.some(service => 
-          service.name.toLowerCase().includes(searchTerm.toLowerCase())
-        )
-      )
-      setFilteredProfessionals(filtered)
-    }
-  }, [searchTerm, professionals])
-
-  const fetchProfessionals = async () => {
+  const fetchProfessionals = async (term, pageNumber) => {
     try {
-      const response = await fetch('http://localhost:5000/api/professionals/directory')
+      const params = new URLSearchParams({ page: pageNumber, per_page: PER_PAGE })
+      if (term.trim() !== '') {
+        params.set('q', term.trim())
+      }
+      const response = await fetch(`http://localhost:5000/api/professionals/directory?${params}`)
       const data = await response.json()
 
       if (response.ok) {
-        setProfessionals(data.professionals)
         setFilteredProfessionals(data.professionals)
+        setPages(data.pages)
+        setTotal(data.total)
+        setError('')
       } else {
         setError('Erro ao carregar profissionais')
       }
@@ -51,6 +47,11 @@ const Directory = () => {
     }
   }
 
+  const handleSearchChange = (e) => {
+    setSearchTerm(e.target.value)
+    setPage(1)
+  }
+
   if (loading) {
     return (
       <div className="flex items-center justify-center min-h-[60vh]">
@@ -78,7 +79,7 @@ const Directory = () => {
           <Input
             placeholder="Buscar por nome, serviço..."
             value={searchTerm}
-            onChange={(e) => setSearchTerm(e.target.value)}
+            onChange={handleSearchChange}
             className="pl-10"
           />
         </div>
@@ -109,7 +110,7 @@ const Directory = () => {
           {searchTerm && (
             <Button 
               variant="outline" 
-              onClick={() => setSearchTerm('')}
+              onClick={() => { setSearchTerm(''); setPage(1) }}
             >
               Ver Todos
             </Button>
@@ -196,12 +197,25 @@ const Directory = () => {
         ))}
       </div>
 
+      {/* Pagination */}
+      {pages > 1 && (
+        <div className="flex items-center justify-center gap-4">
+          <Button variant="outline" disabled={page <= 1} onClick={() => setPage(page - 1)}>
+            Anterior
+          </Button>
+          <span className="text-sm text-gray-600">Página {page} de {pages}</span>
+          <Button variant="outline" disabled={page >= pages} onClick={() => setPage(page + 1)}>
+            Próxima
+          </Button>
+        </div>
+      )}
+
       {/* Results Count */}
       {filteredProfessionals.length > 0 && (
         <div className="text-center text-sm text-gray-600">
           {searchTerm 
-            ? `${filteredProfessionals.length} profissional(is) encontrado(s) para "${searchTerm}"`
-            : `${filteredProfessionals.length} profissional(is) disponível(is)`
+            ? `${total} profissional(is) encontrado(s) para "${searchTerm}"`
+            : `${total} profissional(is) disponível(is)`
           }
         </div>
       )}
@@ -2,9 +2,17 @@ from src.models.professional import db
 from datetime import datetime
 
 class Appointment(db.Model):
+    # Os campos com active_history=True carregam o valor anterior ao serem
+    # alterados, mesmo com o objeto expirado após um commit, para que os
+    # eventos de flush (agregado diário e disponibilidade) saibam de onde o
+    # agendamento saiu
     id = db.Column(db.Integer, primary_key=True)
-    professional_id = db.Column(db.Integer, db.ForeignKey('professional.id'), nullable=False)
-    service_id = db.Column(db.Integer, db.ForeignKey('service.id'), nullable=False)
+    professional_id = db.column_property(
+        db.Column(db.Integer, db.ForeignKey('professional.id'), nullable=False), active_history=True
+    )
+    service_id = db.column_property(
+        db.Column(db.Integer, db.ForeignKey('service.id'), nullable=False), active_history=True
+    )
     
     # Dados do cliente (sem necessidade de conta)
     client_name = db.Column(db.String(100), nullable=False)
@@ -13,9 +21,11 @@ class Appointment(db.Model):
     client_address = db.Column(db.String(255))  # Opcional, dependendo do serviço
     
     # Dados do agendamento
-    appointment_date = db.Column(db.Date, nullable=False)
-    appointment_time = db.Column(db.Time, nullable=False)
-    status = db.Column(db.String(20), default='agendado')  # agendado, confirmado, cancelado, concluido
+    appointment_date = db.column_property(db.Column(db.Date, nullable=False), active_history=True)
+    appointment_time = db.column_property(db.Column(db.Time, nullable=False), active_history=True)
+    status = db.column_property(  # agendado, confirmado, cancelado, concluido
+        db.Column(db.String(20), default='agendado'), active_history=True
+    )
     notes = db.Column(db.Text)  # Observações adicionais
     
     # Controle
@@ -26,6 +36,14 @@ class Appointment(db.Model):
     notification_sent = db.Column(db.Boolean, default=False)
     reminder_sent = db.Column(db.Boolean, default=False)
 
+    # Índices usados pelos relatórios, disponibilidade e lembretes
+    __table_args__ = (
+        db.Index('ix_appointment_professional_date_time', 'professional_id', 'appointment_date', 'appointment_time'),
+        db.Index('ix_appointment_professional_status_date', 'professional_id', 'status', 'appointment_date'),
+        db.Index('ix_appointment_service', 'service_id'),
+        db.Index('ix_appointment_date_reminder', 'appointment_date', 'reminder_sent'),
+    )
+
     def __repr__(self):
         return f'<Appointment {self.client_name} - {self.appointment_date} {self.appointment_time}>'
 
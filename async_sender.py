@@ -0,0 +1,155 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TokenBucket:
+    """
+    Limitador de taxa: `rate` envios por segundo com rajadas de até `burst`.
+
+    Compartilhado entre threads e lotes: cada envio reserva o próximo token
+    (o saldo pode ficar negativo) e espera até a hora dele, o que mantém a
+    ordem de chegada sem segurar o lock durante a espera.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self.tokens = self.burst
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """
+        Retira um token e retorna quantos segundos esperar antes de usá-lo
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def acquire(self):
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+
+    async def acquire_async(self):
+        delay = self.reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+
+def _percentile(values, percent):
+    if not values:
+        return None
+    index = max(0, min(len(values) - 1, int(round(percent / 100 * len(values))) - 1))
+    return values[index]
+
+
+class AsyncNotificationSender:
+    """
+    Envia lotes de notificações com asyncio.
+
+    No máximo `concurrency` envios ficam em andamento ao mesmo tempo e cada
+    gateway de destino tem seu próprio token bucket (`rate_limits`, em
+    mensagens por segundo; gateways sem limite configurado usam
+    `default_rate`, e `None` significa sem limite). Os buckets duram o
+    processo inteiro e valem também para os envios avulsos de `acquire`
+    (workers da fila), então lotes seguidos e envios simultâneos dividem a
+    mesma taxa. O envio em si é a chamada bloqueante do cliente HTTP com
+    pool, executada em threads.
+    """
+
+    def __init__(self, concurrency=10, default_rate=None, default_burst=None, rate_limits=None):
+        self.concurrency = concurrency
+        self.default_rate = default_rate
+        self.default_burst = default_burst
+        self.rate_limits = dict(rate_limits or {})
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """
+        Cria o sender a partir das variáveis NOTIFICATION_* do ambiente
+        """
+        rate = float(os.environ.get('NOTIFICATION_RATE_LIMIT', 0))
+        burst = int(os.environ.get('NOTIFICATION_RATE_BURST', 0))
+        return cls(
+            concurrency=int(os.environ.get('NOTIFICATION_CONCURRENCY', 10)),
+            default_rate=rate or None,
+            default_burst=burst or None
+        )
+
+    def bucket(self, gateway):
+        """
+        Token bucket do gateway (None quando não há limite)
+        """
+        with self._lock:
+            if gateway not in self._buckets:
+                rate = self.rate_limits.get(gateway, self.default_rate)
+                self._buckets[gateway] = TokenBucket(rate, self.default_burst) if rate else None
+            return self._buckets[gateway]
+
+    def acquire(self, gateway='default'):
+        """
+        Espera a vez de um envio avulso ao gateway (bloqueante)
+        """
+        bucket = self.bucket(gateway)
+        if bucket is not None:
+            bucket.acquire()
+
+    def send_batch(self, items, send, gateway=lambda item: 'default'):
+        """
+        Envia `items` com `send(item)` (bloqueante, levanta exceção em falha).
+
+        Retorna a lista de erros (None para os enviados), na ordem dos itens,
+        e as estatísticas do lote.
+        """
+        return asyncio.run(self.send_batch_async(items, send, gateway))
+
+    async def send_batch_async(self, items, send, gateway=lambda item: 'default'):
+        items = list(items)
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        latencies = []
+
+        async def send_one(executor, item):
+            bucket = self.bucket(gateway(item))
+            async with semaphore:
+                # O token é retirado já com a vaga garantida, para que envios
+                # represados pelo semáforo não saiam juntos acima da taxa
+                if bucket is not None:
+                    await bucket.acquire_async()
+                started = time.perf_counter()
+                try:
+                    await loop.run_in_executor(executor, send, item)
+                    return None
+                except Exception as e:
+                    return str(e) or e.__class__.__name__
+                finally:
+                    latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            errors = await asyncio.gather(*(send_one(executor, item) for item in items))
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        failed = sum(1 for error in errors if error is not None)
+        stats = {
+            'messages': len(items),
+            'sent': len(items) - failed,
+            'failed': failed,
+            'elapsed_seconds': round(elapsed, 3),
+            'throughput_per_second': round(len(items) / elapsed, 1) if elapsed > 0 else 0.0,
+            'latency_ms': {
+                name: round(_percentile(latencies, percent) * 1000, 2) if latencies else None
+                for name, percent in (('p50', 50), ('p95', 95), ('p99', 99), ('max', 100))
+            }
+        }
+        return errors, stats
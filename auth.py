@@ -0,0 +1,51 @@
+from flask import Blueprint, request, jsonify
+from src.models.professional import db
+from src.services.authentication import authenticate, require_auth, issue_token, token_max_age
+from src.services.password_hashing import PasswordHasherBusy
+
+auth_bp = Blueprint('auth', __name__)
+
+
+@auth_bp.route('/auth/token', methods=['POST'])
+def create_token():
+    """
+    Emite um token de acesso para a sessão atual ou para email e senha
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        if data.get('email') or data.get('password'):
+            professional = authenticate(data.get('email'), data.get('password') or '')
+            if not professional:
+                return jsonify({'error': 'Email ou senha inválidos'}), 401
+            # Confirma a senha regravada por authenticate(), se for o caso
+            db.session.commit()
+        else:
+            professional = require_auth()
+            if not professional:
+                return jsonify({'error': 'Não autenticado'}), 401
+
+        return jsonify({
+            'token': issue_token(professional),
+            'token_type': 'Bearer',
+            'expires_in': token_max_age()
+        })
+    except PasswordHasherBusy as e:
+        return jsonify({'error': str(e)}), 429, {'Retry-After': '1'}
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
+@auth_bp.route('/professionals/profile', methods=['GET'])
+def get_profile():
+    """
+    Perfil do profissional logado, a partir do cache de identidades
+    """
+    try:
+        professional = require_auth()
+        if not professional:
+            return jsonify({'error': 'Não autenticado'}), 401
+
+        return jsonify({'professional': professional.to_dict()})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
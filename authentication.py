@@ -0,0 +1,183 @@
+import hashlib
+import os
+import threading
+import time as clock
+from collections import OrderedDict
+from flask import current_app, g, request, session
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session, make_transient_to_detached
+from src.models.professional import db, Professional
+from src.services.password_hashing import password_hasher
+
+# Identifica os tokens de acesso entre as assinaturas feitas com a SECRET_KEY
+TOKEN_SALT = 'professional-auth-token'
+# Marca "requisição já resolvida, sem profissional" em g
+_ANONYMOUS = object()
+
+
+class IdentityCache:
+    """
+    Cache em memória (TTL + LRU) dos profissionais autenticados.
+
+    Guarda cópias desanexadas das linhas de `professional`; a cada
+    requisição a cópia é incorporada à sessão com `merge(load=False)`, sem
+    consulta ao banco. Gravações de profissionais neste processo invalidam a
+    entrada no commit; nos demais workers a entrada vale no máximo
+    `ttl_seconds`.
+    """
+
+    def __init__(self, ttl_seconds=60, max_entries=1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # id -> (cópia desanexada, carregada em)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            ttl_seconds=float(os.environ.get('AUTH_CACHE_TTL', 60)),
+            max_entries=int(os.environ.get('AUTH_CACHE_SIZE', 1024))
+        )
+
+    def get(self, professional_id):
+        """
+        Profissional na sessão atual, ou None se não existir
+        """
+        now = clock.monotonic()
+        with self._lock:
+            entry = self._entries.get(professional_id)
+            if entry is not None and now - entry[1] < self.ttl_seconds:
+                self._entries.move_to_end(professional_id)
+                detached = entry[0]
+            else:
+                detached = None
+        if detached is not None:
+            return db.session.merge(detached, load=False)
+
+        professional = db.session.get(Professional, professional_id)
+        if professional is None:
+            self.invalidate(professional_id)
+            return None
+        copy = self._detached_copy(professional)
+        with self._lock:
+            self._entries[professional_id] = (copy, now)
+            self._entries.move_to_end(professional_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return professional
+
+    @staticmethod
+    def _detached_copy(professional):
+        # Só as colunas: relacionamentos continuam carregados sob demanda
+        copy = Professional(**{
+            attribute.key: getattr(professional, attribute.key)
+            for attribute in inspect(Professional).column_attrs
+        })
+        make_transient_to_detached(copy)
+        return copy
+
+    def invalidate(self, professional_id=None):
+        with self._lock:
+            if professional_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(professional_id, None)
+
+
+def _token_serializer():
+    return URLSafeTimedSerializer(current_app.secret_key, salt=TOKEN_SALT)
+
+
+def token_max_age():
+    return int(os.environ.get('AUTH_TOKEN_MAX_AGE', 7 * 24 * 3600))
+
+
+def _password_fingerprint(professional):
+    # Trocar a senha invalida os tokens emitidos antes
+    return hashlib.sha256(professional.password_hash.encode('utf-8')).hexdigest()[:16]
+
+
+def issue_token(professional):
+    """
+    Token assinado (sem estado no servidor) para o cabeçalho
+    `Authorization: Bearer <token>`
+    """
+    return _token_serializer().dumps({'id': professional.id, 'pw': _password_fingerprint(professional)})
+
+
+def _professional_from_token(token):
+    try:
+        data = _token_serializer().loads(token, max_age=token_max_age())
+    except BadSignature:  # inclui token expirado
+        return None
+    professional = identity_cache.get(data.get('id'))
+    if professional is None or data.get('pw') != _password_fingerprint(professional):
+        return None
+    return professional
+
+
+def authenticate(email, password):
+    """
+    Profissional com o email e a senha informados, ou None.
+
+    Se os parâmetros do hash mudaram, a senha é regravada com os atuais;
+    a gravação fica pendente na sessão e é confirmada por quem chamou.
+    """
+    # Conexão própria e curta: volta ao pool antes de o hash ser conferido,
+    # sem confirmar nada que esteja pendente na sessão de quem chamou
+    with db.engine.connect() as connection:
+        row = connection.execute(
+            select(Professional.id, Professional.password_hash).where(Professional.email == email)
+        ).first()
+    if row is None or not password_hasher.verify(row.password_hash, password):
+        return None
+    professional = identity_cache.get(row.id)
+    if professional is not None:
+        professional.rehash_password(password)
+    return professional
+
+
+def _resolve():
+    authorization = request.headers.get('Authorization', '')
+    if authorization.startswith('Bearer '):
+        return _professional_from_token(authorization[len('Bearer '):].strip())
+    professional_id = session.get('professional_id')
+    if not professional_id:
+        return None
+    return identity_cache.get(professional_id)
+
+
+def require_auth():
+    """
+    Profissional autenticado (token Bearer ou sessão), ou None.
+
+    Resolvido uma vez por requisição e guardado em `g.professional`.
+    """
+    professional = g.get('professional', _ANONYMOUS)
+    if professional is _ANONYMOUS:
+        professional = _resolve()
+        g.professional = professional
+    return professional
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_professional_changes(session, flush_context):
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Professional) and obj.id is not None:
+            session.info.setdefault('auth_changed', set()).add(obj.id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_identities(session):
+    for professional_id in session.info.pop('auth_changed', ()):
+        identity_cache.invalidate(professional_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_professional_changes(session):
+    session.info.pop('auth_changed', None)
+
+
+# Instância global do cache de identidades
+identity_cache = IdentityCache.from_env()
@@ -0,0 +1,110 @@
+from flask import Blueprint, request, jsonify
+from src.models.service import Service
+from src.services.availability_engine import availability_engine
+from datetime import datetime
+
+availability_bp = Blueprint('availability', __name__)
+
+# Maior intervalo aceito pela consulta de disponibilidade por período
+MAX_RANGE_DAYS = 62
+# Maior quantidade de horários pedida em `next`
+MAX_NEXT_COUNT = 500
+
+def get_active_service(professional_id, service_id):
+    return Service.query.filter_by(
+        id=int(service_id),
+        professional_id=professional_id,
+        is_active=True
+    ).first()
+
+@availability_bp.route('/professionals/<int:professional_id>/availability', methods=['GET'])
+def get_availability(professional_id):
+    try:
+        date_str = request.args.get('date')
+        service_id = request.args.get('service_id')
+
+        if not date_str or not service_id:
+            return jsonify({'error': 'Parâmetros date e service_id são obrigatórios'}), 400
+
+        try:
+            target_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+        except ValueError:
+            return jsonify({'error': 'Formato de data inválido'}), 400
+
+        service = get_active_service(professional_id, service_id)
+        if not service:
+            return jsonify({'error': 'Serviço não encontrado'}), 404
+
+        available_times = availability_engine.available_times(
+            professional_id, target_date, service.duration_minutes
+        )
+
+        return jsonify({'available_times': available_times}), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@availability_bp.route('/professionals/<int:professional_id>/availability/range', methods=['GET'])
+def get_availability_range(professional_id):
+    try:
+        start_str = request.args.get('from')
+        end_str = request.args.get('to')
+        service_id = request.args.get('service_id')
+        next_count = request.args.get('next')
+
+        if not start_str or not end_str or not service_id:
+            return jsonify({'error': 'Parâmetros from, to e service_id são obrigatórios'}), 400
+
+        try:
+            start_date = datetime.strptime(start_str, '%Y-%m-%d').date()
+            end_date = datetime.strptime(end_str, '%Y-%m-%d').date()
+        except ValueError:
+            return jsonify({'error': 'Formato de data inválido'}), 400
+
+        if end_date < start_date:
+            return jsonify({'error': 'A data final deve ser posterior à data inicial'}), 400
+
+        if (end_date - start_date).days + 1 > MAX_RANGE_DAYS:
+            return jsonify({'error': f'O intervalo máximo é de {MAX_RANGE_DAYS} dias'}), 400
+
+        limit = None
+        if next_count is not None:
+            try:
+                limit = int(next_count)
+            except ValueError:
+                return jsonify({'error': 'Parâmetro next deve ser um número inteiro'}), 400
+            if not 1 <= limit <= MAX_NEXT_COUNT:
+                return jsonify({'error': f'next deve estar entre 1 e {MAX_NEXT_COUNT}'}), 400
+
+        service = get_active_service(professional_id, service_id)
+        if not service:
+            return jsonify({'error': 'Serviço não encontrado'}), 404
+
+        availability = availability_engine.available_times_range(
+            professional_id, start_date, end_date, service.duration_minutes
+        )
+
+        # Apenas os próximos N horários livres
+        if limit is not None:
+            next_available = []
+            for target_date, times in availability.items():
+                for available_time in times:
+                    if len(next_available) >= limit:
+                        break
+                    next_available.append({
+                        'date': target_date.isoformat(),
+                        'time': available_time
+                    })
+            return jsonify({'next_available': next_available}), 200
+
+        return jsonify({
+            'availability': {
+                target_date.isoformat(): times
+                for target_date, times in availability.items()
+            },
+            'from': start_date.isoformat(),
+            'to': end_date.isoformat()
+        }), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,391 @@
+import threading
+import time as clock
+from collections import OrderedDict
+from datetime import timedelta
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from src.models.professional import db
+from src.models.appointment import Appointment
+from src.models.service import Service
+from src.models.schedule import Schedule
+from src.models.recurrence_rule import RecurrenceRule
+from src.services.recurrence_expansion import occurrences, series_stamp
+
+MINUTES_PER_DAY = 24 * 60
+CANCELLED_STATUS = 'cancelado'
+
+
+def _to_minute(value):
+    return value.hour * 60 + value.minute
+
+
+def _range_mask(start, end):
+    """
+    Máscara de bits com os minutos [start, end) ligados
+    """
+    start = max(start, 0)
+    end = min(end, MINUTES_PER_DAY)
+    if end <= start:
+        return 0
+    return ((1 << (end - start)) - 1) << start
+
+
+def _format_minute(minute):
+    return f"{minute // 60:02d}:{minute % 60:02d}"
+
+
+class DayOccupancy:
+    """
+    Ocupação de um dia de um profissional em resolução de minuto.
+
+    `capacity` e `occupied` guardam, por minuto, o limite de agendamentos
+    (0 fora do expediente e nos intervalos) e quantos agendamentos ocupam
+    aquele minuto. `free` é um bitmap (inteiro) em que o bit m está ligado
+    quando o minuto m ainda aceita agendamentos.
+    """
+
+    def __init__(self, schedules, step_minutes):
+        self.capacity = bytearray(MINUTES_PER_DAY)
+        self.occupied = bytearray(MINUTES_PER_DAY)
+        self.free = 0
+        self.grid = 0  # Horários de início oferecidos aos clientes
+        self.appointments = {}  # appointment_id -> (minuto inicial, duração)
+        self.stamp = (0, None)
+        self.series_stamp = None
+        self.built_at = clock.monotonic()
+
+        for schedule in schedules:
+            start = _to_minute(schedule.start_time)
+            end = _to_minute(schedule.end_time)
+            limit = max(min(schedule.max_appointments_per_slot or 1, 255), 1)
+            self._open(start, end, limit)
+            if schedule.break_start and schedule.break_end:
+                self._close(_to_minute(schedule.break_start), _to_minute(schedule.break_end))
+            for minute in range(start, end, step_minutes):
+                self.grid |= 1 << minute
+
+    def _open(self, start, end, limit):
+        for minute in range(max(start, 0), min(end, MINUTES_PER_DAY)):
+            self.capacity[minute] = max(self.capacity[minute], limit)
+        self.free |= _range_mask(start, end)
+
+    def _close(self, start, end):
+        for minute in range(max(start, 0), min(end, MINUTES_PER_DAY)):
+            self.capacity[minute] = 0
+        self.free &= ~_range_mask(start, end)
+
+    def add(self, appointment_id, start, duration):
+        """
+        Ocupa os minutos de um agendamento
+        """
+        if appointment_id in self.appointments:
+            return
+        self.appointments[appointment_id] = (start, duration)
+        for minute in range(start, min(start + duration, MINUTES_PER_DAY)):
+            self.occupied[minute] = min(self.occupied[minute] + 1, 255)
+            if self.occupied[minute] >= self.capacity[minute]:
+                self.free &= ~(1 << minute)
+
+    def remove(self, appointment_id):
+        """
+        Libera os minutos de um agendamento
+        """
+        slot = self.appointments.pop(appointment_id, None)
+        if slot is None:
+            return
+        start, duration = slot
+        for minute in range(start, min(start + duration, MINUTES_PER_DAY)):
+            if self.occupied[minute]:
+                self.occupied[minute] -= 1
+            if self.occupied[minute] < self.capacity[minute]:
+                self.free |= 1 << minute
+
+    def within_hours(self, start, duration):
+        """
+        Indica se [start, start + duration) cabe inteiro no expediente do
+        dia, sem invadir os intervalos (a ocupação não é considerada)
+        """
+        end = start + max(int(duration or 1), 1)
+        return end <= MINUTES_PER_DAY and all(self.capacity[minute] for minute in range(start, end))
+
+    def free_starts(self, duration):
+        """
+        Minutos de início em que cabe um serviço de `duration` minutos.
+
+        A busca é feita sobre o bitmap inteiro de uma vez: após os
+        deslocamentos, o bit t só fica ligado se os minutos t..t+duration-1
+        estiverem todos livres.
+        """
+        duration = max(int(duration or 1), 1)
+        runs = self.free
+        span = 1
+        while span < duration and runs:
+            shift = min(span, duration - span)
+            runs &= runs >> shift
+            span += shift
+
+        candidates = runs & self.grid
+        starts = []
+        while candidates:
+            lowest = candidates & -candidates
+            starts.append(lowest.bit_length() - 1)
+            candidates ^= lowest
+        return starts
+
+
+class AvailabilityEngine:
+    """
+    Cache de disponibilidade por profissional e dia.
+
+    Cada dia é montado uma vez a partir de `Schedule`, `Appointment` e das
+    ocorrências geradas das séries recorrentes, e depois atualizado
+    incrementalmente pelos eventos de sessão quando um agendamento é
+    criado, cancelado ou remarcado neste processo. Alterações feitas por
+    outros processos são detectadas pelo carimbo (quantidade, maior
+    updated_at) dos agendamentos do dia e pelo carimbo das séries do
+    profissional.
+    """
+
+    def __init__(self, max_days=4096, step_minutes=30, schedule_ttl_seconds=300):
+        self.max_days = max_days
+        self.step_minutes = step_minutes
+        self.schedule_ttl_seconds = schedule_ttl_seconds
+        self._days = OrderedDict()
+        self._service_durations = {}
+        self._lock = threading.Lock()
+
+    def available_times(self, professional_id, target_date, duration_minutes):
+        """
+        Lista os horários livres (HH:MM) para um serviço de N minutos
+        """
+        day = self.get_day(professional_id, target_date)
+        return [_format_minute(minute) for minute in day.free_starts(duration_minutes)]
+
+    def available_times_range(self, professional_id, start_date, end_date, duration_minutes):
+        """
+        Horários livres de cada dia do intervalo [start_date, end_date]
+        """
+        days = self.get_days(professional_id, start_date, end_date)
+        return {
+            target_date: [_format_minute(minute) for minute in day.free_starts(duration_minutes)]
+            for target_date, day in days.items()
+        }
+
+    def get_day(self, professional_id, target_date):
+        """
+        Retorna a ocupação do dia, reconstruindo-a se estiver desatualizada
+        """
+        return self.get_days(professional_id, target_date, target_date)[target_date]
+
+    def get_days(self, professional_id, start_date, end_date):
+        """
+        Retorna a ocupação de cada dia do intervalo, em ordem cronológica.
+
+        Os carimbos do intervalo inteiro são conferidos em uma única consulta
+        e os dias ausentes ou desatualizados são montados juntos, com uma
+        consulta de horários e uma de agendamentos.
+        """
+        dates = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+        stamps = self._current_stamps(professional_id, start_date, end_date)
+        series = series_stamp(db.session, professional_id)
+        now = clock.monotonic()
+
+        days = {}
+        stale = []
+        with self._lock:
+            for target_date in dates:
+                day = self._days.get((professional_id, target_date))
+                if (day is not None
+                        and now - day.built_at < self.schedule_ttl_seconds
+                        and day.stamp == stamps.get(target_date, (0, None))
+                        and day.series_stamp == series):
+                    self._days.move_to_end((professional_id, target_date))
+                    days[target_date] = day
+                else:
+                    stale.append(target_date)
+
+        if stale:
+            built = self._build_days(professional_id, stale, series)
+            with self._lock:
+                for target_date, day in built.items():
+                    self._days[(professional_id, target_date)] = day
+                    self._days.move_to_end((professional_id, target_date))
+                while len(self._days) > self.max_days:
+                    self._days.popitem(last=False)
+            days.update(built)
+
+        return {target_date: days[target_date] for target_date in dates}
+
+    def invalidate(self, professional_id=None, target_date=None):
+        """
+        Descarta dias em cache (todos, de um profissional ou um dia específico)
+        """
+        with self._lock:
+            if professional_id is None:
+                self._days.clear()
+                self._service_durations.clear()
+                return
+            for key in list(self._days):
+                if key[0] == professional_id and (target_date is None or key[1] == target_date):
+                    del self._days[key]
+
+    def _current_stamps(self, professional_id, start_date, end_date):
+        rows = db.session.query(
+            Appointment.appointment_date,
+            db.func.count(Appointment.id),
+            db.func.max(Appointment.updated_at)
+        ).filter(
+            Appointment.professional_id == professional_id,
+            Appointment.appointment_date >= start_date,
+            Appointment.appointment_date <= end_date
+        ).group_by(Appointment.appointment_date).all()
+        return {target_date: (count, last_update) for target_date, count, last_update in rows}
+
+    def _build_days(self, professional_id, dates, series=None):
+        schedules_by_weekday = {}
+        for schedule in Schedule.query.filter_by(professional_id=professional_id, is_active=True).all():
+            schedules_by_weekday.setdefault(schedule.day_of_week, []).append(schedule)
+
+        days = {
+            target_date: DayOccupancy(schedules_by_weekday.get(target_date.weekday(), []), self.step_minutes)
+            for target_date in dates
+        }
+
+        rows = db.session.query(
+            Appointment.id,
+            Appointment.appointment_date,
+            Appointment.appointment_time,
+            Appointment.status,
+            Appointment.updated_at,
+            Appointment.service_id,
+            Service.duration_minutes
+        ).join(
+            Service, Service.id == Appointment.service_id
+        ).filter(
+            Appointment.professional_id == professional_id,
+            Appointment.appointment_date >= min(dates),
+            Appointment.appointment_date <= max(dates)
+        ).all()
+
+        counts = {}
+        last_updates = {}
+        for appointment_id, target_date, appointment_time, status, updated_at, service_id, duration in rows:
+            day = days.get(target_date)
+            if day is None:
+                continue
+            self._service_durations[service_id] = duration
+            counts[target_date] = counts.get(target_date, 0) + 1
+            if updated_at and (last_updates.get(target_date) is None or updated_at > last_updates[target_date]):
+                last_updates[target_date] = updated_at
+            if status != CANCELLED_STATUS:
+                day.add(appointment_id, _to_minute(appointment_time), duration)
+
+        # Ocorrências geradas ocupam a agenda como os agendamentos gravados
+        for row, target_date in occurrences(
+            db.session, min(dates), max(dates),
+            (Appointment.appointment_time, Service.duration_minutes), professional_id
+        ):
+            day = days.get(target_date)
+            if day is not None:
+                day.add(('serie', row.rule_id), _to_minute(row.appointment_time), row.duration_minutes)
+
+        for target_date, day in days.items():
+            day.stamp = (counts.get(target_date, 0), last_updates.get(target_date))
+            day.series_stamp = series
+        return days
+
+    def apply_changes(self, changes):
+        """
+        Aplica no cache as alterações de agendamentos já confirmadas no banco.
+
+        Cada alteração é (appointment_id, antes, depois, updated_at), onde
+        antes/depois são (professional_id, data, horário, service_id, status)
+        ou None para inserção/remoção.
+        """
+        with self._lock:
+            for appointment_id, before, after, updated_at in changes:
+                if before is not None:
+                    day = self._days.get((before[0], before[1]))
+                    if day is not None:
+                        day.remove(appointment_id)
+                        count, last_update = day.stamp
+                        if after is None or (after[0], after[1]) != (before[0], before[1]):
+                            count -= 1
+                        day.stamp = (count, last_update)
+
+                if after is not None:
+                    key = (after[0], after[1])
+                    day = self._days.get(key)
+                    if day is None:
+                        continue
+                    duration = self._service_durations.get(after[3])
+                    if duration is None:
+                        del self._days[key]
+                        continue
+                    if after[4] != CANCELLED_STATUS:
+                        day.add(appointment_id, _to_minute(after[2]), duration)
+                    count, last_update = day.stamp
+                    if before is None or (before[0], before[1]) != key:
+                        count += 1
+                    if updated_at and (last_update is None or updated_at > last_update):
+                        last_update = updated_at
+                    day.stamp = (count, last_update)
+
+
+# Instância global do motor de disponibilidade
+availability_engine = AvailabilityEngine()
+
+
+def _appointment_state(appointment, before_flush):
+    """
+    Estado relevante para a disponibilidade (antes ou depois do flush)
+    """
+    state = inspect(appointment)
+    values = []
+    for name in ('professional_id', 'appointment_date', 'appointment_time', 'service_id', 'status'):
+        history = state.attrs[name].history
+        if before_flush and (history.deleted or history.unchanged):
+            values.append((history.deleted or history.unchanged)[0])
+        else:
+            values.append(getattr(appointment, name))
+    return tuple(values)
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_availability_changes(session, flush_context):
+    changes = session.info.setdefault('availability_changes', [])
+    for obj in session.new:
+        if isinstance(obj, Appointment):
+            changes.append((obj.id, None, _appointment_state(obj, False), obj.updated_at))
+    for obj in session.dirty:
+        if isinstance(obj, Appointment) and session.is_modified(obj):
+            changes.append((obj.id, _appointment_state(obj, True), _appointment_state(obj, False), obj.updated_at))
+    for obj in session.deleted:
+        if isinstance(obj, Appointment):
+            changes.append((obj.id, _appointment_state(obj, True), None, None))
+
+    invalidated = session.info.setdefault('availability_invalidated', set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, (Schedule, RecurrenceRule)):
+            invalidated.add(obj.professional_id)
+        elif isinstance(obj, Service) and inspect(obj).attrs.duration_minutes.history.has_changes():
+            invalidated.add(None)
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_availability_changes(session):
+    changes = session.info.pop('availability_changes', None)
+    invalidated = session.info.pop('availability_invalidated', None)
+    if invalidated:
+        if None in invalidated:
+            availability_engine.invalidate()
+        for professional_id in invalidated - {None}:
+            availability_engine.invalidate(professional_id)
+    if changes:
+        availability_engine.apply_changes(changes)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_availability_changes(session):
+    session.info.pop('availability_changes', None)
+    session.info.pop('availability_invalidated', None)
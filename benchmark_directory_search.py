@@ -0,0 +1,125 @@
+"""
+Mede a montagem e as consultas do índice de busca do diretório
+(src/services/directory_search.py) com dados sintéticos.
+
+Uso:
+    python benchmark_directory_search.py --services 100000
+    python benchmark_directory_search.py --services 100000 --max-p99-ms 5
+
+Os profissionais são gerados em memória no formato da resposta do
+diretório, com nomes e serviços acentuados. As consultas cobrem palavras
+inteiras, prefixos (busca durante a digitação), termos sem acento e
+combinações de termos. Com --max-p99-ms, o script termina com código 1 se
+o p99 de algum tipo de consulta passar do limite.
+"""
+import argparse
+import random
+import sys
+import time
+
+FIRST_NAMES = ['João', 'Maria', 'José', 'Ana', 'Antônio', 'Francisca', 'Luís', 'Márcia', 'Cláudio', 'Lúcia',
+               'Sebastião', 'Conceição', 'Andréia', 'Fábio', 'Patrícia', 'Vinícius', 'Débora', 'Mônica']
+LAST_NAMES = ['Silva', 'Santos', 'Oliveira', 'Souza', 'Araújo', 'Gonçalves', 'Simões', 'Fróes', 'Brandão',
+              'Assunção', 'Guimarães', 'Magalhães', 'Conceição', 'Estêvão', 'Nóbrega']
+PROFESSIONS = ['Cabeleireira', 'Barbeiro', 'Manicure', 'Esteticista', 'Massoterapeuta', 'Fisioterapeuta',
+               'Nutricionista', 'Psicóloga', 'Dentista', 'Personal trainer', 'Maquiadora', 'Podóloga']
+SERVICES = ['Corte de cabelo', 'Escova progressiva', 'Coloração', 'Manicure e pedicure', 'Depilação',
+            'Massagem relaxante', 'Drenagem linfática', 'Limpeza de pele', 'Sessão de fisioterapia',
+            'Consulta nutricional', 'Avaliação física', 'Design de sobrancelhas', 'Maquiagem para noivas',
+            'Barba e bigode', 'Hidratação capilar', 'Clareamento dental', 'Acupuntura', 'Pilates']
+ADJECTIVES = ['rápido', 'completo', 'especial', 'premium', 'infantil', 'masculino', 'feminino', 'terapêutico']
+CITIES = ['São Paulo', 'Belém', 'Goiânia', 'Maceió', 'Florianópolis', 'Ribeirão Preto', 'Vitória', 'Niterói']
+
+QUERIES = {
+    'palavra': ['manicure', 'massagem', 'fisioterapia', 'silva', 'goiania'],
+    'prefixo': ['ma', 'dre', 'hidr', 'fisio', 'guim', 'acup'],
+    'sem acento': ['depilacao', 'coloracao', 'joao', 'sao paulo', 'terapeutico'],
+    'vários termos': ['corte cabelo infantil', 'massagem relaxante belem', 'maria limpeza pele', 'barba prem'],
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--services', type=int, default=100_000, help='Quantidade total de serviços')
+    parser.add_argument('--services-per-professional', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=200, help='Execuções de cada consulta')
+    parser.add_argument('--limit', type=int, default=20, help='Resultados por consulta (como a página do diretório)')
+    parser.add_argument('--max-p99-ms', type=float, help='Falha se o p99 de algum tipo de consulta passar disto')
+    parser.add_argument('--seed', type=int, default=42)
+    return parser.parse_args()
+
+
+def generate(args):
+    rng = random.Random(args.seed)
+    professionals = []
+    service_id = 0
+    for professional_id in range(1, args.services // args.services_per_professional + 1):
+        services = []
+        for _ in range(args.services_per_professional):
+            service_id += 1
+            services.append({
+                'id': service_id,
+                'name': f"{rng.choice(SERVICES)} {rng.choice(ADJECTIVES)}",
+                'description': f"{rng.choice(SERVICES)} com atendimento {rng.choice(ADJECTIVES)}"
+            })
+        professionals.append({
+            'id': professional_id,
+            'name': f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {rng.choice(LAST_NAMES)}",
+            'description': f"{rng.choice(PROFESSIONS)} com {rng.randint(1, 30)} anos de experiência",
+            'address': f"Rua {rng.choice(LAST_NAMES)}, {rng.randint(1, 2000)} - {rng.choice(CITIES)}",
+            'services': services
+        })
+    return professionals
+
+
+def percentile(values, fraction):
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+def main():
+    args = parse_args()
+    from src.services.directory_search import SearchIndex
+
+    professionals = generate(args)
+    started = time.perf_counter()
+    index = SearchIndex(professionals)
+    build_seconds = time.perf_counter() - started
+    print(f"{len(professionals)} profissionais, {args.services} serviços, {len(index.vocabulary)} palavras: "
+          f"índice montado em {build_seconds:.2f}s\n")
+
+    # A primeira busca de cada palavra ordena a lista dela por peso (uma vez por índice)
+    started = time.perf_counter()
+    first = []
+    for queries in QUERIES.values():
+        for query in queries:
+            query_started = time.perf_counter()
+            index.search(query, limit=args.limit)
+            first.append((time.perf_counter() - query_started) * 1000)
+    print(f"primeira execução de cada consulta: máx. {max(first):.2f} ms, "
+          f"total {(time.perf_counter() - started) * 1000:.0f} ms\n")
+
+    print(f"{'consulta':<16}{'resultados':>12}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    failures = 0
+    for kind, queries in QUERIES.items():
+        latencies = []
+        results = 0
+        for _ in range(args.repeat):
+            for query in queries:
+                started = time.perf_counter()
+                found = index.search(query, limit=args.limit)
+                latencies.append((time.perf_counter() - started) * 1000)
+                results += len(found)
+        latencies.sort()
+        p99 = percentile(latencies, 0.99)
+        print(f"{kind:<16}{results / (args.repeat * len(queries)):>12.1f}"
+              f"{percentile(latencies, 0.5):>9.2f}{percentile(latencies, 0.95):>9.2f}{p99:>9.2f}")
+        if args.max_p99_ms is not None and p99 > args.max_p99_ms:
+            failures += 1
+
+    if failures:
+        print(f"\nFALHA: {failures} tipo(s) de consulta acima de {args.max_p99_ms} ms no p99")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""
+Mede logins por segundo conforme o tamanho do pool de hashes de senha
+(src/services/password_hashing.py).
+
+Uso:
+    python benchmark_password_hashing.py
+    python benchmark_password_hashing.py --pools 0,1,2,4 --concurrency 16 --seconds 5
+
+Cada tamanho de pool roda num processo separado (PASSWORD_HASH_WORKERS),
+com `--concurrency` threads fazendo login em POST /api/auth/token e, ao
+mesmo tempo, uma thread consultando o diretório público para medir quanto
+as demais requisições esperam durante a rajada. Pool 0 calcula o hash na
+própria thread da requisição, como antes. Logins recusados com 429 (fila
+cheia) são contados à parte.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pools', default='0,1,2,4', help='Tamanhos de pool, separados por vírgula')
+    parser.add_argument('--concurrency', type=int, default=16, help='Logins simultâneos')
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--queue', type=int, default=16, help='PASSWORD_HASH_QUEUE')
+    parser.add_argument('--method', default='scrypt', help='PASSWORD_HASH_METHOD')
+    parser.add_argument('--child', type=int, help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+def run_child(args):
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'senhas.db')}"
+    os.environ['NOTIFICATION_WORKERS'] = '0'
+    os.environ['PASSWORD_HASH_WORKERS'] = str(args.child)
+    os.environ['PASSWORD_HASH_QUEUE'] = str(args.queue)
+    os.environ['PASSWORD_HASH_METHOD'] = args.method
+
+    from src.main import app, db
+    from src.models.professional import Professional
+    from src.services.password_hashing import password_hasher
+
+    with app.app_context():
+        professional = Professional(name='Benchmark', email='benchmark@example.com', phone='0', is_public=True)
+        professional.set_password('senha-do-benchmark')
+        db.session.add(professional)
+        db.session.commit()
+        # Aquece o pool e o prefixo de rehash antes de medir
+        professional.check_password('senha-do-benchmark')
+
+    credentials = {'email': 'benchmark@example.com', 'password': 'senha-do-benchmark'}
+    deadline = time.perf_counter() + args.seconds
+    lock = threading.Lock()
+    logins, rejected, errors, other = [], [0], [0], []
+
+    def login():
+        client = app.test_client()
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            status = client.post('/api/auth/token', json=credentials).status_code
+            elapsed = (time.perf_counter() - started) * 1000
+            with lock:
+                if status == 200:
+                    logins.append(elapsed)
+                elif status == 429:
+                    rejected[0] += 1
+                    time.sleep(0.01)
+                else:
+                    errors[0] += 1
+
+    def browse():
+        client = app.test_client()
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            client.get('/api/professionals/directory')
+            other.append((time.perf_counter() - started) * 1000)
+            time.sleep(0.02)
+
+    threads = [threading.Thread(target=login) for _ in range(args.concurrency)]
+    threads.append(threading.Thread(target=browse))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    password_hasher.shutdown()
+
+    print(json.dumps({
+        'pool': args.child,
+        'logins_per_second': len(logins) / args.seconds,
+        'rejected': rejected[0],
+        'errors': errors[0],
+        'login_p50_ms': percentile(logins, 0.5),
+        'login_p99_ms': percentile(logins, 0.99),
+        'other_p50_ms': percentile(other, 0.5),
+        'other_p99_ms': percentile(other, 0.99),
+    }))
+
+
+def main():
+    args = parse_args()
+    if args.child is not None:
+        run_child(args)
+        return
+
+    print(f"{os.cpu_count()} CPUs, {args.concurrency} logins simultâneos, método {args.method}\n")
+    print(f"{'pool':>5}{'logins/s':>10}{'429':>7}{'erros':>7}{'login p50':>11}{'login p99':>11}"
+          f"{'outras p50':>12}{'outras p99':>12}")
+    failures = 0
+    for pool in [int(value) for value in args.pools.split(',')]:
+        command = [sys.executable, os.path.abspath(__file__), '--child', str(pool),
+                   '--concurrency', str(args.concurrency), '--seconds', str(args.seconds),
+                   '--queue', str(args.queue), '--method', args.method]
+        output = subprocess.run(command, capture_output=True, text=True)
+        if output.returncode != 0:
+            print(f"{pool:>5}  FALHA:\n{output.stderr}")
+            failures += 1
+            continue
+        result = json.loads(output.stdout.strip().splitlines()[-1])
+        failures += result['errors'] > 0
+        print(f"{pool:>5}{result['logins_per_second']:>10.1f}{result['rejected']:>7}{result['errors']:>7}"
+              f"{result['login_p50_ms']:>11.0f}{result['login_p99_ms']:>11.0f}"
+              f"{result['other_p50_ms']:>12.1f}{result['other_p99_ms']:>12.1f}")
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
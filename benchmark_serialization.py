@@ -0,0 +1,93 @@
+"""
+Compara a serialização de listas por objetos do ORM + to_dict() com a
+serialização direta de colunas (src/services/serialization.py).
+
+Uso:
+    python benchmark_serialization.py --rows 50000
+    python benchmark_serialization.py --rows 50000 --repeat 5
+
+Para cada modelo, mede consulta + conversão em dicts + JSON: objetos
+completos com `to_dict()` e `json` padrão contra colunas com os
+serializadores e o provedor JSON da aplicação (orjson, se instalado).
+O script termina com código 1 se as duas formas produzirem dados
+diferentes.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=50_000, help='Quantidade de agendamentos')
+    parser.add_argument('--professionals', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=3, help='Rodadas (vale a mais rápida)')
+    parser.add_argument('--seed', type=int, default=42)
+    return parser.parse_args()
+
+
+def best_of(repeat, function):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    args = parse_args()
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'serializacao.db')}"
+    os.environ['NOTIFICATION_WORKERS'] = '0'
+
+    from sqlalchemy import select
+    from check_query_plans import seed
+    from src.main import app, db
+    from src.models.professional import Professional
+    from src.models.service import Service
+    from src.models.schedule import Schedule
+    from src.models.appointment import Appointment
+    from src.services.serialization import (
+        orjson, appointment_serializer, professional_serializer, schedule_serializer, service_serializer
+    )
+
+    cases = [
+        ('Appointment', Appointment, appointment_serializer),
+        ('Service', Service, service_serializer),
+        ('Schedule', Schedule, schedule_serializer),
+        ('Professional', Professional, professional_serializer),
+    ]
+    failures = 0
+    with app.app_context():
+        seed(db, args)
+        print(f"\nJSON rápido: {'orjson' if orjson else 'indisponível (json padrão)'}\n")
+        print(f"{'modelo':<14}{'linhas':>9}{'to_dict ms':>12}{'colunas ms':>12}{'ganho':>8}")
+        for label, model, serializer in cases:
+            def with_objects():
+                db.session.expunge_all()
+                items = [item.to_dict() for item in model.query.order_by(model.id).all()]
+                return items, json.dumps(items, sort_keys=True)
+
+            def with_columns():
+                rows = db.session.execute(select(*serializer.columns).order_by(model.id))
+                items = serializer.serialize_all(rows)
+                return items, app.json.dumps(items)
+
+            objects_seconds, (expected, _) = best_of(args.repeat, with_objects)
+            columns_seconds, (produced, _) = best_of(args.repeat, with_columns)
+            if produced != expected:
+                print(f"FALHA: {label} difere de to_dict()")
+                failures += 1
+            print(f"{label:<14}{len(expected):>9}{objects_seconds * 1000:>12.1f}"
+                  f"{columns_seconds * 1000:>12.1f}{objects_seconds / columns_seconds:>7.1f}x")
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""
+Mede agendamentos e relatórios por segundo com vários processos
+escrevendo e lendo o mesmo arquivo SQLite, com e sem o perfil de
+conexão de src/database.py (WAL, busy_timeout, synchronous=NORMAL...).
+
+Uso:
+    python benchmark_sqlite.py --workers 4 --seconds 10
+    python benchmark_sqlite.py --rows 200000 --write-ratio 0.5
+
+Cada processo imita um worker do gunicorn: importa a aplicação, abre suas
+próprias conexões e alterna entre gravar um agendamento (com os eventos
+do ORM que mantêm o agregado de relatórios e a disponibilidade) e
+consultar o dashboard e o relatório de receita pelo cliente de testes.
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+from datetime import date, time as day_time, timedelta
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=4, help='Processos simultâneos')
+    parser.add_argument('--seconds', type=float, default=10, help='Duração de cada rodada')
+    parser.add_argument('--rows', type=int, default=50_000, help='Agendamentos iniciais')
+    parser.add_argument('--professionals', type=int, default=50)
+    parser.add_argument('--write-ratio', type=float, default=0.3, help='Fração das operações que são agendamentos')
+    parser.add_argument('--seed', type=int, default=42)
+    return parser.parse_args()
+
+
+def worker(number, database, tuned, args, deadline, results):
+    os.environ['DATABASE_URL'] = f'sqlite:///{database}'
+    os.environ['SQLITE_TUNING'] = '1' if tuned else '0'
+    os.environ['NOTIFICATION_WORKERS'] = '0'
+
+    from src.main import app, db
+    from src.models.appointment import Appointment
+    from src.services.slot_reservation import SlotUnavailable
+
+    rng = random.Random(args.seed + number)
+    stats = {'bookings': 0, 'full': 0, 'reports': 0, 'errors': 0, 'locked': 0, 'latencies': []}
+    client = app.test_client()
+
+    with app.app_context():
+        while time.time() < deadline:
+            professional_id = rng.randint(1, args.professionals)
+            started = time.perf_counter()
+            try:
+                if rng.random() < args.write_ratio:
+                    db.session.add(Appointment(
+                        professional_id=professional_id,
+                        # Os 5 serviços de cada profissional têm ids consecutivos
+                        service_id=(professional_id - 1) * 5 + rng.randint(1, 5),
+                        client_name='Cliente', client_phone='11988888888',
+                        appointment_date=date.today() + timedelta(days=rng.randint(0, 60)),
+                        appointment_time=day_time(rng.randint(8, 17), rng.choice([0, 30])),
+                        status='agendado'
+                    ))
+                    db.session.commit()
+                    stats['bookings'] += 1
+                else:
+                    with client.session_transaction() as session:
+                        session['professional_id'] = professional_id
+                    for url in ('/api/reports/dashboard', '/api/reports/revenue?period=month'):
+                        response = client.get(url)
+                        if response.status_code != 200:
+                            raise RuntimeError(response.get_json().get('error', ''))
+                    stats['reports'] += 1
+                stats['latencies'].append(time.perf_counter() - started)
+            except SlotUnavailable:
+                # Horário lotado: recusa esperada, não é erro do banco
+                db.session.rollback()
+                stats['full'] += 1
+                stats['latencies'].append(time.perf_counter() - started)
+            except Exception as e:
+                db.session.rollback()
+                stats['errors'] += 1
+                if 'locked' in str(e):
+                    stats['locked'] += 1
+    results.put(stats)
+
+
+def run(database, tuned, args):
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    # Tempo para os processos importarem a aplicação antes de começar a contar
+    start = time.time() + 3
+    deadline = start + args.seconds
+    processes = [
+        context.Process(target=worker, args=(number, database, tuned, args, deadline, results))
+        for number in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    latencies = sorted(latency for stats in collected for latency in stats['latencies'])
+    elapsed = args.seconds
+    total = {key: sum(stats[key] for stats in collected) for key in ('bookings', 'full', 'reports', 'errors', 'locked')}
+    total['bookings_per_second'] = round(total['bookings'] / elapsed, 1)
+    total['reports_per_second'] = round(total['reports'] / elapsed, 1)
+    total['p50_ms'] = round(latencies[len(latencies) // 2] * 1000, 1) if latencies else None
+    total['p95_ms'] = round(latencies[int(len(latencies) * 0.95)] * 1000, 1) if latencies else None
+    total['p99_ms'] = round(latencies[int(len(latencies) * 0.99)] * 1000, 1) if latencies else None
+    return total
+
+
+def seed_database(path, args):
+    os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+    os.environ['SQLITE_TUNING'] = '0'
+    os.environ['NOTIFICATION_WORKERS'] = '0'
+    from check_query_plans import seed
+    from src.main import app, db
+    with app.app_context():
+        seed(db, args)
+        db.engine.dispose()
+
+
+def main():
+    args = parse_args()
+    directory = tempfile.mkdtemp()
+    template = os.path.join(directory, 'seed.db')
+    seed_database(template, args)
+
+    print(f"\n{args.workers} processos, {args.seconds:.0f}s por rodada, {args.write_ratio:.0%} de agendamentos\n")
+    print(f"{'perfil':<10}{'agend./s':>10}{'lotados':>9}{'relat./s':>10}{'erros':>8}{'locked':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for label, tuned in (('padrão', False), ('ajustado', True)):
+        database = os.path.join(directory, f'{label}.db')
+        shutil.copy(template, database)
+        # O modo do journal fica gravado no arquivo; a cópia parte do padrão (DELETE)
+        sqlite3.connect(database).execute('PRAGMA journal_mode=DELETE').fetchall()
+        total = run(database, tuned, args)
+        print(
+            f"{label:<10}{total['bookings_per_second']:>10}{total['full']:>9}{total['reports_per_second']:>10}"
+            f"{total['errors']:>8}{total['locked']:>8}{total['p50_ms']:>9}{total['p95_ms']:>9}{total['p99_ms']:>9}"
+        )
+    shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
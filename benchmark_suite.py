@@ -0,0 +1,676 @@
+"""
+Benchmark reprodutível dos caminhos mais usados: disponibilidade,
+agendamento, os quatro relatórios e o envio de lembretes.
+
+Uso:
+    python benchmark_suite.py seed --database /tmp/bench.db --appointments 2000000
+    python benchmark_suite.py run --database /tmp/bench.db --output base.json
+    python benchmark_suite.py run --database /tmp/bench.db --mode gunicorn --workers 4 --output novo.json
+    python benchmark_suite.py compare base.json novo.json --tolerance 0.2
+
+`seed` gera um banco sintético com a mesma semente sempre: profissionais
+com popularidade desigual, serviços, horários de atendimento e milhões de
+agendamentos concentrados nos dias úteis, nos horários de pico e nos
+meses mais recentes, com status coerentes com a data.
+
+`run` trabalha sobre uma cópia do banco (as rodadas partem sempre do
+mesmo estado) e executa cada cenário por `--seconds` com `--concurrency`
+clientes simultâneos, no próprio processo (cliente de testes do Flask) ou
+contra um Gunicorn local (`pip install gunicorn`). As notificações vão
+para um webhook falso local. O resultado (p50/p95/p99 e vazão por
+cenário) é gravado em JSON.
+
+`compare` aponta os cenários em que p95/p99 subiram ou a vazão caiu mais
+que `--tolerance` e termina com erro se houver alguma regressão.
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, datetime, time as day_time, timedelta
+
+SCENARIOS = (
+    'availability', 'booking', 'report_dashboard', 'report_appointments',
+    'report_revenue', 'report_services', 'reminders'
+)
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    seed = commands.add_parser('seed', help='Gera o banco sintético')
+    seed.add_argument('--database', default=os.path.join(tempfile.gettempdir(), 'agendamento-benchmark.db'))
+    seed.add_argument('--database-url', help='Outro banco (ex.: PostgreSQL) no lugar do arquivo SQLite')
+    seed.add_argument('--professionals', type=int, default=200)
+    seed.add_argument('--appointments', type=int, default=1_000_000)
+    seed.add_argument('--history-days', type=int, default=730, help='Dias de histórico até hoje')
+    seed.add_argument('--future-days', type=int, default=60, help='Dias de agenda a partir de hoje')
+    seed.add_argument('--series', type=float, default=0.01,
+                      help='Fração dos agendamentos futuros que viram séries recorrentes')
+    seed.add_argument('--seed', type=int, default=42)
+
+    run = commands.add_parser('run', help='Executa os cenários e grava o resultado')
+    run.add_argument('--database', default=os.path.join(tempfile.gettempdir(), 'agendamento-benchmark.db'))
+    run.add_argument('--database-url', help='Usa este banco diretamente, sem cópia (as gravações permanecem)')
+    run.add_argument('--mode', choices=('inprocess', 'gunicorn'), default='inprocess')
+    run.add_argument('--workers', type=int, default=2, help='Workers do Gunicorn')
+    run.add_argument('--threads', type=int, default=4, help='Threads por worker do Gunicorn')
+    run.add_argument('--concurrency', type=int, default=8, help='Clientes simultâneos')
+    run.add_argument('--seconds', type=float, default=10, help='Duração de cada cenário')
+    run.add_argument('--warmup', type=float, default=1, help='Segundos descartados no início de cada cenário')
+    run.add_argument('--scenarios', default=','.join(SCENARIOS), help='Cenários, separados por vírgula')
+    run.add_argument('--reminder-days', type=int, default=3, help='Dias de lembretes enviados no cenário reminders')
+    run.add_argument('--webhook-latency-ms', type=float, default=0, help='Atraso artificial do webhook falso')
+    run.add_argument('--output', help='Arquivo JSON do resultado (padrão: saída padrão)')
+    run.add_argument('--seed', type=int, default=42)
+
+    compare = commands.add_parser('compare', help='Compara dois resultados')
+    compare.add_argument('baseline')
+    compare.add_argument('current')
+    compare.add_argument('--tolerance', type=float, default=0.2, help='Variação aceita (0.2 = 20%%)')
+    compare.add_argument('--min-ms', type=float, default=1.0,
+                         help='Diferença mínima de latência para contar como regressão')
+    return parser.parse_args()
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+def _database_url(args):
+    return args.database_url or f'sqlite:///{os.path.abspath(args.database)}'
+
+
+# --- Dados sintéticos -------------------------------------------------------
+
+def _slot_weight(minute):
+    """
+    Procura por horário: picos no meio da manhã e no fim da tarde
+    """
+    hour = minute / 60
+    return 1.0 + 1.5 * max(0.0, 1 - abs(hour - 10) / 2) + 2.0 * max(0.0, 1 - abs(hour - 17.5) / 1.5)
+
+
+def _working_slots(schedule):
+    start, end, break_start, break_end = schedule
+    slots = []
+    for minute in range(start * 60, end * 60, 30):
+        if break_start is not None and break_start * 60 <= minute < break_end * 60:
+            continue
+        slots.append(minute)
+    return slots
+
+
+def _cumulative(weights):
+    total, cumulative = 0.0, []
+    for weight in weights:
+        total += weight
+        cumulative.append(total)
+    return cumulative
+
+
+def seed(db, args):
+    from sqlalchemy import select
+    from src.models.professional import Professional
+    from src.models.service import Service
+    from src.models.schedule import Schedule
+    from src.models.appointment import Appointment
+    from src.models.recurrence_rule import RecurrenceRule
+    from src.services.report_rollup import rebuild_rollups
+    from src.services.slot_reservation import rebuild_slot_occupancy
+
+    rng = random.Random(args.seed)
+    now = datetime.utcnow()
+    today = date.today()
+    started = time.perf_counter()
+
+    db.session.execute(Professional.__table__.insert(), [
+        {
+            'id': i, 'name': f'Profissional {i}', 'email': f'prof{i}@exemplo.com',
+            'phone': f'1199{i:07d}', 'password_hash': '-', 'is_public': True, 'created_at': now
+        }
+        for i in range(1, args.professionals + 1)
+    ])
+    # Popularidade em lei de potência: poucos profissionais concentram a agenda
+    popularity = _cumulative([1 / rank ** 0.8 for rank in range(1, args.professionals + 1)])
+
+    services = []
+    services_by_professional = {}
+    for professional_id in range(1, args.professionals + 1):
+        for n in range(rng.randint(3, 8)):
+            service = {
+                'id': len(services) + 1, 'professional_id': professional_id, 'name': f'Serviço {n + 1}',
+                'duration_minutes': rng.choices([30, 45, 60, 90, 120], [35, 20, 30, 10, 5])[0],
+                'price': round(rng.uniform(30, 250) / 5) * 5, 'is_active': rng.random() > 0.1,
+                'requires_address': rng.random() < 0.1, 'created_at': now
+            }
+            services.append(service)
+            if service['is_active']:
+                services_by_professional.setdefault(professional_id, []).append(service['id'])
+        if professional_id not in services_by_professional:
+            services[-1]['is_active'] = True
+            services_by_professional[professional_id] = [services[-1]['id']]
+    db.session.execute(Service.__table__.insert(), services)
+
+    # Dias úteis com almoço na maioria; sábado de manhã para parte dos profissionais
+    schedules = []
+    slots_by_day = {}
+    for professional_id in range(1, args.professionals + 1):
+        start, end = rng.choice([(8, 17), (8, 18), (9, 18), (9, 19)])
+        lunch = (12, 13) if rng.random() < 0.8 else (None, None)
+        limit = 1 if rng.random() < 0.85 else 2
+        working = [(day, (start, end) + lunch) for day in range(5)]
+        if rng.random() < 0.6:
+            working.append((5, (8, 13, None, None)))
+        for day, schedule in working:
+            schedules.append({
+                'professional_id': professional_id, 'day_of_week': day,
+                'start_time': day_time(schedule[0]), 'end_time': day_time(schedule[1]),
+                'break_start': day_time(schedule[2]) if schedule[2] is not None else None,
+                'break_end': day_time(schedule[3]) if schedule[3] is not None else None,
+                'max_appointments_per_slot': limit, 'is_active': True, 'created_at': now
+            })
+            slots = _working_slots(schedule)
+            slots_by_day[(professional_id, day)] = (slots, _cumulative([_slot_weight(m) for m in slots]))
+    db.session.execute(Schedule.__table__.insert(), schedules)
+
+    # Movimento crescente ao longo do histórico; agenda futura rareando com a antecedência
+    days = [today + timedelta(days=offset) for offset in range(-args.history_days, args.future_days)]
+    day_weights = _cumulative([
+        0.5 + 0.5 * (offset + args.history_days) / args.history_days if offset < 0 else 0.9 ** (offset / 7)
+        for offset in range(-args.history_days, args.future_days)
+    ])
+
+    print(f"Gerando {args.appointments} agendamentos para {args.professionals} profissionais...")
+    batch, inserted = [], 0
+    while inserted + len(batch) < args.appointments:
+        professional_id = rng.choices(range(1, args.professionals + 1), cum_weights=popularity)[0]
+        appointment_date = rng.choices(days, cum_weights=day_weights)[0]
+        day = slots_by_day.get((professional_id, appointment_date.weekday()))
+        if day is None:
+            continue  # Profissional não atende neste dia da semana
+        minute = rng.choices(day[0], cum_weights=day[1])[0]
+        service_ids = services_by_professional[professional_id]
+        # Os primeiros serviços de cada profissional são os mais procurados
+        service_id = service_ids[min(int(rng.expovariate(0.7)), len(service_ids) - 1)]
+        roll = rng.random()
+        if appointment_date < today:
+            status = 'concluido' if roll < 0.78 else 'cancelado' if roll < 0.90 else 'confirmado' if roll < 0.96 else 'agendado'
+        else:
+            status = 'agendado' if roll < 0.65 else 'confirmado' if roll < 0.93 else 'cancelado'
+        client = rng.randrange(300)
+        created_at = datetime.combine(appointment_date, day_time()) - timedelta(
+            days=rng.expovariate(1 / 6), seconds=rng.randrange(86400)
+        )
+        batch.append({
+            'professional_id': professional_id, 'service_id': service_id,
+            'client_name': f'Cliente {professional_id}-{client}',
+            'client_phone': f'1198{professional_id:04d}{client:03d}',
+            'client_email': f'cliente{professional_id}-{client}@exemplo.com' if client % 5 < 2 else None,
+            'client_address': 'Rua Exemplo, 100' if client % 10 == 0 else None,
+            'appointment_date': appointment_date,
+            'appointment_time': day_time(minute // 60, minute % 60),
+            'status': status, 'created_at': min(created_at, now), 'updated_at': min(created_at, now),
+            'notification_sent': appointment_date < today, 'reminder_sent': appointment_date < today
+        })
+        if len(batch) == 50_000:
+            db.session.execute(Appointment.__table__.insert(), batch)
+            inserted += len(batch)
+            batch = []
+            print(f"  {inserted} agendamentos ({time.perf_counter() - started:.0f}s)")
+    if batch:
+        db.session.execute(Appointment.__table__.insert(), batch)
+
+    # Parte dos agendamentos futuros vira série semanal ou quinzenal
+    rules = []
+    if args.series > 0:
+        for appointment_id, professional_id, appointment_date in db.session.execute(
+            select(Appointment.id, Appointment.professional_id, Appointment.appointment_date).where(
+                Appointment.appointment_date >= today, Appointment.status != 'cancelado'
+            )
+        ):
+            if rng.random() < args.series:
+                rules.append({
+                    'appointment_id': appointment_id, 'professional_id': professional_id,
+                    'frequency': rng.choice(['weekly', 'weekly', 'biweekly']), 'interval': 1,
+                    'start_date': appointment_date, 'count': rng.choice([None, 12, 26]),
+                    'created_at': now, 'updated_at': now
+                })
+        if rules:
+            db.session.execute(RecurrenceRule.__table__.insert(), rules)
+    db.session.commit()
+
+    # A carga em massa não passa pelos eventos do ORM
+    print("Recalculando agregado diário e ocupação dos horários...")
+    with db.engine.begin() as connection:
+        rebuild_rollups(connection)
+        rebuild_slot_occupancy(connection)
+        if connection.dialect.name == 'sqlite':
+            connection.exec_driver_sql('ANALYZE')
+        else:
+            connection.exec_driver_sql('ANALYZE appointment')
+    print(f"Banco pronto em {time.perf_counter() - started:.0f}s: {args.professionals} profissionais, "
+          f"{len(services)} serviços, {len(schedules)} horários, {args.appointments} agendamentos, "
+          f"{len(rules)} séries")
+
+
+def run_seed(args):
+    if not args.database_url and os.path.exists(args.database):
+        os.remove(args.database)
+    os.environ['DATABASE_URL'] = _database_url(args)
+    os.environ['NOTIFICATION_WORKERS'] = '0'
+    # As inserções em lote passariam todas pelo log de consultas lentas
+    os.environ.setdefault('SLOW_QUERY_MS', '600000')
+    from src.main import app, db
+    with app.app_context():
+        seed(db, args)
+        db.engine.dispose()
+
+
+# --- Carga -----------------------------------------------------------------
+
+class InProcessClient:
+    """
+    Requisições pelo cliente de testes do Flask, no próprio processo
+    """
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, body=None, headers=None):
+        response = self.client.open(path, method=method, json=body, headers=headers)
+        response.get_data()
+        return response.status_code
+
+    def close(self):
+        pass
+
+
+class HttpClient:
+    """
+    Requisições HTTP com conexão persistente (uma por cliente simultâneo)
+    """
+
+    def __init__(self, host, port):
+        self.connection = http.client.HTTPConnection(host, port, timeout=60)
+
+    def request(self, method, path, body=None, headers=None):
+        headers = dict(headers or {})
+        payload = None
+        if body is not None:
+            payload = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+        try:
+            self.connection.request(method, path, payload, headers)
+            response = self.connection.getresponse()
+            response.read()
+            return response.status
+        except (http.client.HTTPException, OSError):
+            self.connection.close()
+            raise
+
+    def close(self):
+        self.connection.close()
+
+
+def load_fixtures(app, db):
+    """
+    Profissionais, serviços ativos, dias de atendimento e tokens usados
+    para montar as requisições
+    """
+    from src.models.professional import Professional
+    from src.models.service import Service
+    from src.models.schedule import Schedule
+    from src.services.authentication import issue_token
+
+    with app.app_context():
+        professionals = Professional.query.order_by(Professional.id).all()
+        tokens = {professional.id: issue_token(professional) for professional in professionals}
+        services = {}
+        for service_id, professional_id, requires_address in db.session.query(
+            Service.id, Service.professional_id, Service.requires_address
+        ).filter(Service.is_active == True):
+            services.setdefault(professional_id, []).append((service_id, requires_address))
+        schedules = {}
+        for professional_id, day_of_week, start_time, end_time in db.session.query(
+            Schedule.professional_id, Schedule.day_of_week, Schedule.start_time, Schedule.end_time
+        ).filter(Schedule.is_active == True):
+            schedules.setdefault(professional_id, {})[day_of_week] = (start_time.hour, end_time.hour)
+        db.session.remove()
+
+    ids = [professional_id for professional_id in tokens if services.get(professional_id) and schedules.get(professional_id)]
+    return {
+        'professionals': ids,
+        # Mesma popularidade do gerador: os primeiros ids recebem mais tráfego
+        'weights': _cumulative([1 / rank ** 0.8 for rank in range(1, len(ids) + 1)]),
+        'tokens': tokens,
+        'services': services,
+        'schedules': schedules
+    }
+
+
+def _pick_professional(rng, fixtures):
+    return rng.choices(fixtures['professionals'], cum_weights=fixtures['weights'])[0]
+
+
+def _working_day(rng, fixtures, professional_id):
+    schedule = fixtures['schedules'][professional_id]
+    while True:
+        target = date.today() + timedelta(days=rng.randint(1, 30))
+        if target.weekday() in schedule:
+            return target, schedule[target.weekday()]
+
+
+def build_request(scenario, rng, fixtures):
+    """
+    (método, caminho, corpo, cabeçalhos, status esperados) de uma requisição do cenário
+    """
+    professional_id = _pick_professional(rng, fixtures)
+    service_id, requires_address = rng.choice(fixtures['services'][professional_id])
+    auth = {'Authorization': f"Bearer {fixtures['tokens'][professional_id]}"}
+
+    if scenario == 'availability':
+        target, _ = _working_day(rng, fixtures, professional_id)
+        return ('GET', f'/api/professionals/{professional_id}/availability?date={target}&service_id={service_id}',
+                None, None, (200,))
+    if scenario == 'booking':
+        target, (start, end) = _working_day(rng, fixtures, professional_id)
+        body = {
+            'professional_id': professional_id, 'service_id': service_id,
+            'client_name': 'Cliente Benchmark', 'client_phone': f'1197{rng.randrange(10 ** 7):07d}',
+            'appointment_date': target.isoformat(),
+            'appointment_time': f'{rng.randrange(start, max(end - 1, start + 1)):02d}:{rng.choice([0, 30]):02d}'
+        }
+        if requires_address:
+            body['client_address'] = 'Rua Benchmark, 1'
+        # 409: horário lotado, recusa esperada sob disputa
+        return 'POST', '/api/appointments', body, None, (201, 409)
+    if scenario == 'report_dashboard':
+        return 'GET', '/api/reports/dashboard', None, auth, (200,)
+    if scenario == 'report_appointments':
+        start = date.today() - timedelta(days=rng.randint(30, 365))
+        return ('GET', f'/api/reports/appointments?start_date={start}&end_date={start + timedelta(days=30)}&limit=50',
+                None, auth, (200,))
+    if scenario == 'report_revenue':
+        return 'GET', f"/api/reports/revenue?granularity={rng.choice(['day', 'week', 'month'])}", None, auth, (200,)
+    if scenario == 'report_services':
+        return 'GET', f"/api/reports/services-performance?days={rng.choice([7, 30, 90])}", None, auth, (200,)
+    raise ValueError(f'Cenário desconhecido: {scenario}')
+
+
+def summarize(latencies, statuses, errors, elapsed):
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'statuses': {str(status): count for status, count in sorted(statuses.items())},
+        'throughput_per_second': round(len(latencies) / elapsed, 2) if elapsed else 0,
+        'p50_ms': round(percentile(latencies, 0.50), 2),
+        'p95_ms': round(percentile(latencies, 0.95), 2),
+        'p99_ms': round(percentile(latencies, 0.99), 2),
+        'max_ms': round(latencies[-1], 2) if latencies else 0
+    }
+
+
+def run_scenario(scenario, make_client, fixtures, args):
+    """
+    `--concurrency` clientes repetindo requisições do cenário até o prazo
+    """
+    lock = threading.Lock()
+    latencies, statuses, errors = [], {}, [0]
+    measure_from = time.perf_counter() + args.warmup
+    deadline = measure_from + args.seconds
+
+    def client_loop(number):
+        rng = random.Random(f'{args.seed}-{scenario}-{number}')
+        client = make_client()
+        try:
+            while True:
+                started = time.perf_counter()
+                if started >= deadline:
+                    return
+                method, path, body, headers, expected = build_request(scenario, rng, fixtures)
+                try:
+                    status = client.request(method, path, body, headers)
+                except Exception:
+                    status = None
+                elapsed = (time.perf_counter() - started) * 1000
+                if started < measure_from:
+                    continue
+                with lock:
+                    latencies.append(elapsed)
+                    statuses[status] = statuses.get(status, 0) + 1
+                    if status not in expected:
+                        errors[0] += 1
+        finally:
+            client.close()
+
+    threads = [threading.Thread(target=client_loop, args=(number,)) for number in range(args.concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(latencies, statuses, errors[0], args.seconds)
+
+
+def run_reminders(app, args):
+    """
+    Envia os lembretes de `--reminder-days` dias pelo disparador em lote,
+    contra o webhook falso, medindo cada envio
+    """
+    from src.services.notification_service import notification_service
+    from src.services.reminder_dispatcher import reminder_dispatcher
+
+    latencies, failures = [], [0]
+
+    def timed_sender(job):
+        started = time.perf_counter()
+        try:
+            notification_service.deliver_job(job)
+        except Exception:
+            failures[0] += 1
+            raise
+        finally:
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    start_date = date.today() + timedelta(days=1)
+    with app.app_context():
+        started = time.perf_counter()
+        stats = reminder_dispatcher.dispatch(
+            start_date, start_date + timedelta(days=args.reminder_days - 1), sender=timed_sender
+        )
+        elapsed = time.perf_counter() - started
+    result = summarize(latencies, {'sent': stats['sent'], 'failed': stats['failed']}, failures[0], elapsed)
+    result['selected'] = stats['selected']
+    result['elapsed_seconds'] = round(elapsed, 3)
+    return result
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_gunicorn(args, environment):
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--workers', str(args.workers), '--threads', str(args.threads),
+         '--bind', f'127.0.0.1:{port}', '--log-level', 'warning', 'src.main:app'],
+        cwd=BASE_DIR, env=environment
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError('O Gunicorn terminou durante a inicialização (está instalado?)')
+        try:
+            if HttpClient('127.0.0.1', port).request('GET', '/api/professionals/directory') == 200:
+                return process, port
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError('O Gunicorn não respondeu em 60s')
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run_benchmark(args):
+    scenarios = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        sys.exit(f"Cenários desconhecidos: {', '.join(sorted(unknown))}")
+
+    # Cada rodada parte de uma cópia do banco gerado por `seed`
+    workdir = tempfile.mkdtemp()
+    if args.database_url:
+        database_url = args.database_url
+    else:
+        if not os.path.exists(args.database):
+            sys.exit(f'Banco {args.database} não encontrado; gere-o com: python benchmark_suite.py seed')
+        copy = os.path.join(workdir, 'benchmark.db')
+        shutil.copy(args.database, copy)
+        database_url = f'sqlite:///{copy}'
+
+    from check_webhook_client import start_stub
+    stub = start_stub(args.webhook_latency_ms / 1000)
+    webhook_url = f'http://127.0.0.1:{stub.server_address[1]}/webhook/whatsapp-notification'
+
+    os.environ['DATABASE_URL'] = database_url
+    os.environ['N8N_WEBHOOK_URL'] = webhook_url
+    # No modo gunicorn a fila de notificações é consumida pelos workers do servidor
+    os.environ['NOTIFICATION_WORKERS'] = '2' if args.mode == 'inprocess' else '0'
+    from src.main import app, db
+    fixtures = load_fixtures(app, db)
+
+    server = None
+    if args.mode == 'gunicorn':
+        environment = dict(os.environ, NOTIFICATION_WORKERS='1')
+        server, port = start_gunicorn(args, environment)
+        make_client = lambda: HttpClient('127.0.0.1', port)
+    else:
+        make_client = lambda: InProcessClient(app)
+
+    results = {}
+    try:
+        for scenario in scenarios:
+            print(f"{scenario}...", file=sys.stderr)
+            if scenario == 'reminders':
+                results[scenario] = run_reminders(app, args)
+            else:
+                results[scenario] = run_scenario(scenario, make_client, fixtures, args)
+            result = results[scenario]
+            print(f"  {result['throughput_per_second']}/s  p50 {result['p50_ms']}ms  p95 {result['p95_ms']}ms  "
+                  f"p99 {result['p99_ms']}ms  erros {result['errors']}", file=sys.stderr)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+        stub.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        'meta': {
+            'created_at': datetime.utcnow().isoformat(timespec='seconds'),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'cpus': os.cpu_count(),
+            'mode': args.mode,
+            'workers': args.workers if args.mode == 'gunicorn' else None,
+            'threads': args.threads if args.mode == 'gunicorn' else None,
+            'concurrency': args.concurrency,
+            'seconds': args.seconds,
+            'database': args.database_url or os.path.abspath(args.database),
+            'professionals': len(fixtures['professionals']),
+            'webhook_latency_ms': args.webhook_latency_ms
+        },
+        'scenarios': results
+    }
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(output + '\n')
+    else:
+        print(output)
+    if any(result['errors'] for result in results.values()):
+        sys.exit(1)
+
+
+# --- Comparação ------------------------------------------------------------
+
+def _change(before, after):
+    if not before:
+        return 0.0 if not after else float('inf')
+    return (after - before) / before
+
+
+def compare_runs(args):
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    with open(args.current) as file:
+        current = json.load(file)
+
+    for key in ('mode', 'workers', 'threads', 'concurrency', 'cpus', 'database'):
+        if baseline['meta'].get(key) != current['meta'].get(key):
+            print(f"AVISO: {key} difere ({baseline['meta'].get(key)} -> {current['meta'].get(key)})")
+
+    print(f"{'cenário':<22}{'vazão/s':>18}{'p50 ms':>18}{'p95 ms':>18}{'p99 ms':>18}")
+    regressions = []
+    for name, before in baseline['scenarios'].items():
+        after = current['scenarios'].get(name)
+        if after is None:
+            print(f"{name:<22}  ausente no resultado atual")
+            continue
+        cells = []
+        for key in ('throughput_per_second', 'p50_ms', 'p95_ms', 'p99_ms'):
+            change = _change(before[key], after[key])
+            cells.append(f"{before[key]:>7}->{after[key]:<7}{change:+.0%}".rjust(18))
+        print(f"{name:<22}{''.join(cells)}")
+
+        if _change(before['throughput_per_second'], after['throughput_per_second']) < -args.tolerance:
+            regressions.append(f"{name}: vazão caiu de {before['throughput_per_second']} para {after['throughput_per_second']}/s")
+        for key in ('p95_ms', 'p99_ms'):
+            if (_change(before[key], after[key]) > args.tolerance
+                    and after[key] - before[key] >= args.min_ms):
+                regressions.append(f"{name}: {key} subiu de {before[key]} para {after[key]}")
+        if after['errors'] > before['errors']:
+            regressions.append(f"{name}: erros passaram de {before['errors']} para {after['errors']}")
+
+    if regressions:
+        print("\nRegressões:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print("\nNenhuma regressão acima da tolerância")
+
+
+def main():
+    args = parse_args()
+    if args.command == 'seed':
+        run_seed(args)
+    elif args.command == 'run':
+        run_benchmark(args)
+    else:
+        compare_runs(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+"""
+Verifica o envio em lote assíncrono contra um webhook simulado com asyncio.
+
+Uso:
+    python check_async_sender.py --messages 500 --concurrency 16
+    python check_async_sender.py --rate 100 --burst 10 --latency-ms 20
+
+O servidor simulado registra o instante de cada mensagem e quantas estavam
+em andamento ao mesmo tempo. O script termina com código 1 se a
+concorrência passar de --concurrency ou se alguma janela de 1 segundo
+receber mais que --rate + --burst mensagens.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import threading
+import time
+
+
+class StubWebhook:
+    """
+    Servidor HTTP/1.1 mínimo (keep-alive) que responde 200 a qualquer POST
+    """
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.received_at = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                length = 0
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    if name.strip().lower() == 'content-length':
+                        length = int(value)
+                await reader.readexactly(length)
+
+                self.received_at.append(time.monotonic())
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+                try:
+                    if self.latency:
+                        await asyncio.sleep(self.latency)
+                finally:
+                    self.in_flight -= 1
+
+                body = b'{"ok": true}'
+                writer.write(
+                    b'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n'
+                    b'Content-Length: ' + str(len(body)).encode() + b'\r\n\r\n' + body
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def start(self):
+        """
+        Sobe o servidor num loop próprio, em outra thread; retorna a porta
+        """
+        ready = threading.Event()
+
+        def run():
+            loop = asyncio.new_event_loop()
+            server = loop.run_until_complete(asyncio.start_server(self.handle, '127.0.0.1', 0))
+            self.port = server.sockets[0].getsockname()[1]
+            ready.set()
+            loop.run_forever()
+
+        threading.Thread(target=run, daemon=True).start()
+        ready.wait()
+        return self.port
+
+    def max_per_second(self):
+        received = sorted(self.received_at)
+        best = start = 0
+        for end in range(len(received)):
+            while received[end] - received[start] >= 1:
+                start += 1
+            best = max(best, end - start + 1)
+        return best
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--rate', type=float, default=0, help='Mensagens por segundo (0 = sem limite)')
+    parser.add_argument('--burst', type=int, default=0)
+    parser.add_argument('--latency-ms', type=float, default=10, help='Atraso do webhook simulado')
+    return parser.parse_args()
+
+
+def main():
+    from src.services.async_sender import AsyncNotificationSender
+    from src.services.webhook_client import WebhookClient
+
+    args = parse_args()
+    stub = StubWebhook(args.latency_ms / 1000)
+    port = stub.start()
+    url = f'http://127.0.0.1:{port}/webhook/whatsapp-notification'
+
+    client = WebhookClient(pool_maxsize=args.concurrency)
+
+    def send(item):
+        response = client.post(url, json=item)
+        if response.status_code != 200:
+            raise RuntimeError(f'status {response.status_code}')
+
+    sender = AsyncNotificationSender(
+        concurrency=args.concurrency,
+        default_rate=args.rate or None,
+        default_burst=args.burst or None
+    )
+    items = [{'phone': '5511999999999', 'message': f'Mensagem {i}'} for i in range(args.messages)]
+    errors, stats = sender.send_batch(items, send, lambda item: f'127.0.0.1:{port}')
+
+    print(f"Lote: {json.dumps(stats)}")
+    print(f"Pool: {json.dumps(client.stats())}")
+    print(f"Servidor: {len(stub.received_at)} recebidas, no máximo {stub.max_in_flight} simultâneas "
+          f"e {stub.max_per_second()} em 1 segundo")
+
+    failures = 0
+    if stats['failed'] or len(stub.received_at) != args.messages:
+        print(f"FALHA: {stats['failed']} envios com erro")
+        failures += 1
+    if stub.max_in_flight > args.concurrency:
+        print(f"FALHA: concorrência {stub.max_in_flight} acima de {args.concurrency}")
+        failures += 1
+    if args.rate:
+        allowed = args.rate + (args.burst or max(1, int(args.rate)))
+        if stub.max_per_second() > allowed:
+            print(f"FALHA: {stub.max_per_second()} mensagens em 1 segundo, limite {allowed:.0f}")
+            failures += 1
+
+    client.close()
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
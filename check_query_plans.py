@@ -0,0 +1,217 @@
+"""
+Verifica os planos de execução (EXPLAIN QUERY PLAN) das consultas de
+relatórios e disponibilidade contra um banco SQLite populado.
+
+Uso:
+    python check_query_plans.py --rows 2000000
+    python check_query_plans.py --database /tmp/planos.db  # reaproveita o banco
+
+As consultas são capturadas executando os próprios endpoints, de modo que
+qualquer consulta nova ou alterada passa automaticamente pela verificação.
+O script termina com código 1 se alguma delas fizer varredura completa
+(SCAN sem índice) em `appointment`, `service`, `schedule` ou `daily_rollup`.
+"""
+import argparse
+import base64
+import os
+import random
+import re
+import sys
+import tempfile
+from datetime import date, datetime, time, timedelta
+
+CHECKED_TABLES = {'appointment', 'service', 'schedule', 'daily_rollup', 'waitlist_entry',
+                  'recurrence_rule', 'recurrence_exception'}
+FULL_SCAN = re.compile(r'^SCAN (\w+)(?: AS \w+)?$')
+STATUSES = ['agendado', 'confirmado', 'cancelado', 'concluido']
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database', help='Arquivo SQLite a usar (criado e populado se não existir)')
+    parser.add_argument('--rows', type=int, default=1_000_000, help='Quantidade de agendamentos')
+    parser.add_argument('--professionals', type=int, default=500, help='Quantidade de profissionais')
+    parser.add_argument('--seed', type=int, default=42)
+    return parser.parse_args()
+
+
+def seed(db, args):
+    from sqlalchemy import select
+    from src.models.professional import Professional
+    from src.models.service import Service
+    from src.models.schedule import Schedule
+    from src.models.appointment import Appointment
+
+    rng = random.Random(args.seed)
+    now = datetime.utcnow()
+    print(f"Populando {args.professionals} profissionais e {args.rows} agendamentos...")
+
+    db.session.execute(Professional.__table__.insert(), [
+        {
+            'id': i, 'name': f'Profissional {i}', 'email': f'prof{i}@exemplo.com',
+            'phone': '11999999999', 'password_hash': '-', 'is_public': True, 'created_at': now
+        }
+        for i in range(1, args.professionals + 1)
+    ])
+
+    services = []
+    for professional_id in range(1, args.professionals + 1):
+        for n in range(5):
+            services.append({
+                'id': len(services) + 1, 'professional_id': professional_id, 'name': f'Serviço {n}',
+                'duration_minutes': rng.choice([30, 45, 60, 90]), 'price': rng.choice([None, 40.0, 80.0, 150.0]),
+                'is_active': True, 'requires_address': False, 'created_at': now
+            })
+    db.session.execute(Service.__table__.insert(), services)
+
+    db.session.execute(Schedule.__table__.insert(), [
+        {
+            'professional_id': professional_id, 'day_of_week': day, 'start_time': time(8),
+            'end_time': time(18), 'break_start': time(12), 'break_end': time(13),
+            'max_appointments_per_slot': 1, 'is_active': True, 'created_at': now
+        }
+        for professional_id in range(1, args.professionals + 1)
+        for day in range(6)
+    ])
+
+    first_day = date.today() - timedelta(days=3 * 365)
+    batch = []
+    for _ in range(args.rows):
+        service = services[rng.randrange(len(services))]
+        batch.append({
+            'professional_id': service['professional_id'], 'service_id': service['id'],
+            'client_name': 'Cliente', 'client_phone': '11988888888',
+            'appointment_date': first_day + timedelta(days=rng.randrange(3 * 365 + 60)),
+            'appointment_time': time(rng.randrange(8, 18), rng.choice([0, 30])),
+            'status': rng.choice(STATUSES), 'created_at': now, 'updated_at': now,
+            'notification_sent': False, 'reminder_sent': False
+        })
+        if len(batch) == 50_000:
+            db.session.execute(Appointment.__table__.insert(), batch)
+            batch = []
+    if batch:
+        db.session.execute(Appointment.__table__.insert(), batch)
+
+    # Um agendamento em cada 50 vira série recorrente, com algumas exceções
+    from src.models.recurrence_rule import RecurrenceRule
+    from src.models.recurrence_exception import RecurrenceException
+    from src.services.recurrence_expansion import FREQUENCIES, occurrence_date
+    rules, exceptions = [], []
+    for appointment_id, professional_id, start_date in db.session.execute(
+        select(Appointment.id, Appointment.professional_id, Appointment.appointment_date)
+        .where(Appointment.id % 50 == 0)
+    ):
+        frequency = rng.choice(FREQUENCIES)
+        rules.append({
+            'id': len(rules) + 1, 'appointment_id': appointment_id, 'professional_id': professional_id,
+            'frequency': frequency, 'interval': 1, 'start_date': start_date,
+            'count': rng.choice([None, 10, 52]), 'created_at': now, 'updated_at': now
+        })
+        for index in rng.sample(range(1, 10), 2):
+            exceptions.append({
+                'rule_id': len(rules), 'occurrence_date': occurrence_date(start_date, frequency, 1, index),
+                'created_at': now
+            })
+    if rules:
+        db.session.execute(RecurrenceRule.__table__.insert(), rules)
+        db.session.execute(RecurrenceException.__table__.insert(), exceptions)
+    db.session.commit()
+
+    # A carga em massa não passa pelos eventos do ORM
+    from src.services.report_rollup import rebuild_rollups
+    from src.services.slot_reservation import rebuild_slot_occupancy
+    with db.engine.begin() as connection:
+        rebuild_rollups(connection)
+        rebuild_slot_occupancy(connection)
+        connection.exec_driver_sql('ANALYZE')
+
+
+def capture_statements(app, db, professional_id, service_id):
+    """
+    Executa os endpoints e devolve as consultas SQL emitidas por cada um
+    """
+    from sqlalchemy import event
+
+    today = date.today()
+    cursor = base64.urlsafe_b64encode(f'{today.isoformat()}|12:00:00|1000000'.encode()).decode()
+    endpoints = [
+        '/api/reports/dashboard',
+        f'/api/reports/appointments?start_date={today - timedelta(days=90)}&end_date={today}',
+        f'/api/reports/appointments?status=concluido&service_id={service_id}',
+        f'/api/reports/appointments?limit=50&cursor={cursor}',
+        '/api/reports/revenue?period=month',
+        '/api/reports/revenue?period=week',
+        '/api/reports/revenue?period=year',
+        '/api/reports/services-performance?days=30',
+        f'/api/professionals/{professional_id}/availability?date={today}&service_id={service_id}',
+        f'/api/professionals/{professional_id}/availability/range?from={today}&to={today + timedelta(days=30)}&service_id={service_id}',
+        '/api/waitlist',
+    ]
+
+    captured = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            if all(statement != seen for seen, _ in captured):
+                captured.append((statement, parameters))
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['professional_id'] = professional_id
+
+    results = {}
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        for url in endpoints:
+            captured.clear()
+            response = client.get(url)
+            if response.status_code != 200:
+                print(f"AVISO: {url} retornou {response.status_code}: {response.get_data(as_text=True)[:200]}")
+            results[url] = list(captured)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    return results
+
+
+def main():
+    args = parse_args()
+    database = args.database or os.path.join(tempfile.mkdtemp(), 'query_plans.db')
+    needs_seed = not os.path.exists(database)
+    os.environ['DATABASE_URL'] = f'sqlite:///{database}'
+    os.environ['NOTIFICATION_WORKERS'] = '0'
+
+    from src.main import app, db
+
+    failures = 0
+    with app.app_context():
+        if needs_seed:
+            seed(db, args)
+
+        statements = capture_statements(app, db, professional_id=1, service_id=1)
+        raw = db.engine.raw_connection()
+        try:
+            cursor = raw.cursor()
+            for url, queries in statements.items():
+                print(f"\n== {url} ({len(queries)} consultas)")
+                for statement, parameters in queries:
+                    plan = [row[3] for row in cursor.execute(f'EXPLAIN QUERY PLAN {statement}', parameters)]
+                    scans = [
+                        line for line in plan
+                        if FULL_SCAN.match(line) and FULL_SCAN.match(line).group(1) in CHECKED_TABLES
+                    ]
+                    marker = 'FALHA' if scans else 'ok'
+                    print(f"  [{marker}] {' '.join(statement.split())[:120]}")
+                    for line in plan:
+                        print(f"         {line}")
+                    failures += len(scans)
+        finally:
+            raw.close()
+
+    if failures:
+        print(f"\n{failures} varredura(s) completa(s) encontrada(s)")
+        sys.exit(1)
+    print("\nNenhuma varredura completa encontrada")
+
+
+if __name__ == '__main__':
+    main()
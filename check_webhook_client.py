@@ -0,0 +1,146 @@
+"""
+Exercita o cliente de webhook com pool de conexões contra um servidor
+HTTP local que imita o webhook do n8n.
+
+Uso:
+    python check_webhook_client.py --messages 2000 --threads 4
+    python check_webhook_client.py --latency-ms 5  # simula atraso do webhook
+
+Envia as mensagens primeiro com `requests.post` avulso (uma conexão por
+mensagem) e depois com o `WebhookClient`, e compara o tempo total e as
+estatísticas do pool. Também verifica que um servidor que recusa a
+conexão é repetido e que um POST já enviado não é reenviado.
+"""
+import argparse
+import json
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubWebhookHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 mantém a conexão aberta entre requisições (keep-alive)
+    protocol_version = 'HTTP/1.1'
+    # Cabeçalhos e corpo saem em escritas separadas; sem TCP_NODELAY o atraso
+    # de ACK do cliente somaria ~40ms a cada resposta numa conexão reaproveitada
+    disable_nagle_algorithm = True
+    received = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        with StubWebhookHandler.lock:
+            StubWebhookHandler.received += 1
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # Cliente desistiu por timeout de leitura
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=1000, help='Mensagens por rodada')
+    parser.add_argument('--threads', type=int, default=4, help='Envios simultâneos')
+    parser.add_argument('--latency-ms', type=float, default=0, help='Atraso artificial do webhook')
+    return parser.parse_args()
+
+
+def start_stub(latency):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubWebhookHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(send, url, messages, threads):
+    payload = {'phone': '5511999999999', 'message': 'Lembrete', 'appointment_id': 1}
+
+    def send_one(i):
+        response = send(url, data=json.dumps(payload), headers={'Content-Type': 'application/json'})
+        if response.status_code != 200:
+            raise RuntimeError(f'status {response.status_code}')
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(send_one, range(messages)))
+    return time.perf_counter() - started
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def main():
+    import requests
+    from src.services.webhook_client import WebhookClient
+
+    args = parse_args()
+    server = start_stub(args.latency_ms / 1000)
+    url = f'http://127.0.0.1:{server.server_address[1]}/webhook/whatsapp-notification'
+
+    bare = run(lambda url, **kwargs: requests.post(url, timeout=10, **kwargs), url, args.messages, args.threads)
+    print(f"requests.post avulso: {args.messages} mensagens em {bare:.2f}s ({args.messages / bare:.0f}/s)")
+
+    client = WebhookClient(pool_maxsize=args.threads)
+    pooled = run(client.post, url, args.messages, args.threads)
+    stats = client.stats()
+    print(f"WebhookClient:        {args.messages} mensagens em {pooled:.2f}s ({args.messages / pooled:.0f}/s)")
+    print(f"Estatísticas do pool: {json.dumps(stats)}")
+
+    failures = 0
+    if stats['connections_opened'] > args.threads:
+        print(f"FALHA: {stats['connections_opened']} conexões abertas para {args.threads} threads")
+        failures += 1
+    if stats['in_flight'] != 0:
+        print(f"FALHA: {stats['in_flight']} requisições ainda em andamento")
+        failures += 1
+
+    # Conexão recusada: repetida pelo pool e, esgotadas as tentativas, levanta erro
+    refused = WebhookClient(max_retries=2, backoff_factor=0)
+    try:
+        refused.post(f'http://127.0.0.1:{free_port()}/', json={})
+        print("FALHA: envio para porta fechada não levantou erro")
+        failures += 1
+    except requests.ConnectionError:
+        print(f"Porta fechada: erro após as tentativas ({json.dumps(refused.stats())})")
+
+    # Tempo de leitura esgotado após o envio: o POST não pode ser repetido
+    server.latency = 0.5
+    before = StubWebhookHandler.received
+    slow = WebhookClient(read_timeout=0.1, max_retries=2)
+    try:
+        slow.post(url, json={})
+    except requests.Timeout:
+        pass
+    time.sleep(0.6)
+    if StubWebhookHandler.received - before != 1:
+        print(f"FALHA: POST com timeout de leitura enviado {StubWebhookHandler.received - before} vezes")
+        failures += 1
+    else:
+        print("Timeout de leitura: POST enviado uma única vez")
+
+    server.shutdown()
+    client.close()
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
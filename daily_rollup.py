@@ -0,0 +1,36 @@
+from src.models.professional import db
+
+class DailyRollup(db.Model):
+    """
+    Agregado diário de agendamentos por profissional, serviço e status.
+
+    Mantido pelos eventos de `Appointment` e `Service` registrados em
+    src/services/report_rollup.py; `revenue` é a quantidade multiplicada
+    pelo preço atual do serviço.
+    """
+    __tablename__ = 'daily_rollup'
+
+    professional_id = db.Column(db.Integer, db.ForeignKey('professional.id'), primary_key=True)
+    service_id = db.Column(db.Integer, db.ForeignKey('service.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    status = db.Column(db.String(20), primary_key=True)
+    appointment_count = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0)
+
+    __table_args__ = (
+        db.Index('ix_daily_rollup_professional_day', 'professional_id', 'day'),
+        db.Index('ix_daily_rollup_service', 'service_id'),
+    )
+
+    def __repr__(self):
+        return f'<DailyRollup {self.professional_id} {self.service_id} {self.day} {self.status}>'
+
+    def to_dict(self):
+        return {
+            'professional_id': self.professional_id,
+            'service_id': self.service_id,
+            'day': self.day.isoformat() if self.day else None,
+            'status': self.status,
+            'appointment_count': self.appointment_count,
+            'revenue': self.revenue
+        }
@@ -0,0 +1,74 @@
+import os
+from sqlalchemy import event
+
+# Perfil padrão das conexões SQLite; cada valor pode ser trocado pela
+# variável de ambiente correspondente (SQLITE_JOURNAL_MODE, ...)
+SQLITE_PRAGMAS = (
+    # WAL: leitores não bloqueiam o escritor e vice-versa
+    ('journal_mode', 'SQLITE_JOURNAL_MODE', 'WAL'),
+    # Espera pelo lock de escrita em vez de falhar com "database is locked"
+    ('busy_timeout', 'SQLITE_BUSY_TIMEOUT_MS', '5000'),
+    # Com WAL, NORMAL só sincroniza no checkpoint e continua seguro contra corrupção
+    ('synchronous', 'SQLITE_SYNCHRONOUS', 'NORMAL'),
+    ('mmap_size', 'SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)),
+    # Valor negativo = tamanho em KiB (64 MiB por conexão)
+    ('cache_size', 'SQLITE_CACHE_SIZE', '-65536'),
+    ('temp_store', 'SQLITE_TEMP_STORE', 'MEMORY'),
+)
+
+
+def database_uri(default):
+    """
+    URI do banco: DATABASE_URL ou `default` (SQLite local)
+    """
+    uri = os.environ.get('DATABASE_URL', default)
+    # Provedores que ainda usam o esquema antigo "postgres://"
+    if uri.startswith('postgres://'):
+        uri = 'postgresql://' + uri[len('postgres://'):]
+    return uri
+
+
+def engine_options(uri):
+    """
+    Opções do pool de conexões para o engine (SQLALCHEMY_ENGINE_OPTIONS).
+
+    Cada processo (worker do Gunicorn) tem o próprio pool: o total de
+    conexões pode chegar a workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW).
+    """
+    if uri.startswith('sqlite'):
+        # Pool padrão do SQLAlchemy para SQLite; o ajuste é feito pelos PRAGMAs
+        return {}
+    return {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 30)),
+        # Fecha conexões antigas antes que o servidor ou um proxy as derrube
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', '1') != '0'
+    }
+
+
+def sqlite_pragmas():
+    """
+    PRAGMAs aplicados a cada nova conexão (nenhum com SQLITE_TUNING=0)
+    """
+    if os.environ.get('SQLITE_TUNING', '1') == '0':
+        return []
+    return [(name, os.environ.get(variable, default)) for name, variable, default in SQLITE_PRAGMAS]
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in sqlite_pragmas():
+            cursor.execute(f'PRAGMA {name}={value}')
+    finally:
+        cursor.close()
+
+
+def configure_engine(engine):
+    """
+    Aplica o perfil de conexão do banco ao engine do SQLAlchemy
+    """
+    if engine.dialect.name == 'sqlite' and not event.contains(engine, 'connect', _apply_sqlite_pragmas):
+        event.listen(engine, 'connect', _apply_sqlite_pragmas)
@@ -0,0 +1,128 @@
+from flask import Blueprint, request, jsonify, current_app
+from src.services.directory_cache import directory_cache
+
+directory_bp = Blueprint('directory', __name__)
+
+# Maior página aceita na listagem paginada
+MAX_PER_PAGE = 100
+# Máximo de sugestões da busca durante a digitação
+MAX_SUGGESTIONS = 20
+
+
+def cached_json_response(etag, last_modified, build_body):
+    """
+    Resposta JSON com ETag e Last-Modified; 304 sem corpo quando o cliente
+    já tem a versão atual (If-None-Match / If-Modified-Since)
+    """
+    response = current_app.response_class(mimetype='application/json')
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    # O navegador pode guardar, mas deve revalidar a cada uso
+    response.cache_control.public = True
+    response.cache_control.no_cache = True
+    if request.if_none_match or request.if_modified_since:
+        response.make_conditional(request)
+        if response.status_code == 304:
+            return response
+    response.set_data(build_body())
+    return response
+
+
+def _int_arg(name, default):
+    value = request.args.get(name)
+    if value is None or value == '':
+        return default
+    return int(value)
+
+
+@directory_bp.route('/professionals/directory', methods=['GET'])
+def get_directory():
+    try:
+        query = (request.args.get('q') or '').strip()
+        service_name = (request.args.get('service') or '').strip()
+        try:
+            page = _int_arg('page', None)
+            per_page = _int_arg('per_page', None)
+        except ValueError:
+            return jsonify({'error': 'Parâmetros page e per_page devem ser números inteiros'}), 400
+        if (page is not None and page < 1) or (per_page is not None and not 1 <= per_page <= MAX_PER_PAGE):
+            return jsonify({'error': f'page deve ser >= 1 e per_page entre 1 e {MAX_PER_PAGE}'}), 400
+
+        snapshot = directory_cache.snapshot()
+        # Sem page/per_page a resposta continua sendo a lista completa
+        paginated = page is not None or per_page is not None
+        page = page or 1
+        per_page = per_page or 20
+        key = (query.lower(), service_name.lower(), page if paginated else None, per_page if paginated else None)
+
+        def build_body():
+            def serialize():
+                professionals = directory_cache.search(snapshot, query, service_name)
+                payload = {'professionals': professionals}
+                if paginated:
+                    start = (page - 1) * per_page
+                    payload = {
+                        'professionals': professionals[start:start + per_page],
+                        'total': len(professionals),
+                        'page': page,
+                        'per_page': per_page,
+                        'pages': (len(professionals) + per_page - 1) // per_page
+                    }
+                return f"{current_app.json.dumps(payload)}\n"
+            return directory_cache.cached_response(snapshot, key, serialize)
+
+        return cached_json_response(directory_cache.response_etag(snapshot, key), snapshot.last_modified, build_body)
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@directory_bp.route('/professionals/directory/suggest', methods=['GET'])
+def suggest_professionals():
+    try:
+        query = (request.args.get('q') or '').strip()
+        try:
+            limit = _int_arg('limit', 8)
+        except ValueError:
+            return jsonify({'error': 'Parâmetro limit deve ser um número inteiro'}), 400
+        if not 1 <= limit <= MAX_SUGGESTIONS:
+            return jsonify({'error': f'limit deve estar entre 1 e {MAX_SUGGESTIONS}'}), 400
+
+        snapshot = directory_cache.snapshot()
+        key = ('suggest', query.lower(), limit)
+
+        def build_body():
+            def serialize():
+                suggestions = [
+                    {
+                        'id': professional['id'],
+                        'name': professional['name'],
+                        'services': [service['name'] for service in professional['services'][:3]]
+                    }
+                    for professional in (directory_cache.search(snapshot, query, limit=limit) if query else [])
+                ]
+                return f"{current_app.json.dumps({'suggestions': suggestions})}\n"
+            return directory_cache.cached_response(snapshot, key, serialize)
+
+        return cached_json_response(directory_cache.response_etag(snapshot, key), snapshot.last_modified, build_body)
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@directory_bp.route('/professionals/directory/<int:professional_id>', methods=['GET'])
+def get_directory_professional(professional_id):
+    try:
+        snapshot = directory_cache.snapshot()
+        professional = snapshot.by_id.get(professional_id)
+        if professional is None:
+            return jsonify({'error': 'Profissional não encontrado'}), 404
+
+        return cached_json_response(
+            snapshot.item_etags[professional_id],
+            snapshot.last_modified,
+            lambda: f"{current_app.json.dumps({'professional': professional})}\n"
+        )
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
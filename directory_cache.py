@@ -0,0 +1,210 @@
+import hashlib
+import json
+import os
+import threading
+import time as clock
+from collections import OrderedDict
+from datetime import datetime
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from src.models.professional import db, Professional
+from src.models.service import Service
+from src.services.directory_search import SearchIndex
+from src.services.serialization import RowSerializer, professional_serializer
+
+# Serviços aparecem no diretório sem os campos internos (ativo, criação)
+directory_service_serializer = RowSerializer([
+    (name, getattr(Service, name), None)
+    for name in ('id', 'name', 'description', 'duration_minutes', 'price', 'requires_address')
+])
+
+
+def _etag(*parts):
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()[:32]
+
+
+class DirectorySnapshot:
+    """
+    Fotografia imutável do diretório público.
+
+    `professionals` já está no formato da resposta; o índice de busca do
+    filtro `q` é montado na primeira busca feita sobre a fotografia.
+    """
+
+    def __init__(self, professionals, last_modified):
+        self.professionals = professionals
+        self.by_id = {professional['id']: professional for professional in professionals}
+        self.search_index = None
+        self.item_etags = {
+            professional['id']: _etag(json.dumps(professional, sort_keys=True))
+            for professional in professionals
+        }
+        self.etag = _etag(*(self.item_etags[professional['id']] for professional in professionals))
+        self.last_modified = last_modified
+        self.built_at = clock.monotonic()
+
+
+class DirectoryCache:
+    """
+    Cache em memória do diretório público de profissionais.
+
+    A listagem é montada com duas consultas e reaproveitada até que um
+    `Professional` ou `Service` seja gravado neste processo (eventos de
+    sessão) ou até `ttl_seconds`, que limita o atraso para alterações
+    feitas por outros workers. As respostas serializadas de cada página ou
+    filtro também ficam guardadas, junto com a fotografia que as gerou.
+    """
+
+    def __init__(self, ttl_seconds=30, max_responses=256):
+        self.ttl_seconds = ttl_seconds
+        self.max_responses = max_responses
+        self._snapshot = None
+        self._expired = True
+        self._responses = OrderedDict()
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        return cls(ttl_seconds=float(os.environ.get('DIRECTORY_CACHE_TTL', 30)))
+
+    def snapshot(self):
+        """
+        Fotografia atual, reconstruída se invalidada ou expirada
+        """
+        snapshot = self._snapshot
+        if self._is_fresh(snapshot):
+            return snapshot
+
+        # Apenas uma thread reconstrói; as demais esperam e reaproveitam
+        with self._build_lock:
+            snapshot = self._snapshot
+            if self._is_fresh(snapshot):
+                return snapshot
+            previous = snapshot
+            # Uma invalidação durante a consulta volta a marcar como expirado
+            self._expired = False
+            professionals = self._load()
+            snapshot = DirectorySnapshot(professionals, datetime.utcnow().replace(microsecond=0))
+            if previous is not None and previous.etag == snapshot.etag:
+                # Conteúdo igual: mantém a data para não quebrar If-Modified-Since
+                snapshot.last_modified = previous.last_modified
+            with self._lock:
+                if previous is None or previous.etag != snapshot.etag:
+                    self._responses.clear()
+                self._snapshot = snapshot
+            return snapshot
+
+    def _is_fresh(self, snapshot):
+        return (
+            snapshot is not None and not self._expired
+            and clock.monotonic() - snapshot.built_at < self.ttl_seconds
+        )
+
+    def _load(self):
+        # Colunas direto em dicts, sem montar objetos do ORM (nunca o hash da senha)
+        rows = db.session.execute(
+            select(*professional_serializer.columns).where(Professional.is_public == True).order_by(Professional.id)
+        ).all()
+        professionals = professional_serializer.serialize_all(rows)
+        for professional in professionals:
+            professional['services'] = []
+
+        by_id = {professional['id']: professional for professional in professionals}
+        if by_id:
+            service_rows = db.session.execute(
+                select(Service.professional_id, *directory_service_serializer.columns).join(
+                    Professional, Professional.id == Service.professional_id
+                ).where(
+                    Professional.is_public == True,
+                    Service.is_active == True
+                ).order_by(Service.professional_id, Service.id)
+            ).all()
+            serialize = directory_service_serializer.serialize
+            for professional_id, *values in service_rows:
+                by_id[professional_id]['services'].append(serialize(values))
+        return professionals
+
+    def index(self, snapshot):
+        """
+        Índice de busca da fotografia (montado uma vez por fotografia)
+        """
+        if snapshot.search_index is None:
+            with self._build_lock:
+                if snapshot.search_index is None:
+                    snapshot.search_index = SearchIndex(snapshot.professionals)
+        return snapshot.search_index
+
+    def search(self, snapshot, query=None, service_name=None, limit=None):
+        """
+        Profissionais da fotografia que atendem aos filtros; com `query`,
+        ordenados por relevância
+        """
+        professionals = snapshot.professionals
+        if query:
+            # O limite só pode ser aplicado no índice se não houver outro filtro
+            ids = self.index(snapshot).search(query, limit=None if service_name else limit)
+            professionals = [snapshot.by_id[professional_id] for professional_id in ids]
+        if service_name:
+            service_name = service_name.lower()
+            professionals = [
+                professional for professional in professionals
+                if any(service_name in (service['name'] or '').lower() for service in professional['services'])
+            ]
+        return professionals[:limit] if limit is not None else professionals
+
+    def response_etag(self, snapshot, key):
+        """
+        ETag de uma página ou filtro; igual em todos os workers com o mesmo conteúdo
+        """
+        return _etag(snapshot.etag, repr(key))
+
+    def cached_response(self, snapshot, key, build):
+        """
+        Corpo serializado da resposta `key`, gerado por `build()` só na
+        primeira vez para cada fotografia
+        """
+        with self._lock:
+            cached = self._responses.get(key)
+            if cached is not None and cached[0] == snapshot.etag:
+                self._responses.move_to_end(key)
+                return cached[1]
+
+        body = build()
+        with self._lock:
+            self._responses[key] = (snapshot.etag, body)
+            self._responses.move_to_end(key)
+            while len(self._responses) > self.max_responses:
+                self._responses.popitem(last=False)
+        return body
+
+    def invalidate(self):
+        # A fotografia antiga é mantida para comparar o conteúdo na reconstrução
+        self._expired = True
+
+
+# Instância global do cache do diretório
+directory_cache = DirectoryCache.from_env()
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_directory_changes(session, flush_context):
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, (Professional, Service)):
+            session.info['directory_changed'] = True
+            return
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_directory(session):
+    if session.info.pop('directory_changed', False):
+        directory_cache.invalidate()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_directory_changes(session):
+    session.info.pop('directory_changed', None)
@@ -0,0 +1,215 @@
+import heapq
+import re
+import unicodedata
+from bisect import bisect_left
+from functools import lru_cache
+
+# Peso de cada campo na relevância
+FIELD_WEIGHTS = {
+    'name': 3.0,
+    'service_name': 2.0,
+    'description': 1.0,
+    'service_description': 0.5,
+    'address': 0.5,
+}
+# Termos com menos letras só casam por inteiro (evita "a*" casar tudo)
+MIN_PREFIX_LENGTH = 2
+# Casamento por prefixo vale menos que a palavra inteira
+PREFIX_FACTOR = 0.7
+WORD = re.compile(r'\w+')
+
+
+@lru_cache(maxsize=65536)
+def _fold(word):
+    """
+    Palavra em minúsculas e sem acentos ("Manicure", "manicúre" -> "manicure")
+    """
+    decomposed = unicodedata.normalize('NFKD', word.casefold())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text):
+    """
+    Palavras normalizadas de um texto
+    """
+    if not text:
+        return []
+    return [_fold(word) for word in WORD.findall(text)]
+
+
+class SearchIndex:
+    """
+    Índice invertido em memória dos profissionais do diretório.
+
+    Para cada palavra normalizada guarda o peso de cada profissional (soma
+    dos pesos dos campos em que ela aparece, com saturação da frequência),
+    já multiplicado pelo IDF. O vocabulário fica ordenado, de modo que os
+    prefixos para a busca durante a digitação são encontrados por bisseção.
+
+    Para devolver só os N mais relevantes sem pontuar todos os candidatos,
+    cada palavra usada numa busca ganha também a lista de profissionais em
+    ordem decrescente de peso, e a busca para assim que nenhum candidato
+    restante pode superar o N-ésimo resultado.
+    """
+
+    def __init__(self, professionals):
+        postings = {}
+        for professional in professionals:
+            services = professional['services']
+            fields = (
+                (professional.get('name'), FIELD_WEIGHTS['name']),
+                (' '.join(service.get('name') or '' for service in services), FIELD_WEIGHTS['service_name']),
+                (professional.get('description'), FIELD_WEIGHTS['description']),
+                (' '.join(service.get('description') or '' for service in services),
+                 FIELD_WEIGHTS['service_description']),
+                (professional.get('address'), FIELD_WEIGHTS['address']),
+            )
+            frequencies = {}
+            for text, weight in fields:
+                for token in tokenize(text):
+                    by_weight = frequencies.setdefault(token, {})
+                    by_weight[weight] = by_weight.get(weight, 0) + 1
+            professional_id = professional['id']
+            for token, by_weight in frequencies.items():
+                # Frequência saturada (estilo BM25): repetir a palavra rende cada vez menos
+                score = sum(weight * tf / (tf + 1.2) for weight, tf in by_weight.items())
+                documents = postings.get(token)
+                if documents is None:
+                    postings[token] = {professional_id: score}
+                else:
+                    documents[professional_id] = score
+
+        total = max(len(professionals), 1)
+        for documents in postings.values():
+            idf = 1.0 + (total / len(documents)) ** 0.5
+            for professional_id in documents:
+                documents[professional_id] *= idf
+
+        self.postings = postings
+        self.vocabulary = sorted(postings)
+        self._ranked = {}
+
+    def _expand(self, term, prefix):
+        """
+        Palavras do vocabulário que casam com o termo, com o fator de cada uma
+        """
+        if not prefix or len(term) < MIN_PREFIX_LENGTH:
+            return [(term, 1.0)] if term in self.postings else []
+        matches = []
+        position = bisect_left(self.vocabulary, term)
+        while position < len(self.vocabulary) and self.vocabulary[position].startswith(term):
+            word = self.vocabulary[position]
+            matches.append((word, 1.0 if word == term else PREFIX_FACTOR))
+            position += 1
+        return matches
+
+    def _ranked_postings(self, word):
+        """
+        (-peso, id) da palavra em ordem crescente, montada no primeiro uso
+        """
+        ranked = self._ranked.get(word)
+        if ranked is None:
+            ranked = sorted((-score, professional_id) for professional_id, score in self.postings[word].items())
+            self._ranked[word] = ranked
+        return ranked
+
+    def _term_stream(self, matches):
+        """
+        (-peso, id) de um termo em ordem decrescente de peso; com vários
+        prefixos casados, cada profissional aparece primeiro pelo maior peso
+        """
+        streams = [self._scaled(self._ranked_postings(word), factor) for word, factor in matches]
+        return streams[0] if len(streams) == 1 else heapq.merge(*streams)
+
+    @staticmethod
+    def _scaled(ranked, factor):
+        if factor == 1.0:
+            return iter(ranked)
+        return ((score * factor, professional_id) for score, professional_id in ranked)
+
+    @staticmethod
+    def _term_score(matches, postings, professional_id):
+        best = 0.0
+        for word, factor in matches:
+            score = postings[word].get(professional_id)
+            if score is not None and score * factor > best:
+                best = score * factor
+        return best
+
+    def search(self, query, limit=None, prefix=True):
+        """
+        Ids dos profissionais que contêm todos os termos, do mais relevante
+        para o menos relevante (empate: ordem do id)
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        expanded = [self._expand(term, prefix) for term in terms]
+        if not all(expanded):
+            return []
+        if limit is None:
+            return self._search_all(expanded)
+        return self._search_top(expanded, limit)
+
+    def _full_score(self, expanded, professional_id):
+        """
+        Soma dos pesos dos termos, ou 0 se algum termo não aparecer
+        """
+        total = 0.0
+        for matches in expanded:
+            score = self._term_score(matches, self.postings, professional_id)
+            if not score:
+                return 0.0
+            total += score
+        return total
+
+    def _search_all(self, expanded):
+        # O termo mais raro fornece os candidatos; os demais são consultados por id
+        sizes = [sum(len(self.postings[word]) for word, _ in matches) for matches in expanded]
+        driver = expanded[sizes.index(min(sizes))]
+        candidates = set()
+        for word, _ in driver:
+            candidates.update(self.postings[word])
+        scored = []
+        for professional_id in candidates:
+            total = self._full_score(expanded, professional_id)
+            if total:
+                scored.append((-total, professional_id))
+        return [professional_id for _, professional_id in sorted(scored)]
+
+    def _search_top(self, expanded, limit):
+        """
+        N mais relevantes pelo algoritmo do limiar (Fagin): as listas de
+        cada termo são percorridas juntas, em ordem decrescente de peso, e a
+        busca para quando o N-ésimo resultado supera a soma dos pesos atuais
+        das listas, que limita a pontuação de qualquer profissional não visto
+        """
+        streams = [self._term_stream(matches) for matches in expanded]
+        current = [None] * len(streams)
+        # Dentro do mesmo peso as listas vêm em ordem de id: um profissional
+        # não visto que empate com o limiar tem id maior que todos os atuais
+        cursor_ids = [0] * len(streams)
+        results = []  # heap de (pontuação, -id) com os melhores até agora
+        seen = set()
+        while True:
+            for position, stream in enumerate(streams):
+                entry = next(stream, None)
+                if entry is None:
+                    # Um termo esgotado: todo profissional com todos os termos já foi visto
+                    return [-negative_id for _, negative_id in sorted(results, reverse=True)]
+                negative_score, professional_id = entry
+                current[position] = -negative_score
+                cursor_ids[position] = professional_id
+                if professional_id in seen:
+                    continue
+                seen.add(professional_id)
+                total = self._full_score(expanded, professional_id)
+                if not total:
+                    continue
+                item = (total, -professional_id)
+                if len(results) < limit:
+                    heapq.heappush(results, item)
+                elif item > results[0]:
+                    heapq.heapreplace(results, item)
+            if len(results) >= limit and results[0] >= (sum(current), -max(cursor_ids)):
+                return [-negative_id for _, negative_id in sorted(results, reverse=True)]
@@ -0,0 +1,291 @@
+import cProfile
+import hmac
+import logging
+import os
+import random
+import re
+import tempfile
+import threading
+import time as clock
+from collections import Counter
+from datetime import datetime
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# Limites dos histogramas (segundos e quantidade de comandos SQL)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 250)
+# Rótulo das consultas feitas fora de requisições (workers, scripts)
+BACKGROUND = 'background'
+WHITESPACE = re.compile(r'\s+')
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # o último é +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for position, limit in enumerate(self.buckets):
+            if value <= limit:
+                break
+        else:
+            position = len(self.buckets)
+        self.counts[position] += 1
+        self.total += value
+        self.count += 1
+
+    def render(self, name, labels):
+        lines = []
+        cumulative = 0
+        for limit, count in zip(list(self.buckets) + ['+Inf'], self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{_labels(**labels, le=limit)} {cumulative}')
+        lines.append(f'{name}_sum{_labels(**labels)} {self.total}')
+        lines.append(f'{name}_count{_labels(**labels)} {self.count}')
+        return lines
+
+
+class RequestMetrics:
+    """
+    Medições de uma requisição, do before_request até o fim do corpo da resposta
+    """
+
+    def __init__(self, started, profiler=None):
+        self.started = started
+        self.profiler = profiler
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.sql_statements = Counter()
+        self.handed_off = False
+
+
+class Instrumentation:
+    """
+    Métricas por endpoint deste processo: latência, comandos SQL por
+    requisição, consultas lentas, padrões N+1 e perfis do cProfile.
+
+    As requisições são medidas por ganchos do Flask e as consultas pelos
+    eventos before/after_cursor_execute do engine. Cada processo (worker do
+    Gunicorn) mantém as próprias métricas.
+    """
+
+    def __init__(self, slow_query_seconds=0.2, n_plus_one_threshold=10,
+                 profile_sample_rate=0.0, profile_dir=None, profile_keep=50, profile_token=None):
+        self.slow_query_seconds = slow_query_seconds
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.profile_sample_rate = profile_sample_rate
+        self.profile_token = profile_token
+        self.profile_dir = profile_dir or os.path.join(tempfile.gettempdir(), 'agendamento-profiles')
+        self.profile_keep = profile_keep
+        self._lock = threading.Lock()
+        self.reset()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            slow_query_seconds=float(os.environ.get('SLOW_QUERY_MS', 200)) / 1000,
+            n_plus_one_threshold=int(os.environ.get('N_PLUS_ONE_THRESHOLD', 10)),
+            profile_sample_rate=float(os.environ.get('PROFILE_SAMPLE_RATE', 0)),
+            profile_dir=os.environ.get('PROFILE_DIR'),
+            profile_keep=int(os.environ.get('PROFILE_KEEP', 50)),
+            profile_token=os.environ.get('PROFILE_TOKEN') or None
+        )
+
+    def reset(self):
+        with self._lock:
+            self.latency = {}        # (endpoint, método, status) -> Histogram
+            self.sql_per_request = {}  # endpoint -> Histogram
+            self.sql_statements = Counter()  # endpoint -> comandos
+            self.sql_seconds = Counter()     # endpoint -> segundos
+            self.slow_queries = Counter()
+            self.n_plus_one = Counter()
+            self.errors = Counter()
+            self.profiles = Counter()
+            self.started_at = clock.time()
+
+    def init_app(self, app):
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+
+    def init_engine(self, engine):
+        if not event.contains(engine, 'before_cursor_execute', self._before_cursor_execute):
+            event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+
+    # Requisições
+
+    def _before_request(self):
+        profiler = None
+        if self._should_profile():
+            profiler = cProfile.Profile()
+            profiler.enable()
+        g.instrumentation = RequestMetrics(clock.perf_counter(), profiler)
+
+    def _should_profile(self):
+        # Perfil sob demanda só com PROFILE_TOKEN configurado e enviado em X-Profile.
+        # O endereço de origem não serve: atrás do Nginx toda requisição vem de 127.0.0.1
+        header = request.headers.get('X-Profile')
+        if self.profile_token and header and hmac.compare_digest(header, self.profile_token):
+            return True
+        return self.profile_sample_rate > 0 and random.random() < self.profile_sample_rate
+
+    def _after_request(self, response):
+        metrics = g.get('instrumentation')
+        if metrics is None or metrics.handed_off:
+            return response
+        endpoint = request.endpoint or 'not_found'
+
+        if response.status_code >= 500:
+            # As rotas devolvem a exceção como {'error': ...}; registra para não perdê-la
+            body = response.get_json(silent=True) if response.is_json else None
+            message = body.get('error') if isinstance(body, dict) else None
+            logger.error("%s %s retornou %d: %s", request.method, request.path, response.status_code, message)
+
+        # Respostas em streaming (NDJSON, exportações) só terminam de consultar o
+        # banco depois daqui: a medição fecha quando o corpo termina de ser enviado
+        metrics.handed_off = True
+        method, status = request.method, response.status_code
+        response.call_on_close(lambda: self._finish(metrics, endpoint, method, status))
+        return response
+
+    def _finish(self, metrics, endpoint, method, status):
+        elapsed = clock.perf_counter() - metrics.started
+
+        if metrics.profiler is not None:
+            metrics.profiler.disable()
+            self._save_profile(metrics.profiler, endpoint, elapsed)
+
+        repeated = [
+            (statement, count) for statement, count in metrics.sql_statements.items()
+            if count >= self.n_plus_one_threshold
+        ]
+        for statement, count in repeated:
+            logger.warning("Possível N+1 em %s: %d execuções de %s", endpoint, count, statement[:300])
+
+        with self._lock:
+            key = (endpoint, method, status)
+            histogram = self.latency.get(key)
+            if histogram is None:
+                histogram = self.latency[key] = Histogram(LATENCY_BUCKETS)
+            histogram.observe(elapsed)
+            histogram = self.sql_per_request.get(endpoint)
+            if histogram is None:
+                histogram = self.sql_per_request[endpoint] = Histogram(SQL_COUNT_BUCKETS)
+            histogram.observe(metrics.sql_count)
+            self.sql_statements[endpoint] += metrics.sql_count
+            self.sql_seconds[endpoint] += metrics.sql_seconds
+            if repeated:
+                self.n_plus_one[endpoint] += len(repeated)
+            if status >= 500:
+                self.errors[endpoint] += 1
+
+    def _teardown_request(self, exception):
+        # Requisição interrompida antes do after_request: não deixa o perfil ligado
+        metrics = g.get('instrumentation')
+        if metrics is not None and not metrics.handed_off and metrics.profiler is not None:
+            metrics.profiler.disable()
+
+    def _save_profile(self, profiler, endpoint, elapsed):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        name = f"{datetime.utcnow():%Y%m%dT%H%M%S%f}-{endpoint.replace('.', '_')}-{elapsed * 1000:.0f}ms.prof"
+        profiler.dump_stats(os.path.join(self.profile_dir, name))
+        with self._lock:
+            self.profiles[endpoint] += 1
+        # Mantém apenas os perfis mais recentes
+        files = sorted(name for name in os.listdir(self.profile_dir) if name.endswith('.prof'))
+        for old in files[:-self.profile_keep]:
+            try:
+                os.remove(os.path.join(self.profile_dir, old))
+            except OSError:
+                pass
+
+    # Consultas
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        # No contexto da execução, e não em conn.info: um comando que falha não
+        # dispara after_cursor_execute e não deixa resto na conexão do pool
+        if context is not None:
+            context._instrumentation_started = clock.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, '_instrumentation_started', None)
+        if started is None:
+            return
+        elapsed = clock.perf_counter() - started
+        metrics = g.get('instrumentation') if has_request_context() else None
+        endpoint = (request.endpoint or 'not_found') if metrics is not None else BACKGROUND
+        if metrics is not None:
+            metrics.sql_count += 1
+            metrics.sql_seconds += elapsed
+            metrics.sql_statements[statement] += 1
+        else:
+            with self._lock:
+                self.sql_statements[BACKGROUND] += 1
+                self.sql_seconds[BACKGROUND] += elapsed
+
+        if elapsed >= self.slow_query_seconds:
+            with self._lock:
+                self.slow_queries[endpoint] += 1
+            logger.warning(
+                "Consulta lenta (%.0f ms) em %s: %s", elapsed * 1000, endpoint,
+                WHITESPACE.sub(' ', statement)[:500]
+            )
+
+    # Exposição
+
+    def render_prometheus(self, extra=None):
+        """
+        Métricas no formato de texto do Prometheus
+        """
+        lines = []
+
+        def family(name, kind, description):
+            lines.append(f'# HELP {name} {description}')
+            lines.append(f'# TYPE {name} {kind}')
+
+        with self._lock:
+            family('http_request_duration_seconds', 'histogram', 'Duração das requisições por endpoint')
+            for (endpoint, method, status), histogram in sorted(self.latency.items()):
+                lines.extend(histogram.render(
+                    'http_request_duration_seconds', {'endpoint': endpoint, 'method': method, 'status': status}
+                ))
+            family('http_request_sql_statements', 'histogram', 'Comandos SQL por requisição')
+            for endpoint, histogram in sorted(self.sql_per_request.items()):
+                lines.extend(histogram.render('http_request_sql_statements', {'endpoint': endpoint}))
+            for name, description, counter in (
+                ('sql_statements_total', 'Comandos SQL executados', self.sql_statements),
+                ('sql_duration_seconds_total', 'Tempo gasto em comandos SQL', self.sql_seconds),
+                ('sql_slow_queries_total', 'Consultas acima de SLOW_QUERY_MS', self.slow_queries),
+                ('sql_n_plus_one_total', 'Comandos repetidos N_PLUS_ONE_THRESHOLD vezes numa requisição',
+                 self.n_plus_one),
+                ('http_request_errors_total', 'Respostas com status 5xx', self.errors),
+                ('profiles_total', 'Perfis do cProfile gravados', self.profiles),
+            ):
+                family(name, 'counter', description)
+                for endpoint, value in sorted(counter.items()):
+                    lines.append(f'{name}{_labels(endpoint=endpoint)} {value}')
+            family('process_metrics_start_time_seconds', 'gauge', 'Início da coleta neste processo')
+            lines.append(f'process_metrics_start_time_seconds {self.started_at}')
+
+        for name, kind, description, value in extra or ():
+            family(name, kind, description)
+            lines.append(f'{name} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+# Instância global da instrumentação
+instrumentation = Instrumentation.from_env()
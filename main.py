@@ -6,32 +6,75 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 from flask import Flask, send_from_directory
 from flask_cors import CORS
 from src.models.professional import db
+from src.database import configure_engine, database_uri, engine_options
+from src.migrations import run_migrations
 from src.routes.user import user_bp
 from src.routes.professional import professional_bp
 from src.routes.service import service_bp
 from src.routes.schedule import schedule_bp
 from src.routes.appointment import appointment_bp
 from src.routes.reports import reports_bp
+from src.routes.availability import availability_bp
+from src.routes.directory import directory_bp
+from src.routes.auth import auth_bp
+from src.routes.notification_templates import notification_templates_bp
+from src.routes.metrics import metrics_bp
+from src.routes.waitlist import waitlist_bp
+from src.routes.recurrence import recurrence_bp
+from src.services.notification_service import notification_service
+from src.services.notification_queue import notification_queue
+from src.services.serialization import FastJSONProvider
+from src.services.instrumentation import instrumentation
+from src.services.waitlist_backfill import waitlist
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
 app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
+# jsonify com orjson quando instalado (mesmo formato do provedor padrão)
+app.json = FastJSONProvider(app)
 
 # Habilitar CORS para todas as rotas
 CORS(app)
 
 app.register_blueprint(user_bp, url_prefix='/api')
+# Registrado antes das demais rotas de profissionais para que a consulta de
+# disponibilidade seja atendida pelo motor de disponibilidade em cache
+app.register_blueprint(availability_bp, url_prefix='/api')
+# Idem para o diretório público, servido a partir do cache em memória
+app.register_blueprint(directory_bp, url_prefix='/api')
+# Idem para a leitura do perfil, servida pelo cache de identidades
+app.register_blueprint(auth_bp, url_prefix='/api')
 app.register_blueprint(professional_bp, url_prefix='/api')
 app.register_blueprint(service_bp, url_prefix='/api')
 app.register_blueprint(schedule_bp, url_prefix='/api')
 app.register_blueprint(appointment_bp, url_prefix='/api')
 app.register_blueprint(reports_bp, url_prefix='/api')
+app.register_blueprint(notification_templates_bp, url_prefix='/api')
+app.register_blueprint(waitlist_bp, url_prefix='/api')
+app.register_blueprint(recurrence_bp, url_prefix='/api')
+app.register_blueprint(metrics_bp)
+
+# Latência e comandos SQL por endpoint, consultas lentas e perfis sob demanda
+instrumentation.init_app(app)
+# Horários liberados por cancelamentos vão para a lista de espera ao fim da requisição
+waitlist.init_app(app)
 
 # uncomment if you need to use database
-app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
+app.config['SQLALCHEMY_DATABASE_URI'] = database_uri(
+    f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
+)
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 db.init_app(app)
 with app.app_context():
+    configure_engine(db.engine)
+    instrumentation.init_engine(db.engine)
     db.create_all()
+    run_migrations()
+
+# Workers da fila de notificações (NOTIFICATION_WORKERS=0 desativa neste processo)
+notification_workers = int(os.environ.get('NOTIFICATION_WORKERS', 2))
+if notification_workers > 0:
+    notification_queue.start(app, notification_service.send_job, notification_workers)
 
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
@@ -0,0 +1,38 @@
+from src.models.professional import db
+from datetime import datetime
+
+class MessageTemplate(db.Model):
+    """
+    Texto personalizado de uma notificação de WhatsApp.
+
+    Sem `professional_id` o modelo vale para todos os profissionais; os
+    campos entre chaves (`{client_name}`, `{date}`...) são preenchidos por
+    src/services/message_templates.py.
+    """
+    __tablename__ = 'message_template'
+
+    id = db.Column(db.Integer, primary_key=True)
+    professional_id = db.Column(db.Integer, db.ForeignKey('professional.id'))
+    kind = db.Column(db.String(40), nullable=False)  # client_confirmation, professional_notification, reminder, cancellation, professional_cancellation
+    locale = db.Column(db.String(10), nullable=False, default='pt_BR')
+    body = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('professional_id', 'kind', 'locale', name='uq_message_template_professional_kind_locale'),
+    )
+
+    def __repr__(self):
+        return f'<MessageTemplate {self.kind} {self.locale}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'professional_id': self.professional_id,
+            'kind': self.kind,
+            'locale': self.locale,
+            'body': self.body,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
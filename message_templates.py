@@ -0,0 +1,404 @@
+import os
+import threading
+import time as clock
+from collections import OrderedDict
+from functools import lru_cache
+from string import Formatter
+from sqlalchemy import event, false, select
+from sqlalchemy.orm import Session
+from src.models.professional import db, Professional
+from src.models.service import Service
+from src.models.appointment import Appointment
+from src.models.message_template import MessageTemplate
+
+DEFAULT_LOCALE = os.environ.get('NOTIFICATION_LOCALE', 'pt_BR')
+
+# Campos disponíveis para os modelos de mensagem
+CONTEXT_FIELDS = (
+    'client_name', 'client_phone', 'client_email', 'client_address', 'notes',
+    'professional_name', 'professional_phone', 'professional_address',
+    'service_name', 'date', 'time', 'date_iso', 'time_iso', 'reason', 'reason_line'
+)
+
+KINDS = ('client_confirmation', 'professional_notification', 'reminder', 'cancellation', 'professional_cancellation')
+
+LOCALES = {
+    'pt_BR': {
+        'date_format': '%d/%m/%Y',
+        'defaults': {
+            'service_name': 'Serviço',
+            'professional_address': 'A definir',
+            'client_email': 'Não informado',
+            'client_address': 'Não informado',
+            'notes': 'Nenhuma observação',
+            'reason_line': '*Motivo:* {reason}'
+        },
+        'templates': {
+            'client_confirmation': """🗓️ *Agendamento Confirmado!*
+
+Olá {client_name}!
+
+Seu agendamento foi confirmado com sucesso:
+
+👨‍⚕️ *Profissional:* {professional_name}
+🛠️ *Serviço:* {service_name}
+📅 *Data:* {date}
+⏰ *Horário:* {time}
+
+📍 *Local:* {professional_address}
+
+📞 *Contato do profissional:* {professional_phone}
+
+⚠️ *Importante:* Chegue com 10 minutos de antecedência.
+
+Em caso de dúvidas ou necessidade de reagendamento, entre em contato conosco.
+
+Obrigado por escolher nossos serviços! 😊""",
+            'professional_notification': """📋 *Novo Agendamento!*
+
+Você tem um novo agendamento:
+
+👤 *Cliente:* {client_name}
+📞 *Telefone:* {client_phone}
+🛠️ *Serviço:* {service_name}
+📅 *Data:* {date}
+⏰ *Horário:* {time}
+
+📧 *Email:* {client_email}
+📍 *Endereço do cliente:* {client_address}
+
+💬 *Observações:* {notes}
+
+Acesse seu painel para gerenciar este agendamento.""",
+            'reminder': """⏰ *Lembrete de Agendamento*
+
+Olá {client_name}!
+
+Lembramos que você tem um agendamento amanhã:
+
+👨‍⚕️ *Profissional:* {professional_name}
+🛠️ *Serviço:* {service_name}
+📅 *Data:* {date}
+⏰ *Horário:* {time}
+
+📍 *Local:* {professional_address}
+
+Não esqueça! Chegue com 10 minutos de antecedência.
+
+📞 *Contato:* {professional_phone}""",
+            'cancellation': """❌ *Agendamento Cancelado*
+
+Olá {client_name},
+
+Informamos que seu agendamento foi cancelado:
+
+👨‍⚕️ *Profissional:* {professional_name}
+🛠️ *Serviço:* {service_name}
+📅 *Data:* {date}
+⏰ *Horário:* {time}
+
+{reason_line}
+
+Para reagendar, acesse nosso site ou entre em contato.
+
+📞 *Contato:* {professional_phone}
+
+Pedimos desculpas pelo inconveniente.""",
+            'professional_cancellation': "Agendamento cancelado: {client_name} - {date_iso} {time_iso}"
+        }
+    },
+    'en_US': {
+        'date_format': '%m/%d/%Y',
+        'defaults': {
+            'service_name': 'Service',
+            'professional_address': 'To be defined',
+            'client_email': 'Not provided',
+            'client_address': 'Not provided',
+            'notes': 'No notes',
+            'reason_line': '*Reason:* {reason}'
+        },
+        'templates': {
+            'client_confirmation': """🗓️ *Appointment Confirmed!*
+
+Hi {client_name}!
+
+Your appointment has been confirmed:
+
+👨‍⚕️ *Professional:* {professional_name}
+🛠️ *Service:* {service_name}
+📅 *Date:* {date}
+⏰ *Time:* {time}
+
+📍 *Location:* {professional_address}
+
+📞 *Professional's contact:* {professional_phone}
+
+⚠️ *Important:* Please arrive 10 minutes early.
+
+If you have questions or need to reschedule, please contact us.
+
+Thank you for choosing our services! 😊""",
+            'professional_notification': """📋 *New Appointment!*
+
+You have a new appointment:
+
+👤 *Client:* {client_name}
+📞 *Phone:* {client_phone}
+🛠️ *Service:* {service_name}
+📅 *Date:* {date}
+⏰ *Time:* {time}
+
+📧 *Email:* {client_email}
+📍 *Client's address:* {client_address}
+
+💬 *Notes:* {notes}
+
+Open your dashboard to manage this appointment.""",
+            'reminder': """⏰ *Appointment Reminder*
+
+Hi {client_name}!
+
+This is a reminder of your appointment tomorrow:
+
+👨‍⚕️ *Professional:* {professional_name}
+🛠️ *Service:* {service_name}
+📅 *Date:* {date}
+⏰ *Time:* {time}
+
+📍 *Location:* {professional_address}
+
+Don't forget! Please arrive 10 minutes early.
+
+📞 *Contact:* {professional_phone}""",
+            'cancellation': """❌ *Appointment Cancelled*
+
+Hi {client_name},
+
+Your appointment has been cancelled:
+
+👨‍⚕️ *Professional:* {professional_name}
+🛠️ *Service:* {service_name}
+📅 *Date:* {date}
+⏰ *Time:* {time}
+
+{reason_line}
+
+To reschedule, visit our website or contact us.
+
+📞 *Contact:* {professional_phone}
+
+We apologize for the inconvenience.""",
+            'professional_cancellation': "Appointment cancelled: {client_name} - {date_iso} {time_iso}"
+        }
+    }
+}
+
+
+@lru_cache(maxsize=512)
+def compile_template(body):
+    """
+    Converte o texto do modelo em uma tupla de (trecho fixo, campo).
+
+    Levanta ValueError para chaves desbalanceadas ou campos desconhecidos.
+    """
+    parts = []
+    for literal, field, format_spec, conversion in Formatter().parse(body):
+        if field is not None and (field not in CONTEXT_FIELDS or format_spec or conversion):
+            raise ValueError(f"Campo inválido no modelo: {{{field}}}")
+        parts.append((literal, field))
+    return tuple(parts)
+
+
+def render_compiled(parts, context):
+    return ''.join(literal + context[field] if field else literal for literal, field in parts)
+
+
+@lru_cache(maxsize=4096)
+def _format_date(value, date_format=None):
+    return value.strftime(date_format) if date_format else str(value)
+
+
+@lru_cache(maxsize=4096)
+def _format_time(value, time_format=None):
+    return value.strftime(time_format) if time_format else str(value)
+
+
+def _locale(locale):
+    return locale if locale in LOCALES else DEFAULT_LOCALE
+
+
+class MessageTemplates:
+    """
+    Modelos de mensagem compilados, com cache LRU por (profissional, tipo, idioma).
+
+    O modelo de um profissional tem precedência sobre o modelo global
+    cadastrado, que tem precedência sobre o texto padrão do idioma.
+    Alterações feitas neste processo limpam o cache na hora; as de outros
+    processos valem após `ttl_seconds`.
+    """
+
+    def __init__(self, maxsize=4096, ttl_seconds=300):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._templates = OrderedDict()
+        self._lock = threading.Lock()
+
+    def context_query(self):
+        """
+        Consulta das colunas usadas nas mensagens, sem carregar objetos do ORM.
+
+        A ordem das colunas é a esperada por `build_context`.
+        """
+        return db.session.query(
+            Appointment.id.label('appointment_id'),
+            Appointment.professional_id,
+            Appointment.client_name,
+            Appointment.client_phone,
+            Appointment.client_email,
+            Appointment.client_address,
+            Appointment.notes,
+            Appointment.appointment_date,
+            Appointment.appointment_time,
+            Professional.name.label('professional_name'),
+            Professional.phone.label('professional_phone'),
+            Professional.address.label('professional_address'),
+            Service.name.label('service_name')
+        ).join(
+            Professional, Professional.id == Appointment.professional_id
+        ).outerjoin(
+            Service, Service.id == Appointment.service_id
+        )
+
+    def load_context(self, appointment_id):
+        return self.context_query().filter(Appointment.id == appointment_id).first()
+
+    def build_context(self, record, locale=None, reason=''):
+        """
+        Monta os campos do modelo a partir de um registro de `context_query`
+        """
+        # Desempacotar a linha é bem mais barato que ler cada atributo do Row
+        (_, _, client_name, client_phone, client_email, client_address, notes,
+         appointment_date, appointment_time, professional_name, professional_phone,
+         professional_address, service_name) = record
+
+        settings = LOCALES[_locale(locale)]
+        defaults = settings['defaults']
+        return {
+            'client_name': client_name,
+            'client_phone': client_phone,
+            'client_email': client_email or defaults['client_email'],
+            'client_address': client_address or defaults['client_address'],
+            'notes': notes or defaults['notes'],
+            'professional_name': professional_name,
+            'professional_phone': professional_phone,
+            'professional_address': professional_address or defaults['professional_address'],
+            'service_name': service_name or defaults['service_name'],
+            'date': _format_date(appointment_date, settings['date_format']),
+            'time': _format_time(appointment_time, '%H:%M'),
+            'date_iso': _format_date(appointment_date),
+            'time_iso': _format_time(appointment_time),
+            'reason': reason or '',
+            'reason_line': defaults['reason_line'].format(reason=reason) if reason else ''
+        }
+
+    def render(self, kind, record, locale=None, reason=''):
+        """
+        Gera a mensagem `kind` para um registro de `context_query`
+        """
+        parts = self.get(kind, record.professional_id, locale)
+        return render_compiled(parts, self.build_context(record, locale, reason))
+
+    def get(self, kind, professional_id=None, locale=None):
+        """
+        Retorna o modelo compilado efetivo para o profissional e idioma
+        """
+        locale = _locale(locale)
+        key = (professional_id, kind, locale)
+        now = clock.monotonic()
+        with self._lock:
+            cached = self._templates.get(key)
+            if cached is not None and now - cached[1] < self.ttl_seconds:
+                self._templates.move_to_end(key)
+                return cached[0]
+
+        parts = compile_template(self.body(kind, professional_id, locale))
+        with self._lock:
+            self._templates[key] = (parts, now)
+            self._templates.move_to_end(key)
+            while len(self._templates) > self.maxsize:
+                self._templates.popitem(last=False)
+        return parts
+
+    def preload(self, kind, professional_ids, locale=None):
+        """
+        Carrega no cache, com uma consulta, os modelos de vários profissionais
+        """
+        locale = _locale(locale)
+        professional_ids = list(set(professional_ids))
+        bodies = {}
+        for offset in range(0, len(professional_ids), 500):
+            chunk = professional_ids[offset:offset + 500]
+            bodies.update(db.session.execute(
+                select(MessageTemplate.professional_id, MessageTemplate.body).where(
+                    MessageTemplate.kind == kind,
+                    MessageTemplate.locale == locale,
+                    db.or_(MessageTemplate.professional_id.in_(chunk), MessageTemplate.professional_id.is_(None))
+                )
+            ).all())
+
+        default = bodies.get(None, LOCALES[locale]['templates'][kind])
+        now = clock.monotonic()
+        with self._lock:
+            for professional_id in professional_ids:
+                key = (professional_id, kind, locale)
+                self._templates[key] = (compile_template(bodies.get(professional_id, default)), now)
+                self._templates.move_to_end(key)
+            while len(self._templates) > self.maxsize:
+                self._templates.popitem(last=False)
+
+    def body(self, kind, professional_id=None, locale=None):
+        """
+        Texto efetivo do modelo (personalizado ou padrão)
+        """
+        locale = _locale(locale)
+        if kind not in KINDS:
+            raise ValueError(f"Tipo de mensagem desconhecido: {kind}")
+
+        owner = MessageTemplate.professional_id == professional_id if professional_id else false()
+        custom = db.session.execute(
+            select(MessageTemplate.body).where(
+                MessageTemplate.kind == kind,
+                MessageTemplate.locale == locale,
+                db.or_(owner, MessageTemplate.professional_id.is_(None))
+            ).order_by(MessageTemplate.professional_id.is_(None))
+        ).first()
+        if custom:
+            return custom.body
+        return LOCALES[locale]['templates'][kind]
+
+    def invalidate(self):
+        with self._lock:
+            self._templates.clear()
+
+
+# Instância global dos modelos de mensagem
+message_templates = MessageTemplates()
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_message_template_changes(session, flush_context):
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, MessageTemplate):
+            session.info['message_templates_changed'] = True
+            return
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_message_templates(session):
+    if session.info.pop('message_templates_changed', False):
+        message_templates.invalidate()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_message_template_changes(session):
+    session.info.pop('message_templates_changed', None)
@@ -0,0 +1,43 @@
+import hmac
+import os
+from flask import Blueprint, request, jsonify, current_app
+from src.services.instrumentation import instrumentation
+from src.services.notification_service import notification_service
+
+metrics_bp = Blueprint('metrics', __name__)
+
+# Token exigido do Prometheus (Authorization: Bearer). Sem ele o endpoint fica
+# desligado: atrás do Nginx todas as requisições chegam de 127.0.0.1, então o
+# endereço de origem não identifica o Prometheus
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN') or None
+
+
+def webhook_metrics():
+    """
+    Pool de conexões do envio de notificações, no formato de render_prometheus
+    """
+    stats = notification_service.webhook_client.stats()
+    return [
+        ('webhook_requests_total', 'counter', 'Requisições ao webhook de notificações', stats['requests']),
+        ('webhook_failures_total', 'counter', 'Falhas no envio ao webhook', stats['failures']),
+        ('webhook_in_flight', 'gauge', 'Requisições ao webhook em andamento', stats['in_flight']),
+        ('webhook_connections_opened_total', 'counter', 'Conexões abertas com o webhook',
+         stats['connections_opened']),
+    ]
+
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """
+    Métricas deste processo no formato de texto do Prometheus (requer METRICS_TOKEN)
+    """
+    if not METRICS_TOKEN:
+        return jsonify({'error': 'Métricas desativadas'}), 404
+    scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+    if scheme.lower() != 'bearer' or not hmac.compare_digest(token.strip(), METRICS_TOKEN):
+        return jsonify({'error': 'Acesso negado'}), 403
+    try:
+        body = instrumentation.render_prometheus(extra=webhook_metrics())
+        return current_app.response_class(body, mimetype='text/plain; version=0.0.4; charset=utf-8')
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,98 @@
+from datetime import datetime
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from src.models.professional import db
+from src.models.appointment import Appointment
+from src.models.service import Service
+from src.models.schedule import Schedule
+from src.models.daily_rollup import DailyRollup
+from src.models.notification_job import NotificationJob
+from src.models.slot_occupancy import SlotOccupancy
+from src.models.waitlist_entry import WaitlistEntry
+from src.models.recurrence_rule import RecurrenceRule
+from src.models.recurrence_exception import RecurrenceException
+from src.services.report_rollup import rebuild_rollups
+from src.services.slot_reservation import rebuild_slot_occupancy
+
+# Controle das migrações já aplicadas
+schema_migration = db.Table(
+    'schema_migration',
+    db.Column('version', db.Integer, primary_key=True),
+    db.Column('description', db.String(255), nullable=False),
+    db.Column('applied_at', db.DateTime, nullable=False)
+)
+
+def _create_indexes(connection, model, *names):
+    indexes = {index.name: index for index in model.__table__.indexes}
+    for name in names:
+        indexes[name].create(bind=connection, checkfirst=True)
+
+def _add_report_indexes(connection):
+    _create_indexes(
+        connection, Appointment,
+        'ix_appointment_professional_date_time',
+        'ix_appointment_professional_status_date',
+        'ix_appointment_service',
+        'ix_appointment_date_reminder'
+    )
+    _create_indexes(connection, Service, 'ix_service_professional_active')
+    _create_indexes(connection, Schedule, 'ix_schedule_professional_day')
+
+def _create_daily_rollup(connection):
+    DailyRollup.__table__.create(bind=connection, checkfirst=True)
+    rebuild_rollups(connection)
+
+def _add_notification_job_indexes(connection):
+    NotificationJob.__table__.create(bind=connection, checkfirst=True)
+    _create_indexes(connection, NotificationJob, 'ix_notification_job_appointment_kind')
+
+def _create_slot_occupancy(connection):
+    SlotOccupancy.__table__.create(bind=connection, checkfirst=True)
+    rebuild_slot_occupancy(connection)
+
+def _create_waitlist(connection):
+    WaitlistEntry.__table__.create(bind=connection, checkfirst=True)
+    _create_indexes(connection, WaitlistEntry, 'ix_waitlist_entry_professional_date_status')
+
+def _create_recurrence(connection):
+    RecurrenceRule.__table__.create(bind=connection, checkfirst=True)
+    RecurrenceException.__table__.create(bind=connection, checkfirst=True)
+    _create_indexes(connection, RecurrenceRule, 'ix_recurrence_rule_professional')
+
+# (versão, descrição, função) em ordem de aplicação
+MIGRATIONS = [
+    (1, 'Índices de agendamentos, serviços e horários', _add_report_indexes),
+    (2, 'Agregado diário de relatórios', _create_daily_rollup),
+    (3, 'Índice de jobs de notificação por agendamento', _add_notification_job_indexes),
+    (4, 'Ocupação dos horários para reserva atômica', _create_slot_occupancy),
+    (5, 'Lista de espera', _create_waitlist),
+    (6, 'Agendamentos recorrentes', _create_recurrence),
+]
+
+def run_migrations():
+    """
+    Aplica as migrações pendentes no banco configurado.
+
+    `db.create_all()` só cria tabelas novas; índices e colunas adicionados a
+    tabelas já existentes precisam passar por aqui.
+    """
+    for version, description, migrate in MIGRATIONS:
+        try:
+            with db.engine.begin() as connection:
+                schema_migration.create(connection, checkfirst=True)
+                applied = connection.execute(
+                    select(schema_migration.c.version).where(schema_migration.c.version == version)
+                ).first()
+                if applied:
+                    continue
+
+                migrate(connection)
+                connection.execute(schema_migration.insert().values(
+                    version=version,
+                    description=description,
+                    applied_at=datetime.utcnow()
+                ))
+                print(f"Migração {version} aplicada: {description}")
+        except IntegrityError:
+            # Outro processo aplicou a mesma migração ao mesmo tempo
+            continue
@@ -0,0 +1,51 @@
+from src.models.professional import db
+from datetime import datetime
+
+class NotificationJob(db.Model):
+    """
+    Mensagem de WhatsApp na fila de envio (outbox).
+
+    Os jobs são gravados pela requisição e enviados pelos workers de
+    src/services/notification_queue.py, com novas tentativas e descarte
+    após `max_attempts` falhas.
+    """
+    __tablename__ = 'notification_job'
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(40), nullable=False)  # confirmation_client, confirmation_professional, reminder, cancellation_client, cancellation_professional
+    appointment_id = db.Column(db.Integer, db.ForeignKey('appointment.id'))
+    phone = db.Column(db.String(20), nullable=False)
+    message = db.Column(db.Text, nullable=False)
+
+    # Controle de envio
+    status = db.Column(db.String(20), nullable=False, default='pendente')  # pendente, processando, enviado, descartado
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    locked_at = db.Column(db.DateTime)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index('ix_notification_job_status_next_attempt', 'status', 'next_attempt_at'),
+        db.Index('ix_notification_job_appointment_kind', 'appointment_id', 'kind'),
+    )
+
+    def __repr__(self):
+        return f'<NotificationJob {self.kind} {self.status}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'appointment_id': self.appointment_id,
+            'phone': self.phone,
+            'status': self.status,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'next_attempt_at': self.next_attempt_at.isoformat() if self.next_attempt_at else None,
+            'last_error': self.last_error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'sent_at': self.sent_at.isoformat() if self.sent_at else None
+        }
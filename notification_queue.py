@@ -0,0 +1,181 @@
+import random
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import and_, or_
+from src.models.professional import db
+from src.models.appointment import Appointment
+from src.models.notification_job import NotificationJob
+
+# Flag do agendamento marcada quando um job daquele tipo é enviado
+DELIVERED_FLAGS = {
+    'confirmation_client': 'notification_sent',
+    'reminder': 'reminder_sent'
+}
+
+
+class NotificationQueue:
+    """
+    Fila de notificações persistida na tabela `notification_job`.
+
+    As requisições apenas gravam o job; um pool de threads por processo
+    retira os jobs pendentes e faz o envio, com backoff exponencial entre
+    as tentativas e descarte (dead letter) após `max_attempts` falhas.
+    """
+
+    def __init__(self, max_attempts=5, backoff_seconds=30, max_backoff_seconds=3600,
+                 poll_interval=2.0, lock_timeout_seconds=300):
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.poll_interval = poll_interval
+        self.lock_timeout_seconds = lock_timeout_seconds
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._threads = []
+
+    def enqueue(self, kind, phone, message, appointment_id=None, commit=True):
+        """
+        Grava uma mensagem para envio assíncrono
+        """
+        job = NotificationJob(
+            kind=kind,
+            phone=phone,
+            message=message,
+            appointment_id=appointment_id,
+            max_attempts=self.max_attempts,
+            next_attempt_at=datetime.utcnow()
+        )
+        db.session.add(job)
+        if commit:
+            db.session.commit()
+        self.wake()
+        return job
+
+    def wake(self):
+        """
+        Acorda os workers para jobs gravados fora de `enqueue`
+        """
+        self._wakeup.set()
+
+    def start(self, app, sender, workers=2):
+        """
+        Inicia `workers` threads que enviam os jobs com `sender(job)`.
+
+        `sender` deve levantar uma exceção em caso de falha.
+        """
+        self._stopping.clear()
+        for i in range(workers):
+            thread = threading.Thread(
+                target=self._run,
+                args=(app, sender),
+                name=f'notification-worker-{i}',
+                daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=None):
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _run(self, app, sender):
+        while not self._stopping.is_set():
+            try:
+                with app.app_context():
+                    processed = self.process_next(sender)
+            except Exception as e:
+                print(f"Erro no worker de notificações: {str(e)}")
+                processed = False
+
+            if not processed:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    def process_next(self, sender):
+        """
+        Envia o próximo job disponível; retorna False se a fila estiver vazia
+        """
+        job = self._claim_next()
+        if job is None:
+            return False
+
+        try:
+            sender(job)
+        except Exception as e:
+            self._mark_failed(job, str(e))
+        else:
+            self._mark_sent(job)
+        return True
+
+    def _claim_next(self):
+        now = datetime.utcnow()
+        stale_lock = now - timedelta(seconds=self.lock_timeout_seconds)
+        claimable = or_(
+            NotificationJob.status == 'pendente',
+            # Job de um worker que morreu durante o envio
+            and_(NotificationJob.status == 'processando', NotificationJob.locked_at < stale_lock)
+        )
+
+        candidates = db.session.query(NotificationJob.id).filter(
+            claimable,
+            NotificationJob.next_attempt_at <= now
+        ).order_by(NotificationJob.next_attempt_at).limit(5).all()
+
+        for (job_id,) in candidates:
+            # Só um worker (de qualquer processo) consegue mudar o status
+            claimed = NotificationJob.query.filter(
+                NotificationJob.id == job_id,
+                claimable
+            ).update({'status': 'processando', 'locked_at': now}, synchronize_session=False)
+            db.session.commit()
+            if claimed:
+                return db.session.get(NotificationJob, job_id)
+        return None
+
+    def _mark_sent(self, job):
+        job.status = 'enviado'
+        job.attempts += 1
+        job.sent_at = datetime.utcnow()
+        job.locked_at = None
+        job.last_error = None
+
+        flag = DELIVERED_FLAGS.get(job.kind)
+        if flag and job.appointment_id:
+            Appointment.query.filter_by(id=job.appointment_id).update(
+                {flag: True}, synchronize_session=False
+            )
+        db.session.commit()
+
+    def _mark_failed(self, job, error):
+        job.attempts += 1
+        job.locked_at = None
+        job.last_error = error
+        if job.attempts >= job.max_attempts:
+            job.status = 'descartado'
+            print(f"Notificação {job.id} descartada após {job.attempts} tentativas: {error}")
+        else:
+            # Backoff exponencial com variação aleatória
+            delay = min(self.backoff_seconds * 2 ** (job.attempts - 1), self.max_backoff_seconds)
+            job.status = 'pendente'
+            job.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay * random.uniform(0.8, 1.2))
+        db.session.commit()
+
+    def requeue_dead_letters(self):
+        """
+        Devolve para a fila os jobs descartados
+        """
+        count = NotificationJob.query.filter_by(status='descartado').update({
+            'status': 'pendente',
+            'attempts': 0,
+            'next_attempt_at': datetime.utcnow()
+        }, synchronize_session=False)
+        db.session.commit()
+        self._wakeup.set()
+        return count
+
+
+# Instância global da fila de notificações
+notification_queue = NotificationQueue()
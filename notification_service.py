@@ -1,13 +1,29 @@
-import requests
+import os
 import json
 from datetime import datetime
+from urllib.parse import urlparse
 from src.models.professional import db
-from src.models.appointment import Appointment
+from src.services.notification_queue import notification_queue
+from src.services.webhook_client import WebhookClient
+from src.services.async_sender import AsyncNotificationSender
+from src.services.message_templates import message_templates
+
+class NotificationError(Exception):
+    pass
 
 class NotificationService:
     def __init__(self):
         # Configurações para n8n webhook
-        self.n8n_webhook_url = "http://localhost:5678/webhook/whatsapp-notification"
+        self.n8n_webhook_url = os.environ.get(
+            'N8N_WEBHOOK_URL', "http://localhost:5678/webhook/whatsapp-notification"
+        )
+        self.gateway = urlparse(self.n8n_webhook_url).netloc
+        
+        # Conexões persistentes reaproveitadas entre os envios
+        self.webhook_client = WebhookClient.from_env()
+        
+        # Envio em lote com concorrência e taxa limitadas por gateway
+        self.async_sender = AsyncNotificationSender.from_env()
         
         # Configurações para Evolution API
         self.evolution_api_url = "http://localhost:8080"
@@ -18,123 +34,140 @@ class NotificationService:
         Envia mensagem via WhatsApp usando n8n + Evolution API
         """
         try:
-            # Preparar dados para o webhook do n8n
-            payload = {
-                "phone": self._format_phone(phone),
-                "message": message,
-                "appointment_id": appointment_id,
-                "timestamp": datetime.utcnow().isoformat()
-            }
-            
-            # Enviar para n8n webhook
-            response = requests.post(
-                self.n8n_webhook_url,
-                json=payload,
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                print(f"Notificação enviada com sucesso para {phone}")
-                return True
-            else:
-                print(f"Erro ao enviar notificação: {response.status_code}")
-                return False
-                
+            self._post_whatsapp_message(phone, message, appointment_id)
+            print(f"Notificação enviada com sucesso para {phone}")
+            return True
         except Exception as e:
             print(f"Erro ao enviar notificação WhatsApp: {str(e)}")
             return False
     
+    def deliver_job(self, job):
+        """
+        Envia um job da fila de notificações (levanta exceção em caso de falha)
+        """
+        self._post_whatsapp_message(job.phone, job.message, job.appointment_id)
+    
+    def send_job(self, job):
+        """
+        Envia um job da fila respeitando o limite de taxa do gateway, o
+        mesmo dos lotes de `send_jobs` (workers da fila de notificações)
+        """
+        self.async_sender.acquire(self.gateway)
+        self.deliver_job(job)
+    
+    def send_jobs(self, jobs, send=None):
+        """
+        Envia vários jobs em paralelo, respeitando o limite de taxa do gateway.
+        
+        Retorna os erros (None para os enviados) e as estatísticas do lote.
+        """
+        return self.async_sender.send_batch(jobs, send or self.deliver_job, lambda job: self.gateway)
+    
+    def _post_whatsapp_message(self, phone, message, appointment_id=None):
+        # Preparar dados para o webhook do n8n
+        payload = {
+            "phone": self._format_phone(phone),
+            "message": message,
+            "appointment_id": appointment_id,
+            "timestamp": datetime.utcnow().isoformat()
+        }
+        
+        # Enviar para n8n webhook
+        response = self.webhook_client.post(
+            self.n8n_webhook_url,
+            json=payload
+        )
+        
+        if response.status_code != 200:
+            raise NotificationError(f"Webhook respondeu {response.status_code}")
+    
     def send_appointment_confirmation(self, appointment_id):
         """
-        Envia confirmação de agendamento para cliente e profissional
+        Enfileira a confirmação de agendamento para cliente e profissional
         """
         try:
-            appointment = Appointment.query.get(appointment_id)
-            if not appointment:
+            record = message_templates.load_context(appointment_id)
+            if not record:
                 return False
             
             # Mensagem para o cliente
-            client_message = self._get_client_confirmation_message(appointment)
-            client_sent = self.send_whatsapp_message(
-                appointment.client_phone, 
-                client_message, 
-                appointment_id
+            notification_queue.enqueue(
+                'confirmation_client',
+                record.client_phone,
+                message_templates.render('client_confirmation', record),
+                appointment_id,
+                commit=False
             )
             
             # Mensagem para o profissional
-            professional_message = self._get_professional_notification_message(appointment)
-            professional_sent = self.send_whatsapp_message(
-                appointment.professional.phone, 
-                professional_message, 
-                appointment_id
+            notification_queue.enqueue(
+                'confirmation_professional',
+                record.professional_phone,
+                message_templates.render('professional_notification', record),
+                appointment_id,
+                commit=False
             )
             
-            # Atualizar status de notificação
-            if client_sent:
-                appointment.notification_sent = True
-                db.session.commit()
-            
-            return client_sent and professional_sent
+            db.session.commit()
+            return True
             
         except Exception as e:
-            print(f"Erro ao enviar confirmação de agendamento: {str(e)}")
+            print(f"Erro ao enfileirar confirmação de agendamento: {str(e)}")
             return False
     
     def send_appointment_reminder(self, appointment_id):
         """
-        Envia lembrete de agendamento
+        Enfileira o lembrete de agendamento
         """
         try:
-            appointment = Appointment.query.get(appointment_id)
-            if not appointment:
+            record = message_templates.load_context(appointment_id)
+            if not record:
                 return False
             
-            reminder_message = self._get_reminder_message(appointment)
-            sent = self.send_whatsapp_message(
-                appointment.client_phone, 
-                reminder_message, 
+            notification_queue.enqueue(
+                'reminder',
+                record.client_phone,
+                message_templates.render('reminder', record),
                 appointment_id
             )
-            
-            if sent:
-                appointment.reminder_sent = True
-                db.session.commit()
-            
-            return sent
+            return True
             
         except Exception as e:
-            print(f"Erro ao enviar lembrete: {str(e)}")
+            print(f"Erro ao enfileirar lembrete: {str(e)}")
             return False
     
     def send_appointment_cancellation(self, appointment_id, reason=""):
         """
-        Envia notificação de cancelamento
+        Enfileira a notificação de cancelamento
         """
         try:
-            appointment = Appointment.query.get(appointment_id)
-            if not appointment:
+            record = message_templates.load_context(appointment_id)
+            if not record:
                 return False
             
-            cancellation_message = self._get_cancellation_message(appointment, reason)
-            
             # Enviar para cliente
-            client_sent = self.send_whatsapp_message(
-                appointment.client_phone, 
-                cancellation_message, 
-                appointment_id
+            notification_queue.enqueue(
+                'cancellation_client',
+                record.client_phone,
+                message_templates.render('cancellation', record, reason=reason),
+                appointment_id,
+                commit=False
             )
             
             # Enviar para profissional
-            professional_sent = self.send_whatsapp_message(
-                appointment.professional.phone, 
-                f"Agendamento cancelado: {appointment.client_name} - {appointment.appointment_date} {appointment.appointment_time}", 
-                appointment_id
+            notification_queue.enqueue(
+                'cancellation_professional',
+                record.professional_phone,
+                message_templates.render('professional_cancellation', record),
+                appointment_id,
+                commit=False
             )
             
-            return client_sent and professional_sent
+            db.session.commit()
+            return True
             
         except Exception as e:
-            print(f"Erro ao enviar cancelamento: {str(e)}")
+            print(f"Erro ao enfileirar cancelamento: {str(e)}")
             return False
     
     def _format_phone(self, phone):
@@ -153,116 +186,6 @@ class NotificationService:
             return f"55{clean_phone}"
         else:
             return clean_phone
-    
-    def _get_client_confirmation_message(self, appointment):
-        """
-        Gera mensagem de confirmação para o cliente
-        """
-        service_name = appointment.service.name if appointment.service else "Serviço"
-        date_formatted = appointment.appointment_date.strftime('%d/%m/%Y')
-        
-        message = f"""🗓️ *Agendamento Confirmado!*
-
-Olá {appointment.client_name}!
-
-Seu agendamento foi confirmado com sucesso:
-
-👨‍⚕️ *Profissional:* {appointment.professional.name}
-🛠️ *Serviço:* {service_name}
-📅 *Data:* {date_formatted}
-⏰ *Horário:* {appointment.appointment_time.strftime('%H:%M')}
-
-📍 *Local:* {appointment.professional.address or 'A definir'}
-
-📞 *Contato do profissional:* {appointment.professional.phone}
-
-⚠️ *Importante:* Chegue com 10 minutos de antecedência.
-
-Em caso de dúvidas ou necessidade de reagendamento, entre em contato conosco.
-
-Obrigado por escolher nossos serviços! 😊"""
-
-        return message
-    
-    def _get_professional_notification_message(self, appointment):
-        """
-        Gera mensagem de notificação para o profissional
-        """
-        service_name = appointment.service.name if appointment.service else "Serviço"
-        date_formatted = appointment.appointment_date.strftime('%d/%m/%Y')
-        
-        message = f"""📋 *Novo Agendamento!*
-
-Você tem um novo agendamento:
-
-👤 *Cliente:* {appointment.client_name}
-📞 *Telefone:* {appointment.client_phone}
-🛠️ *Serviço:* {service_name}
-📅 *Data:* {date_formatted}
-⏰ *Horário:* {appointment.appointment_time.strftime('%H:%M')}
-
-📧 *Email:* {appointment.client_email or 'Não informado'}
-📍 *Endereço do cliente:* {appointment.client_address or 'Não informado'}
-
-💬 *Observações:* {appointment.notes or 'Nenhuma observação'}
-
-Acesse seu painel para gerenciar este agendamento."""
-
-        return message
-    
-    def _get_reminder_message(self, appointment):
-        """
-        Gera mensagem de lembrete
-        """
-        service_name = appointment.service.name if appointment.service else "Serviço"
-        date_formatted = appointment.appointment_date.strftime('%d/%m/%Y')
-        
-        message = f"""⏰ *Lembrete de Agendamento*
-
-Olá {appointment.client_name}!
-
-Lembramos que você tem um agendamento amanhã:
-
-👨‍⚕️ *Profissional:* {appointment.professional.name}
-🛠️ *Serviço:* {service_name}
-📅 *Data:* {date_formatted}
-⏰ *Horário:* {appointment.appointment_time.strftime('%H:%M')}
-
-📍 *Local:* {appointment.professional.address or 'A definir'}
-
-Não esqueça! Chegue com 10 minutos de antecedência.
-
-📞 *Contato:* {appointment.professional.phone}"""
-
-        return message
-    
-    def _get_cancellation_message(self, appointment, reason=""):
-        """
-        Gera mensagem de cancelamento
-        """
-        service_name = appointment.service.name if appointment.service else "Serviço"
-        date_formatted = appointment.appointment_date.strftime('%d/%m/%Y')
-        
-        message = f"""❌ *Agendamento Cancelado*
-
-Olá {appointment.client_name},
-
-Informamos que seu agendamento foi cancelado:
-
-👨‍⚕️ *Profissional:* {appointment.professional.name}
-🛠️ *Serviço:* {service_name}
-📅 *Data:* {date_formatted}
-⏰ *Horário:* {appointment.appointment_time.strftime('%H:%M')}
-
-{f'*Motivo:* {reason}' if reason else ''}
-
-Para reagendar, acesse nosso site ou entre em contato.
-
-📞 *Contato:* {appointment.professional.phone}
-
-Pedimos desculpas pelo inconveniente."""
-
-        return message
 
 # Instância global do serviço
 notification_service = NotificationService()
@@ -0,0 +1,117 @@
+from flask import Blueprint, request, jsonify
+from src.models.professional import db
+from src.models.message_template import MessageTemplate
+from src.services.message_templates import message_templates, compile_template, KINDS, LOCALES, CONTEXT_FIELDS, DEFAULT_LOCALE
+from src.services.authentication import require_auth
+
+notification_templates_bp = Blueprint('notification_templates', __name__)
+
+@notification_templates_bp.route('/notification-templates', methods=['GET'])
+def list_templates():
+    """
+    Lista os textos efetivos de cada tipo de mensagem para o profissional logado
+    """
+    try:
+        professional = require_auth()
+        if not professional:
+            return jsonify({'error': 'Não autenticado'}), 401
+
+        locale = request.args.get('locale', DEFAULT_LOCALE)
+        if locale not in LOCALES:
+            return jsonify({'error': 'Idioma inválido'}), 400
+
+        custom = {
+            template.kind: template
+            for template in MessageTemplate.query.filter_by(professional_id=professional.id, locale=locale)
+        }
+
+        return jsonify({
+            'locale': locale,
+            'fields': list(CONTEXT_FIELDS),
+            'templates': [
+                {
+                    'kind': kind,
+                    'body': message_templates.body(kind, professional.id, locale),
+                    'custom': kind in custom,
+                    'updated_at': custom[kind].updated_at.isoformat() if kind in custom and custom[kind].updated_at else None
+                }
+                for kind in KINDS
+            ]
+        }), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@notification_templates_bp.route('/notification-templates/<kind>', methods=['PUT'])
+def save_template(kind):
+    """
+    Cria ou altera o texto personalizado de um tipo de mensagem
+    """
+    try:
+        professional = require_auth()
+        if not professional:
+            return jsonify({'error': 'Não autenticado'}), 401
+
+        if kind not in KINDS:
+            return jsonify({'error': 'Tipo de mensagem inválido'}), 400
+
+        data = request.get_json() or {}
+        body = data.get('body')
+        locale = data.get('locale', DEFAULT_LOCALE)
+        if not body:
+            return jsonify({'error': 'Campo body é obrigatório'}), 400
+        if locale not in LOCALES:
+            return jsonify({'error': 'Idioma inválido'}), 400
+
+        try:
+            compile_template(body)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        template = MessageTemplate.query.filter_by(
+            professional_id=professional.id, kind=kind, locale=locale
+        ).first()
+        if template:
+            template.body = body
+        else:
+            template = MessageTemplate(professional_id=professional.id, kind=kind, locale=locale, body=body)
+            db.session.add(template)
+        db.session.commit()
+
+        return jsonify(template.to_dict()), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@notification_templates_bp.route('/notification-templates/<kind>', methods=['DELETE'])
+def delete_template(kind):
+    """
+    Remove o texto personalizado, voltando ao padrão
+    """
+    try:
+        professional = require_auth()
+        if not professional:
+            return jsonify({'error': 'Não autenticado'}), 401
+
+        if kind not in KINDS:
+            return jsonify({'error': 'Tipo de mensagem inválido'}), 400
+
+        locale = request.args.get('locale', DEFAULT_LOCALE)
+        if locale not in LOCALES:
+            return jsonify({'error': 'Idioma inválido'}), 400
+
+        template = MessageTemplate.query.filter_by(
+            professional_id=professional.id, kind=kind, locale=locale
+        ).first()
+        if not template:
+            return jsonify({'error': 'Modelo personalizado não encontrado'}), 404
+
+        db.session.delete(template)
+        db.session.commit()
+
+        return jsonify({'message': 'Modelo removido com sucesso'}), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
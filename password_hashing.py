@@ -0,0 +1,122 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+def _process_context():
+    # Sem fork: o processo da aplicação já tem threads (fila de notificações,
+    # lembretes), e um filho criado por fork pode herdar locks presos
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+class PasswordHasherBusy(Exception):
+    """
+    Fila de cálculo de hashes cheia: a requisição deve ser recusada (429)
+    """
+
+
+class PasswordHasher:
+    """
+    Calcula e confere hashes de senha num pool de processos dedicado.
+
+    O hash do Werkzeug consome de dezenas a centenas de milissegundos de
+    CPU; fora do worker da requisição, uma rajada de logins não ocupa todos
+    os workers do Gunicorn. No máximo `workers + max_queue` cálculos ficam
+    pendentes por processo; além disso `PasswordHasherBusy` é levantada na
+    hora, sem esperar. Com `workers=0` o cálculo é feito na própria thread.
+    """
+
+    def __init__(self, workers=2, max_queue=16, method='scrypt', timeout_seconds=30):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.method = method
+        self.timeout_seconds = timeout_seconds
+        self._slots = threading.BoundedSemaphore(workers + max_queue) if workers > 0 else None
+        self._executor = None
+        self._executor_pid = None
+        self._current_prefix = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            workers=int(os.environ.get('PASSWORD_HASH_WORKERS', 2)),
+            max_queue=int(os.environ.get('PASSWORD_HASH_QUEUE', 16)),
+            method=os.environ.get('PASSWORD_HASH_METHOD', 'scrypt'),
+            timeout_seconds=float(os.environ.get('PASSWORD_HASH_TIMEOUT', 30))
+        )
+
+    def _get_executor(self):
+        with self._lock:
+            # Um pool por processo: workers do Gunicorn criam o seu após o fork
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=_process_context())
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    def _discard_executor(self, executor):
+        # Um processo do pool morreu (OOM, sinal): o pool inteiro fica quebrado
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, function, *args):
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy('Muitas requisições de login simultâneas; tente novamente em instantes')
+        try:
+            executor = self._get_executor()
+            try:
+                future = executor.submit(function, *args)
+            except BrokenProcessPool:
+                self._discard_executor(executor)
+                executor = self._get_executor()
+                future = executor.submit(function, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return executor, future
+
+    def _run(self, function, *args):
+        if self._slots is None:
+            return function(*args)
+        executor, future = self._submit(function, *args)
+        try:
+            return future.result(timeout=self.timeout_seconds)
+        except BrokenProcessPool:
+            # O cálculo se perdeu com o processo: repete uma vez num pool novo
+            self._discard_executor(executor)
+            return self._submit(function, *args)[1].result(timeout=self.timeout_seconds)
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        if not password_hash:
+            return False
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """
+        Indica se o hash foi gerado com parâmetros diferentes dos atuais
+        (algoritmo, custo), para ser regravado no próximo login
+        """
+        if self._current_prefix is None:
+            # O Werkzeug completa os parâmetros padrão ("scrypt" -> "scrypt:32768:8:1")
+            self._current_prefix = self._run(generate_password_hash, '', self.method).split('$', 1)[0]
+        return password_hash.split('$', 1)[0] != self._current_prefix
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None and self._executor_pid == os.getpid():
+                self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+# Instância global do cálculo de hashes de senha
+password_hasher = PasswordHasher.from_env()
@@ -1,6 +1,6 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+from src.services.password_hashing import password_hasher
 
 db = SQLAlchemy()
 
@@ -21,10 +21,25 @@ class Professional(db.Model):
     appointments = db.relationship('Appointment', backref='professional', lazy=True)
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
 
-    def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+    def check_password(self, password, rehash=False):
+        """
+        Confere a senha. Rotas de login passam rehash=True: se os parâmetros
+        do hash mudaram, a senha é regravada com os atuais, pendente na
+        sessão até o commit de quem chamou
+        """
+        valid = password_hasher.verify(self.password_hash, password)
+        if valid and rehash:
+            self.rehash_password(password)
+        return valid
+
+    def rehash_password(self, password):
+        """
+        Regrava a senha (já conferida) se o hash usa parâmetros antigos; não faz commit
+        """
+        if password_hasher.needs_rehash(self.password_hash):
+            self.set_password(password)
 
     def __repr__(self):
         return f'<Professional {self.name}>'
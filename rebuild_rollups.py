@@ -0,0 +1,14 @@
+import argparse
+from src.main import app, db
+from src.services.report_rollup import rebuild_rollups
+from src.services.slot_reservation import rebuild_slot_occupancy
+
+parser = argparse.ArgumentParser(description='Recalcula o agregado diário dos relatórios e a ocupação dos horários')
+parser.add_argument('--professional-id', type=int, help='Recalcular apenas um profissional')
+args = parser.parse_args()
+
+with app.app_context():
+    with db.engine.begin() as connection:
+        rebuild_rollups(connection, args.professional_id)
+        rebuild_slot_occupancy(connection, args.professional_id)
+    print("Agregado diário e ocupação dos horários recalculados com sucesso!")
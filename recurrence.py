@@ -0,0 +1,229 @@
+from flask import Blueprint, request, jsonify
+from src.models.professional import db
+from src.models.service import Service
+from src.models.appointment import Appointment
+from src.models.recurrence_rule import RecurrenceRule
+from src.models.recurrence_exception import RecurrenceException
+from src.services.authentication import require_auth
+from src.services.recurrence_expansion import (
+    RECURRENCE_HORIZON_DAYS, CANCELLED_STATUS, create_rule, detach_occurrence, end_series,
+    is_occurrence, occurrence_status, series_dates
+)
+from src.services.slot_reservation import SlotUnavailable
+from src.services.waitlist_backfill import waitlist
+from datetime import datetime, date, timedelta
+
+recurrence_bp = Blueprint('recurrence', __name__)
+
+OCCURRENCE_STATUSES = ('agendado', 'confirmado', 'cancelado', 'concluido')
+
+
+def _parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+def _own_appointment(professional, appointment_id):
+    return Appointment.query.filter_by(id=appointment_id, professional_id=professional.id).first()
+
+
+@recurrence_bp.route('/appointments/<int:appointment_id>/recurrence', methods=['POST'])
+def create_recurrence(appointment_id):
+    """
+    Repete o agendamento (weekly, biweekly ou monthly) até `until` ou por
+    `count` ocorrências
+    """
+    try:
+        professional = require_auth()
+        if not professional:
+            return jsonify({'error': 'Não autenticado'}), 401
+
+        appointment = _own_appointment(professional, appointment_id)
+        if not appointment:
+            return jsonify({'error': 'Agendamento não encontrado'}), 404
+        if RecurrenceRule.query.filter_by(appointment_id=appointment.id).first():
+            return jsonify({'error': 'O agendamento já se repete'}), 409
+
+        data = request.get_json() or {}
+        try:
+            until = _parse_date(data['until']) if data.get('until') else None
+            count = int(data['count']) if data.get('count') else None
+            interval = int(data.get('interval') or 1)
+        except ValueError:
+            return jsonify({'error': 'Parâmetros de repetição inválidos'}), 400
+
+        try:
+            rule = create_rule(appointment, data.get('frequency'), interval, until, count)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        try:
+            db.session.commit()
+        except SlotUnavailable as e:
+            db.session.rollback()
+            return jsonify({'error': str(e)}), 409
+
+        return jsonify({
+            'message': 'Agendamento recorrente criado',
+            'recurrence': rule.to_dict()
+        }), 201
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
+@recurrence_bp.route('/appointments/<int:appointment_id>/recurrence', methods=['GET'])
+def get_recurrence(appointment_id):
+    """
+    Regra, exceções e ocorrências da série no intervalo (from/to; padrão:
+    de hoje até o horizonte de expansão)
+    """
+    try:
+        professional = require_auth()
+        if not professional:
+            return jsonify({'error': 'Não autenticado'}), 401
+
+        appointment = _own_appointment(professional, appointment_id)
+        rule = RecurrenceRule.query.filter_by(appointment_id=appointment_id).first() if appointment else None
+        if not rule:
+            return jsonify({'error': 'Série não encontrada'}), 404
+
+        try:
+            start = _parse_date(request.args['from']) if request.args.get('from') else date.today()
+            end = (_parse_date(request.args['to']) if request.args.get('to')
+                   else date.today() + timedelta(days=RECURRENCE_HORIZON_DAYS))
+        except ValueError:
+            return jsonify({'error': 'Formato de data inválido'}), 400
+
+        exceptions = RecurrenceException.query.filter(
+            RecurrenceException.rule_id == rule.id,
+            RecurrenceException.occurrence_date >= start,
+            RecurrenceException.occurrence_date <= end
+        ).order_by(RecurrenceException.occurrence_date).all()
+
+        status = occurrence_status(appointment.status)
+        occurrences = [
+            {
+                'date': occurrence.isoformat(),
+                'time': appointment.appointment_time.strftime('%H:%M'),
+                'status': status
+            }
+            for occurrence in series_dates(
+                (rule.start_date, rule.frequency, rule.interval, rule.until, rule.count), start, end,
+                {exception.occurrence_date for exception in exceptions}
+            )
+        ]
+
+        return jsonify({
+            'recurrence': rule.to_dict(),
+            'occurrences': occurrences,
+            'exceptions': [exception.to_dict() for exception in exceptions]
+        }), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@recurrence_bp.route('/appointments/<int:appointment_id>/recurrence', methods=['DELETE'])
+def end_recurrence(appointment_id):
+    """
+    Encerra a série: as ocorrências de hoje em diante deixam de existir
+    """
+    try:
+        professional = require_auth()
+        if not professional:
+            return jsonify({'error': 'Não autenticado'}), 401
+
+        appointment = _own_appointment(professional, appointment_id)
+        rule = RecurrenceRule.query.filter_by(appointment_id=appointment_id).first() if appointment else None
+        if not rule:
+            return jsonify({'error': 'Série não encontrada'}), 404
+
+        end_series(rule, max(date.today() - timedelta(days=1), rule.start_date))
+        db.session.commit()
+
+        return jsonify({
+            'message': 'Série encerrada',
+            'recurrence': rule.to_dict()
+        }), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
+@recurrence_bp.route('/appointments/<int:appointment_id>/recurrence/occurrences/<occurrence_date>',
+                     methods=['PUT'])
+def update_occurrence(appointment_id, occurrence_date):
+    """
+    Altera ou cancela uma única ocorrência da série, que passa a ser um
+    agendamento próprio
+    """
+    try:
+        professional = require_auth()
+        if not professional:
+            return jsonify({'error': 'Não autenticado'}), 401
+
+        template = _own_appointment(professional, appointment_id)
+        rule = RecurrenceRule.query.filter_by(appointment_id=appointment_id).first() if template else None
+        if not rule:
+            return jsonify({'error': 'Série não encontrada'}), 404
+
+        try:
+            occurrence = _parse_date(occurrence_date)
+        except ValueError:
+            return jsonify({'error': 'Formato de data inválido'}), 400
+        if not is_occurrence(rule, occurrence):
+            return jsonify({'error': 'A série não tem ocorrência nesta data'}), 404
+
+        exception = RecurrenceException.query.filter_by(rule_id=rule.id, occurrence_date=occurrence).first()
+        if exception:
+            return jsonify({
+                'error': 'Ocorrência já alterada; edite o agendamento correspondente',
+                'appointment_id': exception.appointment_id
+            }), 409
+
+        data = request.get_json() or {}
+        changes = {}
+        try:
+            if data.get('appointment_date'):
+                changes['appointment_date'] = _parse_date(data['appointment_date'])
+            if data.get('appointment_time'):
+                changes['appointment_time'] = datetime.strptime(data['appointment_time'], '%H:%M').time()
+        except ValueError:
+            return jsonify({'error': 'Formato de data ou horário inválido'}), 400
+        if 'status' in data:
+            if data['status'] not in OCCURRENCE_STATUSES:
+                return jsonify({'error': 'Status inválido'}), 400
+            changes['status'] = data['status']
+        if 'notes' in data:
+            changes['notes'] = data['notes']
+        if data.get('service_id'):
+            service = Service.query.filter_by(
+                id=int(data['service_id']), professional_id=professional.id, is_active=True
+            ).first()
+            if not service:
+                return jsonify({'error': 'Serviço não encontrado'}), 404
+            changes['service_id'] = service.id
+
+        try:
+            appointment = detach_occurrence(rule, template, occurrence, changes)
+            db.session.commit()
+        except SlotUnavailable as e:
+            db.session.rollback()
+            return jsonify({'error': str(e)}), 409
+
+        # O horário que a ocorrência ocupava pode atender a lista de espera
+        if (appointment.status == CANCELLED_STATUS
+                or (appointment.appointment_date, appointment.appointment_time)
+                != (occurrence, template.appointment_time)):
+            waitlist.slot_freed(professional.id, occurrence, template.appointment_time)
+
+        return jsonify({
+            'message': 'Ocorrência atualizada',
+            'appointment': appointment.to_dict()
+        }), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,33 @@
+from src.models.professional import db
+from datetime import datetime
+
+class RecurrenceException(db.Model):
+    """
+    Ocorrência de uma série que deixou de seguir a regra (EXDATE).
+
+    A data deixa de ser gerada pela regra; quando a ocorrência foi alterada
+    (ou cancelada), `appointment_id` aponta o agendamento gravado para ela.
+    """
+    __tablename__ = 'recurrence_exception'
+
+    id = db.Column(db.Integer, primary_key=True)
+    rule_id = db.Column(db.Integer, db.ForeignKey('recurrence_rule.id'), nullable=False)
+    occurrence_date = db.Column(db.Date, nullable=False)  # Data prevista pela regra
+    appointment_id = db.Column(db.Integer, db.ForeignKey('appointment.id'))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('rule_id', 'occurrence_date', name='uq_recurrence_exception_rule_date'),
+    )
+
+    def __repr__(self):
+        return f'<RecurrenceException regra {self.rule_id} - {self.occurrence_date}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'rule_id': self.rule_id,
+            'occurrence_date': self.occurrence_date.isoformat() if self.occurrence_date else None,
+            'appointment_id': self.appointment_id,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
@@ -0,0 +1,284 @@
+import calendar
+import os
+from datetime import date, datetime, timedelta
+from sqlalchemy import func, select
+from src.models.professional import db
+from src.models.appointment import Appointment
+from src.models.service import Service
+from src.models.recurrence_rule import RecurrenceRule
+from src.models.recurrence_exception import RecurrenceException
+
+# Dias entre ocorrências das frequências semanais (multiplicados por `interval`)
+WEEKLY_STEPS = {'weekly': 7, 'biweekly': 14}
+FREQUENCIES = ('weekly', 'biweekly', 'monthly')
+CANCELLED_STATUS = 'cancelado'
+CONFIRMED_STATUS = 'confirmado'
+
+# Até onde as listagens sem data final expandem séries sem fim
+RECURRENCE_HORIZON_DAYS = int(os.environ.get('RECURRENCE_HORIZON_DAYS', 365))
+
+# Colunas da regra no início de cada linha de `load_series`
+RULE_COLUMNS = (
+    RecurrenceRule.id.label('rule_id'),
+    RecurrenceRule.start_date,
+    RecurrenceRule.frequency,
+    RecurrenceRule.interval,
+    RecurrenceRule.until,
+    RecurrenceRule.count
+)
+
+
+def _months_between(start, end):
+    return (end.year - start.year) * 12 + end.month - start.month
+
+
+def occurrence_date(start_date, frequency, interval, index):
+    """
+    Data da ocorrência `index` (0 é a primeira).
+
+    Nas séries mensais, o dia que não existe no mês (31, 30, 29 de
+    fevereiro) cai no último dia daquele mês.
+    """
+    if frequency == 'monthly':
+        month_index = start_date.year * 12 + start_date.month - 1 + index * interval
+        year, month = month_index // 12, month_index % 12 + 1
+        return date(year, month, min(start_date.day, calendar.monthrange(year, month)[1]))
+    return start_date + timedelta(days=index * WEEKLY_STEPS[frequency] * interval)
+
+
+def occurrence_bounds(rule, window_start, window_end):
+    """
+    Índices (primeiro, último) das ocorrências da regra dentro de
+    [window_start, window_end], ou None se não houver nenhuma.
+
+    Calculados direto a partir das datas, sem percorrer as ocorrências
+    anteriores à janela. `rule` é (start_date, frequency, interval, until, count).
+    """
+    start_date, frequency, interval, until, count = rule
+    interval = max(interval or 1, 1)
+    if until is not None and until < window_end:
+        window_end = until
+    if window_end < start_date or window_end < window_start:
+        return None
+
+    if frequency == 'monthly':
+        first = max(_months_between(start_date, window_start) // interval, 0)
+        while occurrence_date(start_date, frequency, interval, first) < window_start:
+            first += 1
+        last = _months_between(start_date, window_end) // interval
+        while last >= 0 and occurrence_date(start_date, frequency, interval, last) > window_end:
+            last -= 1
+    else:
+        step = WEEKLY_STEPS[frequency] * interval
+        first = max(-(-(window_start - start_date).days // step), 0)
+        last = (window_end - start_date).days // step
+
+    if count is not None:
+        last = min(last, count - 1)
+    if last < first:
+        return None
+    return first, last
+
+
+def series_dates(rule, window_start, window_end, skip=(), descending=False):
+    """
+    Gera as datas das ocorrências de uma série dentro do intervalo, sem a
+    primeira (o próprio agendamento de origem) e sem as datas em `skip`
+    (exceções). O custo é proporcional às ocorrências da janela, não à
+    idade ou ao alcance da série.
+    """
+    bounds = occurrence_bounds(rule, window_start, window_end)
+    if bounds is None:
+        return
+    first, last = max(bounds[0], 1), bounds[1]
+    indexes = range(last, first - 1, -1) if descending else range(first, last + 1)
+    start_date, frequency, interval = rule[0], rule[1], max(rule[2] or 1, 1)
+    for index in indexes:
+        occurrence = occurrence_date(start_date, frequency, interval, index)
+        if occurrence not in skip:
+            yield occurrence
+
+
+def series_count(rule, window_start, window_end, skip=()):
+    """
+    Quantidade de ocorrências geradas da série no intervalo, calculada sem
+    gerar as datas (o custo cresce com as exceções, não com o intervalo)
+    """
+    bounds = occurrence_bounds(rule, window_start, window_end)
+    if bounds is None:
+        return 0
+    total = bounds[1] - max(bounds[0], 1) + 1
+    for occurrence in skip:
+        if window_start <= occurrence <= window_end:
+            day = occurrence_bounds(rule, occurrence, occurrence)
+            if day is not None and day[0] >= 1:
+                total -= 1
+    return max(total, 0)
+
+
+def occurrence_status(template_status):
+    """
+    Status das ocorrências geradas: acompanham a confirmação da série; as
+    demais situações do agendamento de origem (concluído, cancelado) valem
+    só para ele
+    """
+    return CONFIRMED_STATUS if template_status == CONFIRMED_STATUS else 'agendado'
+
+
+def load_series(connection, window_start, window_end, columns=(), professional_id=None):
+    """
+    Séries que podem ter ocorrências em [window_start, window_end] e as
+    exceções delas no intervalo.
+
+    Cada linha traz as colunas de `RULE_COLUMNS` seguidas de `columns`
+    (do agendamento de origem ou do serviço). Retorna (linhas,
+    {rule_id: {datas das exceções}}). `connection` pode ser a sessão ou uma
+    conexão do Core (eventos de mapper).
+    """
+    statement = select(*RULE_COLUMNS, *columns).select_from(RecurrenceRule).join(
+        Appointment, Appointment.id == RecurrenceRule.appointment_id
+    ).outerjoin(
+        Service, Service.id == Appointment.service_id
+    ).where(
+        RecurrenceRule.start_date <= window_end,
+        (RecurrenceRule.until == None) | (RecurrenceRule.until >= window_start)
+    )
+    if professional_id is not None:
+        statement = statement.where(RecurrenceRule.professional_id == professional_id)
+    rows = connection.execute(statement).all()
+    if not rows:
+        return rows, {}
+
+    exceptions_statement = select(
+        RecurrenceException.rule_id, RecurrenceException.occurrence_date
+    ).join(
+        RecurrenceRule, RecurrenceRule.id == RecurrenceException.rule_id
+    ).where(
+        RecurrenceException.occurrence_date >= window_start,
+        RecurrenceException.occurrence_date <= window_end
+    )
+    if professional_id is not None:
+        exceptions_statement = exceptions_statement.where(RecurrenceRule.professional_id == professional_id)
+    exceptions = {}
+    for rule_id, occurrence in connection.execute(exceptions_statement):
+        exceptions.setdefault(rule_id, set()).add(occurrence)
+    return rows, exceptions
+
+
+def expand(rows, exceptions, window_start, window_end):
+    """
+    Gera (linha, data) para cada ocorrência das séries de `load_series`
+    no intervalo, série por série
+    """
+    for row in rows:
+        for occurrence in series_dates(row[1:6], window_start, window_end, exceptions.get(row[0], ())):
+            yield row, occurrence
+
+
+def occurrences(connection, window_start, window_end, columns=(), professional_id=None):
+    """
+    Atalho para `load_series` seguido de `expand`
+    """
+    rows, exceptions = load_series(connection, window_start, window_end, columns, professional_id)
+    return expand(rows, exceptions, window_start, window_end)
+
+
+def series_stamp(connection, professional_id):
+    """
+    Carimbo das séries de um profissional: muda quando uma regra, uma
+    exceção (que atualiza a regra) ou um agendamento de origem é alterado
+    """
+    return tuple(connection.execute(
+        select(
+            func.count(RecurrenceRule.id),
+            func.max(RecurrenceRule.updated_at),
+            func.max(Appointment.updated_at)
+        ).select_from(RecurrenceRule).join(
+            Appointment, Appointment.id == RecurrenceRule.appointment_id
+        ).where(RecurrenceRule.professional_id == professional_id)
+    ).one())
+
+
+def create_rule(appointment, frequency, interval=1, until=None, count=None):
+    """
+    Transforma o agendamento na primeira ocorrência de uma série.
+
+    Os intervalos ocupados pelas ocorrências são reservados no flush
+    (src/services/slot_reservation.py), que levanta SlotUnavailable se
+    alguma delas cair num horário lotado.
+    """
+    if frequency not in FREQUENCIES:
+        raise ValueError('Frequência inválida')
+    if interval < 1:
+        raise ValueError('O intervalo deve ser maior que zero')
+    if count is not None and count < 1:
+        raise ValueError('A quantidade de ocorrências deve ser maior que zero')
+    if until is not None and until < appointment.appointment_date:
+        raise ValueError('A data final deve ser posterior ao agendamento')
+    if appointment.status == CANCELLED_STATUS:
+        raise ValueError('Agendamento cancelado não pode se repetir')
+
+    rule = RecurrenceRule(
+        appointment_id=appointment.id,
+        professional_id=appointment.professional_id,
+        frequency=frequency,
+        interval=interval,
+        start_date=appointment.appointment_date,
+        until=until,
+        count=count
+    )
+    db.session.add(rule)
+    return rule
+
+
+def end_series(rule, last_date):
+    """
+    Encerra a série em `last_date`: as ocorrências anteriores continuam nos
+    relatórios, as seguintes deixam de ser geradas
+    """
+    if rule.until is None or rule.until > last_date:
+        rule.until = last_date
+    rule.updated_at = datetime.utcnow()
+
+
+def is_occurrence(rule, occurrence):
+    """
+    Indica se a regra gera uma ocorrência na data (exceções à parte)
+    """
+    bounds = occurrence_bounds(
+        (rule.start_date, rule.frequency, rule.interval, rule.until, rule.count), occurrence, occurrence
+    )
+    return bounds is not None and bounds[0] >= 1
+
+
+def detach_occurrence(rule, template, occurrence, changes):
+    """
+    Grava uma ocorrência gerada como agendamento próprio, com as alterações
+    em `changes` (campos de `Appointment`), e a registra como exceção da série.
+
+    A exceção é gravada antes do agendamento para que a ocorrência libere
+    os intervalos que ocupava antes de o novo agendamento reservar os seus.
+    """
+    exception = RecurrenceException(rule_id=rule.id, occurrence_date=occurrence)
+    db.session.add(exception)
+    rule.updated_at = datetime.utcnow()
+    db.session.flush()
+
+    values = {
+        'professional_id': template.professional_id,
+        'service_id': template.service_id,
+        'client_name': template.client_name,
+        'client_phone': template.client_phone,
+        'client_email': template.client_email,
+        'client_address': template.client_address,
+        'appointment_date': occurrence,
+        'appointment_time': template.appointment_time,
+        'status': occurrence_status(template.status),
+        'notes': template.notes
+    }
+    values.update(changes)
+    appointment = Appointment(**values)
+    db.session.add(appointment)
+    db.session.flush()
+    exception.appointment_id = appointment.id
+    return appointment
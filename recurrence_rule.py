@@ -0,0 +1,52 @@
+from src.models.professional import db
+from datetime import datetime
+
+class RecurrenceRule(db.Model):
+    """
+    Regra de repetição de um agendamento (no estilo RRULE).
+
+    O agendamento de origem é a primeira ocorrência e fornece cliente,
+    serviço e horário das demais. As ocorrências seguintes não são gravadas:
+    são geradas sob demanda, apenas dentro do intervalo consultado
+    (src/services/recurrence_expansion.py). Só as exceções (ocorrências
+    canceladas ou alteradas individualmente) viram linhas, em
+    `RecurrenceException`.
+    """
+    __tablename__ = 'recurrence_rule'
+
+    id = db.Column(db.Integer, primary_key=True)
+    appointment_id = db.Column(db.Integer, db.ForeignKey('appointment.id'), nullable=False, unique=True)
+    professional_id = db.Column(db.Integer, db.ForeignKey('professional.id'), nullable=False)
+
+    frequency = db.Column(db.String(10), nullable=False)  # weekly, biweekly, monthly
+    interval = db.Column(db.Integer, nullable=False, default=1)  # A cada N semanas/quinzenas/meses
+    start_date = db.Column(db.Date, nullable=False)  # Data da primeira ocorrência
+    until = db.Column(db.Date)  # Última data possível (inclusive)
+    count = db.Column(db.Integer)  # Total de ocorrências, contando a primeira
+
+    # Lembretes das ocorrências geradas já enviados até esta data
+    reminded_through = db.Column(db.Date)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_recurrence_rule_professional', 'professional_id', 'start_date'),
+    )
+
+    def __repr__(self):
+        return f'<RecurrenceRule {self.frequency}/{self.interval} - agendamento {self.appointment_id}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'appointment_id': self.appointment_id,
+            'professional_id': self.professional_id,
+            'frequency': self.frequency,
+            'interval': self.interval,
+            'start_date': self.start_date.isoformat() if self.start_date else None,
+            'until': self.until.isoformat() if self.until else None,
+            'count': self.count,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
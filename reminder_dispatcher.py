@@ -0,0 +1,163 @@
+import time
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+from src.models.professional import db
+from src.models.appointment import Appointment
+from src.models.notification_job import NotificationJob
+from src.models.recurrence_rule import RecurrenceRule
+from src.models.recurrence_exception import RecurrenceException
+from src.services.notification_service import notification_service
+from src.services.notification_queue import notification_queue
+from src.services.message_templates import message_templates
+from src.services.recurrence_expansion import RULE_COLUMNS, series_dates
+
+# Ocorrência gerada de uma série, com as colunas de `context_query`
+OccurrenceRecord = namedtuple('OccurrenceRecord', [
+    'appointment_id', 'professional_id', 'client_name', 'client_phone', 'client_email',
+    'client_address', 'notes', 'appointment_date', 'appointment_time', 'professional_name',
+    'professional_phone', 'professional_address', 'service_name'
+])
+
+
+class ReminderDispatcher:
+    """
+    Envia os lembretes de um intervalo de datas em lote.
+
+    Os agendamentos pendentes são lidos numa única consulta, já com as
+    colunas de profissional e serviço usadas nos modelos de mensagem; as
+    mensagens são enviadas pelo envio em lote do serviço de notificações
+    (concorrência e taxa limitadas, ver src/services/async_sender.py) e os
+    enviados são marcados com um UPDATE por lote. Falhas vão para a fila de notificações, que repete
+    o envio e marca `reminder_sent` quando conseguir.
+
+    As ocorrências geradas das séries recorrentes não têm linha própria: a
+    regra guarda até que data os lembretes dela já foram disparados
+    (`reminded_through`), e os jobs dessas ocorrências não apontam agendamento.
+    """
+
+    def __init__(self, batch_size=500):
+        self.batch_size = batch_size
+
+    def due_appointments(self, start_date, end_date):
+        """
+        Agendamentos do intervalo sem lembrete enviado nem lembrete na fila
+        """
+        queued = db.session.query(NotificationJob.id).filter(
+            NotificationJob.appointment_id == Appointment.id,
+            NotificationJob.kind == 'reminder',
+            NotificationJob.status.in_(['pendente', 'processando'])
+        ).exists()
+
+        return message_templates.context_query().filter(
+            Appointment.appointment_date >= start_date,
+            Appointment.appointment_date <= end_date,
+            db.or_(Appointment.reminder_sent == False, Appointment.reminder_sent.is_(None)),
+            db.or_(Appointment.status != 'cancelado', Appointment.status.is_(None)),
+            ~queued
+        ).order_by(Appointment.appointment_date, Appointment.appointment_time).all()
+
+    def due_occurrences(self, start_date, end_date):
+        """
+        Ocorrências geradas do intervalo ainda não lembradas e os ids das
+        regras consultadas
+        """
+        rows = message_templates.context_query().add_columns(
+            *RULE_COLUMNS, RecurrenceRule.reminded_through
+        ).join(
+            RecurrenceRule, RecurrenceRule.appointment_id == Appointment.id
+        ).filter(
+            RecurrenceRule.start_date <= end_date,
+            db.or_(RecurrenceRule.until.is_(None), RecurrenceRule.until >= start_date),
+            db.or_(RecurrenceRule.reminded_through.is_(None), RecurrenceRule.reminded_through < end_date)
+        ).all()
+        if not rows:
+            return [], []
+
+        rule_ids = [row.rule_id for row in rows]
+        exceptions = {}
+        for rule_id, occurrence in db.session.query(
+            RecurrenceException.rule_id, RecurrenceException.occurrence_date
+        ).filter(
+            RecurrenceException.rule_id.in_(rule_ids),
+            RecurrenceException.occurrence_date >= start_date,
+            RecurrenceException.occurrence_date <= end_date
+        ):
+            exceptions.setdefault(rule_id, set()).add(occurrence)
+
+        records = []
+        for row in rows:
+            window_start = start_date
+            if row.reminded_through is not None:
+                window_start = max(start_date, row.reminded_through + timedelta(days=1))
+            # Colunas de context_query (0-12) seguidas das da regra (13-19)
+            for occurrence in series_dates(tuple(row[14:19]), window_start, end_date, exceptions.get(row.rule_id, ())):
+                records.append(OccurrenceRecord(*row[:7], occurrence, *row[8:13]))
+        return records, rule_ids
+
+    def dispatch(self, start_date=None, end_date=None, sender=None):
+        """
+        Envia os lembretes de `start_date` a `end_date` (padrão: amanhã).
+
+        `sender(job)` substitui o envio pelo webhook e deve levantar uma
+        exceção em caso de falha.
+        """
+        start_date = start_date or date.today() + timedelta(days=1)
+        end_date = end_date or start_date
+        started = time.perf_counter()
+
+        records = self.due_appointments(start_date, end_date)
+        occurrences, rule_ids = self.due_occurrences(start_date, end_date)
+        if occurrences:
+            records = sorted(records + occurrences, key=lambda record: (record.appointment_date, record.appointment_time))
+        message_templates.preload('reminder', [record.professional_id for record in records])
+        jobs = [
+            NotificationJob(
+                kind='reminder',
+                appointment_id=None if isinstance(record, OccurrenceRecord) else record.appointment_id,
+                phone=record.client_phone,
+                message=message_templates.render('reminder', record),
+                max_attempts=notification_queue.max_attempts
+            )
+            for record in records
+        ]
+        stats = {'selected': len(jobs), 'sent': 0, 'failed': 0, 'batches': []}
+
+        for offset in range(0, len(jobs), self.batch_size):
+            batch = jobs[offset:offset + self.batch_size]
+            errors, batch_stats = notification_service.send_jobs(batch, sender)
+
+            sent = [job for job, error in zip(batch, errors) if error is None]
+            sent_ids = [job.appointment_id for job in sent if job.appointment_id is not None]
+            if sent_ids:
+                Appointment.query.filter(Appointment.id.in_(sent_ids)).update(
+                    {'reminder_sent': True}, synchronize_session=False
+                )
+
+            failed = [(job, error) for job, error in zip(batch, errors) if error is not None]
+            for job, error in failed:
+                job.attempts = 1
+                job.last_error = error
+                job.next_attempt_at = datetime.utcnow() + timedelta(seconds=notification_queue.backoff_seconds)
+                db.session.add(job)
+
+            db.session.commit()
+            stats['sent'] += len(sent)
+            stats['failed'] += len(failed)
+            stats['batches'].append(batch_stats)
+
+        if rule_ids:
+            # Falhas das ocorrências já estão na fila; a regra não as seleciona de novo
+            RecurrenceRule.query.filter(RecurrenceRule.id.in_(rule_ids)).update(
+                {'reminded_through': end_date, 'updated_at': RecurrenceRule.updated_at},
+                synchronize_session=False
+            )
+            db.session.commit()
+
+        if stats['failed']:
+            notification_queue.wake()
+        stats['elapsed_seconds'] = round(time.perf_counter() - started, 3)
+        return stats
+
+
+# Instância global do disparador de lembretes
+reminder_dispatcher = ReminderDispatcher()
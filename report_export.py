@@ -0,0 +1,112 @@
+import csv
+import io
+import tempfile
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet/Arrow são opcionais; CSV funciona sem pyarrow
+    pa = None
+    pq = None
+
+# Tamanho aproximado de cada pedaço enviado ao cliente
+CHUNK_SIZE = 64 * 1024
+
+APPOINTMENT_COLUMNS = [
+    'id', 'client_name', 'client_phone', 'client_email', 'service_name', 'service_price',
+    'appointment_date', 'appointment_time', 'status', 'created_at', 'notes'
+]
+
+REVENUE_COLUMNS = ['period', 'period_label', 'revenue']
+
+
+def arrow_available():
+    return pa is not None
+
+
+def appointment_schema():
+    return pa.schema([
+        ('id', pa.int64()),
+        ('client_name', pa.string()),
+        ('client_phone', pa.string()),
+        ('client_email', pa.string()),
+        ('service_name', pa.string()),
+        ('service_price', pa.float64()),
+        ('appointment_date', pa.date32()),
+        ('appointment_time', pa.time64('us')),
+        ('status', pa.string()),
+        ('created_at', pa.timestamp('us')),
+        ('notes', pa.string())
+    ])
+
+
+def revenue_schema():
+    return pa.schema([
+        ('period', pa.string()),
+        ('period_label', pa.string()),
+        ('revenue', pa.float64())
+    ])
+
+
+def iter_csv(rows, columns):
+    """
+    Gera o CSV em pedaços conforme as linhas são lidas
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow([row[column] for column in columns])
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def iter_record_batches(rows, schema, batch_size=1000):
+    """
+    Agrupa dicionários em RecordBatches de até `batch_size` linhas
+    """
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield pa.RecordBatch.from_pylist(batch, schema=schema)
+            batch = []
+    if batch:
+        yield pa.RecordBatch.from_pylist(batch, schema=schema)
+
+
+def iter_arrow_stream(rows, schema, batch_size=1000):
+    """
+    Gera o formato de streaming do Arrow (IPC), um lote por vez
+    """
+    buffer = io.BytesIO()
+    with pa.ipc.new_stream(buffer, schema) as writer:
+        for batch in iter_record_batches(rows, schema, batch_size):
+            writer.write_batch(batch)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def iter_parquet(rows, schema, batch_size=1000):
+    """
+    Grava o Parquet em lotes num arquivo temporário e depois o envia em pedaços.
+
+    O rodapé do Parquet só existe ao final da escrita, por isso o arquivo
+    não pode ser enviado enquanto é gerado; a memória continua limitada
+    a um lote.
+    """
+    with tempfile.TemporaryFile() as output:
+        with pq.ParquetWriter(output, schema) as writer:
+            for batch in iter_record_batches(rows, schema, batch_size):
+                writer.write_batch(batch)
+        output.seek(0)
+        while True:
+            chunk = output.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
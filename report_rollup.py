@@ -0,0 +1,141 @@
+from sqlalchemy import event, func, select, inspect, literal
+from sqlalchemy.dialects import postgresql, sqlite
+from src.models.service import Service
+from src.models.appointment import Appointment
+from src.models.daily_rollup import DailyRollup
+
+rollup_table = DailyRollup.__table__
+
+
+def _rollup_key(professional_id, service_id, day, status):
+    return {
+        'professional_id': professional_id,
+        'service_id': service_id,
+        'day': day,
+        'status': status or ''
+    }
+
+
+def _apply_delta(connection, key, delta):
+    """
+    Soma `delta` agendamentos à linha do agregado (criando-a se necessário)
+    """
+    price = connection.execute(
+        select(Service.price).where(Service.id == key['service_id'])
+    ).scalar()
+    revenue = delta * (price or 0)
+
+    if connection.dialect.name in ('sqlite', 'postgresql'):
+        insert = sqlite.insert if connection.dialect.name == 'sqlite' else postgresql.insert
+        statement = insert(rollup_table).values(
+            appointment_count=delta, revenue=revenue, **key
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=list(key),
+            set_={
+                'appointment_count': rollup_table.c.appointment_count + delta,
+                'revenue': rollup_table.c.revenue + revenue
+            }
+        )
+        connection.execute(statement)
+        return
+
+    result = connection.execute(
+        rollup_table.update().where(
+            *(rollup_table.c[column] == value for column, value in key.items())
+        ).values(
+            appointment_count=rollup_table.c.appointment_count + delta,
+            revenue=rollup_table.c.revenue + revenue
+        )
+    )
+    if result.rowcount == 0:
+        connection.execute(rollup_table.insert().values(
+            appointment_count=delta, revenue=revenue, **key
+        ))
+
+
+def _previous_value(state, name):
+    history = state.attrs[name].history
+    values = history.deleted or history.unchanged
+    return values[0] if values else getattr(state.obj(), name)
+
+
+@event.listens_for(Appointment, 'after_insert')
+def _rollup_appointment_insert(mapper, connection, target):
+    _apply_delta(connection, _rollup_key(
+        target.professional_id, target.service_id, target.appointment_date, target.status
+    ), 1)
+
+
+@event.listens_for(Appointment, 'after_update')
+def _rollup_appointment_update(mapper, connection, target):
+    state = inspect(target)
+    before = _rollup_key(*(
+        _previous_value(state, name)
+        for name in ('professional_id', 'service_id', 'appointment_date', 'status')
+    ))
+    after = _rollup_key(target.professional_id, target.service_id, target.appointment_date, target.status)
+    if before != after:
+        _apply_delta(connection, before, -1)
+        _apply_delta(connection, after, 1)
+
+
+@event.listens_for(Appointment, 'after_delete')
+def _rollup_appointment_delete(mapper, connection, target):
+    state = inspect(target)
+    _apply_delta(connection, _rollup_key(*(
+        _previous_value(state, name)
+        for name in ('professional_id', 'service_id', 'appointment_date', 'status')
+    )), -1)
+
+
+@event.listens_for(Service, 'after_update')
+def _rollup_service_price_update(mapper, connection, target):
+    if not inspect(target).attrs.price.history.has_changes():
+        return
+    connection.execute(
+        rollup_table.update().where(
+            rollup_table.c.service_id == target.id
+        ).values(
+            revenue=rollup_table.c.appointment_count * (target.price or 0)
+        )
+    )
+
+
+def rebuild_rollups(connection, professional_id=None):
+    """
+    Recalcula o agregado a partir dos agendamentos (todos ou de um profissional).
+
+    Necessário após cargas feitas sem passar pelo ORM, como inserções em
+    massa, e para popular o agregado em bancos já existentes.
+    """
+    delete = rollup_table.delete()
+    if professional_id is not None:
+        delete = delete.where(rollup_table.c.professional_id == professional_id)
+    connection.execute(delete)
+
+    appointment_count = func.count(Appointment.id)
+    status = func.coalesce(Appointment.status, literal(''))
+    source = select(
+        Appointment.professional_id,
+        Appointment.service_id,
+        Appointment.appointment_date,
+        status,
+        appointment_count,
+        appointment_count * func.coalesce(Service.price, 0)
+    ).join(
+        Service, Service.id == Appointment.service_id
+    ).group_by(
+        Appointment.professional_id,
+        Appointment.service_id,
+        Appointment.appointment_date,
+        status,
+        Service.price
+    )
+    if professional_id is not None:
+        source = source.where(Appointment.professional_id == professional_id)
+
+    connection.execute(rollup_table.insert().from_select(
+        ['professional_id', 'service_id', 'day', 'status', 'appointment_count', 'revenue'],
+        source
+    ))
@@ -1,17 +1,348 @@
-from flask import Blueprint, request, jsonify, session
-from src.models.professional import db, Professional
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+from src.models.professional import db
 from src.models.service import Service
 from src.models.appointment import Appointment
-from datetime import datetime, date, timedelta
-from sqlalchemy import func, extract
+from src.models.daily_rollup import DailyRollup
+from src.services import report_export
+from src.services.serialization import dumps_line, format_date, format_datetime, format_time
+from src.services.authentication import require_auth
+from src.services import recurrence_expansion
+from datetime import datetime, date, time, timedelta
+from sqlalchemy import func, case, tuple_, literal, Date, Time, Integer
+from collections import namedtuple
+import base64
+import heapq
+import itertools
 
 reports_bp = Blueprint('reports', __name__)
 
-def require_auth():
-    professional_id = session.get('professional_id')
-    if not professional_id:
-        return None
-    return Professional.query.get(professional_id)
+REVENUE_GRANULARITIES = ('day', 'week', 'month', 'year')
+
+# Maior quantidade de períodos retornada pelo relatório de receita
+MAX_REVENUE_BUCKETS = 400
+
+def _add_months(value, months):
+    month_index = value.year * 12 + value.month - 1 + months
+    return value.replace(year=month_index // 12, month=month_index % 12 + 1, day=1)
+
+def _bucket_start(value, granularity):
+    if granularity == 'week':
+        return value - timedelta(days=value.weekday())
+    if granularity == 'month':
+        return value.replace(day=1)
+    if granularity == 'year':
+        return value.replace(month=1, day=1)
+    return value
+
+def _next_bucket(value, granularity):
+    if granularity == 'week':
+        return value + timedelta(days=7)
+    if granularity == 'month':
+        return _add_months(value, 1)
+    if granularity == 'year':
+        return value.replace(year=value.year + 1)
+    return value + timedelta(days=1)
+
+def _revenue_window(granularity, start_str, end_str):
+    """
+    Intervalo do relatório de receita; sem from/to usa as janelas padrão
+    (30 dias, 8 semanas, 12 meses ou 3 anos até o período atual)
+    """
+    today = date.today()
+    if end_str:
+        end_date = datetime.strptime(end_str, '%Y-%m-%d').date()
+    else:
+        end_date = _next_bucket(_bucket_start(today, granularity), granularity) - timedelta(days=1)
+    
+    if start_str:
+        return datetime.strptime(start_str, '%Y-%m-%d').date(), end_date
+    
+    current = _bucket_start(end_date, granularity)
+    if granularity == 'week':
+        return current - timedelta(weeks=7), end_date
+    if granularity == 'month':
+        return _add_months(current, -11), end_date
+    if granularity == 'year':
+        return current.replace(year=current.year - 2), end_date
+    return current - timedelta(days=29), end_date
+
+def _bucket_key(bucket, granularity):
+    if granularity == 'month':
+        return bucket.strftime('%Y-%m')
+    if granularity == 'year':
+        return bucket.strftime('%Y')
+    return bucket.isoformat()
+
+def _bucket_period(bucket, granularity):
+    if granularity == 'week':
+        iso_year, iso_week, _ = bucket.isocalendar()
+        return f"{iso_year}-W{iso_week:02d}"
+    return _bucket_key(bucket, granularity)
+
+def _bucket_label(bucket, granularity):
+    if granularity == 'week':
+        return f"{bucket.strftime('%d/%m')} - {(bucket + timedelta(days=6)).strftime('%d/%m')}"
+    if granularity == 'month':
+        return bucket.strftime('%b/%Y')
+    if granularity == 'year':
+        return bucket.strftime('%Y')
+    return bucket.strftime('%d/%m/%Y')
+
+# Paginação do relatório de agendamentos
+REPORT_PAGE_SIZE = 200
+REPORT_MAX_PAGE_SIZE = 1000
+REPORT_STREAM_BATCH_SIZE = 1000
+
+# Formatos de exportação: (mimetype, extensão)
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows')
+}
+
+def _appointments_report_query(professional, args):
+    """
+    Consulta do relatório de agendamentos com os filtros da requisição.
+
+    Retorna apenas as colunas usadas no relatório, já com o serviço
+    em join, ordenadas do agendamento mais recente para o mais antigo.
+    """
+    start_date = args.get('start_date')
+    end_date = args.get('end_date')
+    status = args.get('status')
+    service_id = args.get('service_id')
+    
+    query = db.session.query(
+        Appointment.id,
+        Appointment.client_name,
+        Appointment.client_phone,
+        Appointment.client_email,
+        Service.name.label('service_name'),
+        Service.price.label('service_price'),
+        Appointment.appointment_date,
+        Appointment.appointment_time,
+        Appointment.status,
+        Appointment.created_at,
+        Appointment.notes
+    ).outerjoin(
+        Service, Service.id == Appointment.service_id
+    ).filter(
+        Appointment.professional_id == professional.id
+    )
+    
+    # Aplicar filtros
+    if start_date:
+        try:
+            start_date_obj = datetime.strptime(start_date, '%Y-%m-%d').date()
+        except ValueError:
+            raise ValueError('Formato de data inválido para start_date')
+        query = query.filter(Appointment.appointment_date >= start_date_obj)
+    
+    if end_date:
+        try:
+            end_date_obj = datetime.strptime(end_date, '%Y-%m-%d').date()
+        except ValueError:
+            raise ValueError('Formato de data inválido para end_date')
+        query = query.filter(Appointment.appointment_date <= end_date_obj)
+    
+    if status:
+        query = query.filter(Appointment.status == status)
+    
+    if service_id:
+        query = query.filter(Appointment.service_id == int(service_id))
+    
+    query = query.order_by(
+        Appointment.appointment_date.desc(),
+        Appointment.appointment_time.desc(),
+        Appointment.id.desc()
+    )
+    
+    filters_applied = {
+        'start_date': start_date,
+        'end_date': end_date,
+        'status': status,
+        'service_id': service_id
+    }
+    return query, filters_applied
+
+# Ocorrências geradas das séries recorrentes, no formato das linhas da consulta
+SeriesReportRow = namedtuple('SeriesReportRow', [
+    'id', 'client_name', 'client_phone', 'client_email', 'service_name', 'service_price',
+    'appointment_date', 'appointment_time', 'status', 'created_at', 'notes'
+])
+
+def _report_sort_key(row):
+    return row.appointment_date, row.appointment_time, row.id
+
+def _series_report_rows(professional, args, cursor=None):
+    """
+    Ocorrências geradas das séries do profissional que atendem aos filtros,
+    na mesma ordem do relatório (mais recente primeiro).
+
+    Sem `end_date`, as séries sem fim são expandidas até
+    RECURRENCE_HORIZON_DAYS dias a partir de hoje. Cada ocorrência leva o id
+    do agendamento de origem.
+    """
+    start_date = args.get('start_date')
+    end_date = args.get('end_date')
+    window_start = datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else date.min
+    if end_date:
+        window_end = datetime.strptime(end_date, '%Y-%m-%d').date()
+    else:
+        window_end = date.today() + timedelta(days=recurrence_expansion.RECURRENCE_HORIZON_DAYS)
+    if cursor:
+        window_end = min(window_end, cursor[0])
+    status = args.get('status')
+    service_id = int(args['service_id']) if args.get('service_id') else None
+
+    rows, exceptions = recurrence_expansion.load_series(
+        db.session, window_start, window_end,
+        (Appointment.id, Appointment.client_name, Appointment.client_phone, Appointment.client_email,
+         Service.name, Service.price, Appointment.appointment_time, Appointment.status,
+         Appointment.created_at, Appointment.notes, Appointment.service_id),
+        professional.id
+    )
+    
+    def occurrences(row):
+        (rule_id, start, frequency, interval, until, count, appointment_id, client_name, client_phone,
+         client_email, service_name, service_price, appointment_time, template_status, created_at,
+         notes, _) = row
+        occurrence_status = recurrence_expansion.occurrence_status(template_status)
+        for occurrence in recurrence_expansion.series_dates(
+            (start, frequency, interval, until, count), window_start, window_end,
+            exceptions.get(rule_id, ()), descending=True
+        ):
+            yield SeriesReportRow(
+                appointment_id, client_name, client_phone, client_email, service_name, service_price,
+                occurrence, appointment_time, occurrence_status, created_at, notes
+            )
+    
+    series = [
+        occurrences(row) for row in rows
+        if (service_id is None or row.service_id == service_id)
+        and (not status or recurrence_expansion.occurrence_status(row.status) == status)
+    ]
+    merged = heapq.merge(*series, key=_report_sort_key, reverse=True)
+    if cursor:
+        merged = (row for row in merged if _report_sort_key(row) < cursor)
+    return merged
+
+def _merge_series_rows(rows, series_rows):
+    """
+    Intercala as linhas do banco com as ocorrências geradas, mantendo a ordem
+    """
+    return heapq.merge(rows, series_rows, key=_report_sort_key, reverse=True)
+
+def _appointment_report_row(row):
+    # Desempacota a tupla: o acesso por atributo da Row custa mais por campo
+    (appointment_id, client_name, client_phone, client_email, service_name, service_price,
+     appointment_date, appointment_time, status, created_at, notes) = row
+    return {
+        'id': appointment_id,
+        'client_name': client_name,
+        'client_phone': client_phone,
+        'client_email': client_email,
+        'service_name': service_name if service_name is not None else 'N/A',
+        'service_price': service_price if service_name is not None else 0,
+        'appointment_date': format_date(appointment_date),
+        'appointment_time': format_time(appointment_time),
+        'status': status,
+        'created_at': format_datetime(created_at),
+        'notes': notes
+    }
+
+def _encode_cursor(appointment_date, appointment_time, appointment_id):
+    raw = f"{appointment_date.isoformat()}|{appointment_time.isoformat()}|{appointment_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def _decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        date_str, time_str, id_str = raw.split('|')
+        return date.fromisoformat(date_str), time.fromisoformat(time_str), int(id_str)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError('Cursor inválido') from e
+
+def _revenue_report(professional, args):
+    """
+    Série de receita do profissional conforme os parâmetros da requisição
+    """
+    # Parâmetros: granularity (day, week, month, year) e intervalo opcional
+    granularity = args.get('granularity') or args.get('period', 'month')
+    if granularity not in REVENUE_GRANULARITIES:
+        raise ValueError('Granularidade inválida')
+    
+    try:
+        start_date, end_date = _revenue_window(granularity, args.get('from'), args.get('to'))
+    except ValueError:
+        raise ValueError('Formato de data inválido')
+    
+    if end_date < start_date:
+        raise ValueError('A data final deve ser posterior à data inicial')
+    
+    # Períodos do intervalo, em ordem cronológica
+    buckets = []
+    bucket = _bucket_start(start_date, granularity)
+    while bucket <= end_date:
+        buckets.append(bucket)
+        if len(buckets) > MAX_REVENUE_BUCKETS:
+            raise ValueError(f'O intervalo excede {MAX_REVENUE_BUCKETS} períodos')
+        bucket = _next_bucket(bucket, granularity)
+    
+    # Receita diária do intervalo em uma única consulta sobre o agregado; o
+    # agrupamento por período é feito aqui para não depender de funções de
+    # data específicas de cada banco (strftime no SQLite, date_trunc no PostgreSQL)
+    rows = db.session.query(
+        DailyRollup.day,
+        func.sum(DailyRollup.revenue).label('total')
+    ).filter(
+        DailyRollup.professional_id == professional.id,
+        DailyRollup.day >= start_date,
+        DailyRollup.day <= end_date,
+        DailyRollup.status.in_(['confirmado', 'concluido'])
+    ).group_by(DailyRollup.day).all()
+    
+    totals = {}
+    for row in rows:
+        bucket = _bucket_start(row.day, granularity)
+        totals[bucket] = totals.get(bucket, 0) + (row.total or 0)
+    
+    # Ocorrências geradas das séries confirmadas (fora do agregado)
+    series, exceptions = recurrence_expansion.load_series(
+        db.session, start_date, end_date, (Appointment.status, Service.price), professional.id
+    )
+    confirmed = [
+        row for row in series
+        if recurrence_expansion.occurrence_status(row.status) in ('confirmado', 'concluido')
+    ]
+    for row, day in recurrence_expansion.expand(confirmed, exceptions, start_date, end_date):
+        bucket = _bucket_start(day, granularity)
+        totals[bucket] = totals.get(bucket, 0) + (row.price or 0)
+    
+    # Períodos sem agendamentos entram com receita zero
+    revenue_data = []
+    for bucket in buckets:
+        total = totals.get(bucket)
+        revenue_data.append({
+            'period': _bucket_period(bucket, granularity),
+            'period_label': _bucket_label(bucket, granularity),
+            'revenue': float(total) if total else 0
+        })
+    
+    return {
+        'revenue_data': revenue_data,
+        'period': granularity,
+        'from': start_date.isoformat(),
+        'to': end_date.isoformat()
+    }
+
+def _export_response(body, export_format, name):
+    mimetype, extension = EXPORT_FORMATS[export_format]
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={name}.{extension}'}
+    )
 
 @reports_bp.route('/reports/dashboard', methods=['GET'])
 def get_dashboard_stats():
@@ -25,61 +356,73 @@ def get_dashboard_stats():
         start_of_month = today.replace(day=1)
         start_of_week = today - timedelta(days=today.weekday())
         
-        # Estatísticas básicas
-        total_appointments = Appointment.query.filter_by(
-            professional_id=professional.id
-        ).count()
-        
-        appointments_this_month = Appointment.query.filter(
-            Appointment.professional_id == professional.id,
-            Appointment.appointment_date >= start_of_month
-        ).count()
-        
-        appointments_this_week = Appointment.query.filter(
-            Appointment.professional_id == professional.id,
-            Appointment.appointment_date >= start_of_week
-        ).count()
-        
-        appointments_today = Appointment.query.filter(
-            Appointment.professional_id == professional.id,
-            Appointment.appointment_date == today
-        ).count()
-        
-        # Agendamentos por status
-        status_stats = db.session.query(
-            Appointment.status,
-            func.count(Appointment.id).label('count')
-        ).filter(
-            Appointment.professional_id == professional.id,
-            Appointment.appointment_date >= start_of_month
-        ).group_by(Appointment.status).all()
-        
-        # Serviços mais populares
-        popular_services = db.session.query(
+        # Todas as estatísticas em uma única consulta sobre o agregado
+        # diário, com somas condicionais agrupadas por status e serviço
+        rows = db.session.query(
+            DailyRollup.status,
             Service.name,
-            func.count(Appointment.id).label('count')
+            func.sum(DailyRollup.appointment_count).label('total'),
+            func.sum(case((DailyRollup.day >= start_of_month, DailyRollup.appointment_count), else_=0)).label('this_month'),
+            func.sum(case((DailyRollup.day >= start_of_week, DailyRollup.appointment_count), else_=0)).label('this_week'),
+            func.sum(case((DailyRollup.day == today, DailyRollup.appointment_count), else_=0)).label('today'),
+            func.sum(case((DailyRollup.day >= start_of_month, DailyRollup.revenue), else_=0)).label('month_revenue')
         ).join(
-            Appointment, Service.id == Appointment.service_id
+            Service, Service.id == DailyRollup.service_id
         ).filter(
-            Appointment.professional_id == professional.id,
-            Appointment.appointment_date >= start_of_month
-        ).group_by(Service.name).order_by(
-            func.count(Appointment.id).desc()
-        ).limit(5).all()
-        
-        # Receita estimada (se os serviços têm preço)
-        revenue_query = db.session.query(
-            func.sum(Service.price).label('total_revenue')
-        ).join(
-            Appointment, Service.id == Appointment.service_id
-        ).filter(
-            Appointment.professional_id == professional.id,
-            Appointment.appointment_date >= start_of_month,
-            Appointment.status.in_(['confirmado', 'concluido']),
-            Service.price.isnot(None)
-        ).first()
+            DailyRollup.professional_id == professional.id
+        ).group_by(
+            DailyRollup.status, DailyRollup.service_id, Service.name
+        ).all()
         
-        estimated_revenue = revenue_query.total_revenue if revenue_query.total_revenue else 0
+        total_appointments = 0
+        appointments_this_month = 0
+        appointments_this_week = 0
+        appointments_today = 0
+        estimated_revenue = 0
+        status_counts = {}
+        service_counts = {}
+        
+        for row in rows:
+            this_month = row.this_month or 0
+            total_appointments += row.total or 0
+            appointments_this_month += this_month
+            appointments_this_week += row.this_week or 0
+            appointments_today += row.today or 0
+            
+            if this_month:
+                # Agendamentos por status
+                status_counts[row.status] = status_counts.get(row.status, 0) + this_month
+                # Serviços mais populares
+                service_counts[row.name] = service_counts.get(row.name, 0) + this_month
+                # Receita estimada (se os serviços têm preço)
+                if row.status in ('confirmado', 'concluido'):
+                    estimated_revenue += row.month_revenue or 0
+        
+        # Ocorrências geradas das séries, contadas sem gerar as datas; as séries
+        # sem fim entram até o fim do mês atual
+        end_of_week = start_of_week + timedelta(days=6)
+        end_of_month = _add_months(start_of_month, 1) - timedelta(days=1)
+        series, exceptions = recurrence_expansion.load_series(
+            db.session, date.min, end_of_month, (Appointment.status, Service.name, Service.price), professional.id
+        )
+        for row in series:
+            rule = tuple(row[1:6])
+            skip = exceptions.get(row.rule_id, ())
+            status = recurrence_expansion.occurrence_status(row.status)
+            this_month = recurrence_expansion.series_count(rule, start_of_month, end_of_month, skip)
+            total_appointments += recurrence_expansion.series_count(rule, date.min, end_of_month, skip)
+            appointments_this_month += this_month
+            appointments_this_week += recurrence_expansion.series_count(rule, start_of_week, end_of_week, skip)
+            appointments_today += recurrence_expansion.series_count(rule, today, today, skip)
+            
+            if this_month:
+                status_counts[status] = status_counts.get(status, 0) + this_month
+                service_counts[row.name] = service_counts.get(row.name, 0) + this_month
+                if status in ('confirmado', 'concluido'):
+                    estimated_revenue += this_month * (row.price or 0)
+        
+        status_stats = sorted(status_counts.items(), key=lambda item: str(item[0]))
+        popular_services = sorted(service_counts.items(), key=lambda item: (-item[1], item[0]))[:5]
         
         return jsonify({
             'stats': {
@@ -109,74 +452,118 @@ def get_appointments_report():
         if not professional:
             return jsonify({'error': 'Não autenticado'}), 401
         
-        # Parâmetros de filtro
-        start_date = request.args.get('start_date')
-        end_date = request.args.get('end_date')
-        status = request.args.get('status')
-        service_id = request.args.get('service_id')
-        
-        # Query base
-        query = Appointment.query.filter_by(professional_id=professional.id)
+        try:
+            query, filters_applied = _appointments_report_query(professional, request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        # Aplicar filtros
-        if start_date:
+        # Paginação por cursor (appointment_date, appointment_time, id)
+        cursor = request.args.get('cursor')
+        decoded_cursor = None
+        if cursor:
             try:
-                start_date_obj = datetime.strptime(start_date, '%Y-%m-%d').date()
-                query = query.filter(Appointment.appointment_date >= start_date_obj)
+                decoded_cursor = cursor_date, cursor_time, cursor_id = _decode_cursor(cursor)
             except ValueError:
-                return jsonify({'error': 'Formato de data inválido para start_date'}), 400
+                return jsonify({'error': 'Cursor inválido'}), 400
+            query = query.filter(
+                tuple_(Appointment.appointment_date, Appointment.appointment_time, Appointment.id)
+                < tuple_(literal(cursor_date, Date), literal(cursor_time, Time), literal(cursor_id, Integer))
+            )
         
-        if end_date:
+        limit = request.args.get('limit')
+        if limit is not None:
             try:
-                end_date_obj = datetime.strptime(end_date, '%Y-%m-%d').date()
-                query = query.filter(Appointment.appointment_date <= end_date_obj)
+                limit = int(limit)
             except ValueError:
-                return jsonify({'error': 'Formato de data inválido para end_date'}), 400
+                return jsonify({'error': 'Parâmetro limit deve ser um número inteiro'}), 400
+            if not 1 <= limit <= REPORT_MAX_PAGE_SIZE:
+                return jsonify({'error': f'limit deve estar entre 1 e {REPORT_MAX_PAGE_SIZE}'}), 400
+        series_rows = _series_report_rows(professional, request.args, decoded_cursor)
         
-        if status:
-            query = query.filter(Appointment.status == status)
+        # NDJSON: uma linha por agendamento, enviada conforme lida do banco
+        # (sem limit, o intervalo inteiro)
+        if request.args.get('format') == 'ndjson':
+            if limit:
+                query = query.limit(limit)
+            rows = _merge_series_rows(query.execution_options(yield_per=REPORT_STREAM_BATCH_SIZE), series_rows)
+            if limit:
+                rows = itertools.islice(rows, limit)
+            
+            def generate():
+                for row in rows:
+                    yield dumps_line(_appointment_report_row(row)) + '\n'
+            
+            return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
         
-        if service_id:
-            query = query.filter(Appointment.service_id == int(service_id))
+        limit = limit or REPORT_PAGE_SIZE
+        rows = list(itertools.islice(_merge_series_rows(query.limit(limit + 1).all(), series_rows), limit + 1))
         
-        # Executar query
-        appointments = query.order_by(
-            Appointment.appointment_date.desc(),
-            Appointment.appointment_time.desc()
-        ).all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = _encode_cursor(last.appointment_date, last.appointment_time, last.id)
         
-        # Preparar dados para o relatório
-        report_data = []
-        for apt in appointments:
-            service = Service.query.get(apt.service_id)
-            report_data.append({
-                'id': apt.id,
-                'client_name': apt.client_name,
-                'client_phone': apt.client_phone,
-                'client_email': apt.client_email,
-                'service_name': service.name if service else 'N/A',
-                'service_price': service.price if service else 0,
-                'appointment_date': apt.appointment_date.isoformat(),
-                'appointment_time': apt.appointment_time.strftime('%H:%M'),
-                'status': apt.status,
-                'created_at': apt.created_at.isoformat(),
-                'notes': apt.notes
-            })
+        report_data = [_appointment_report_row(row) for row in rows]
         
         return jsonify({
             'appointments': report_data,
             'total_count': len(report_data),
-            'filters_applied': {
-                'start_date': start_date,
-                'end_date': end_date,
-                'status': status,
-                'service_id': service_id
-            }
+            'next_cursor': next_cursor,
+            'filters_applied': filters_applied
         }), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@reports_bp.route('/reports/appointments/export', methods=['GET'])
+def export_appointments_report():
+    try:
+        professional = require_auth()
+        if not professional:
+            return jsonify({'error': 'Não autenticado'}), 401
+        
+        export_format = request.args.get('format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({'error': 'Formato de exportação inválido'}), 400
+        if export_format != 'csv' and not report_export.arrow_available():
+            return jsonify({'error': 'Exportação em Parquet/Arrow requer o pacote pyarrow'}), 501
+        
+        try:
+            query, _ = _appointments_report_query(professional, request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # Linhas lidas do banco em lotes, sem carregar o resultado inteiro,
+        # intercaladas com as ocorrências geradas das séries
+        rows = _merge_series_rows(
+            query.execution_options(yield_per=REPORT_STREAM_BATCH_SIZE),
+            _series_report_rows(professional, request.args)
+        )
+        
+        if export_format == 'csv':
+            body = report_export.iter_csv(
+                (_appointment_report_row(row) for row in rows),
+                report_export.APPOINTMENT_COLUMNS
+            )
+        elif export_format == 'parquet':
+            body = report_export.iter_parquet(
+                (row._asdict() for row in rows),
+                report_export.appointment_schema(),
+                REPORT_STREAM_BATCH_SIZE
+            )
+        else:
+            body = report_export.iter_arrow_stream(
+                (row._asdict() for row in rows),
+                report_export.appointment_schema(),
+                REPORT_STREAM_BATCH_SIZE
+            )
+        
+        return _export_response(body, export_format, 'agendamentos')
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @reports_bp.route('/reports/revenue', methods=['GET'])
 def get_revenue_report():
     try:
@@ -184,95 +571,43 @@ def get_revenue_report():
         if not professional:
             return jsonify({'error': 'Não autenticado'}), 401
         
-        # Parâmetros
-        period = request.args.get('period', 'month')  # month, week, year
-        
-        if period == 'month':
-            # Receita por mês nos últimos 12 meses
-            revenue_data = []
-            for i in range(12):
-                target_date = date.today().replace(day=1) - timedelta(days=i*30)
-                start_of_month = target_date.replace(day=1)
-                
-                if target_date.month == 12:
-                    end_of_month = target_date.replace(year=target_date.year + 1, month=1, day=1) - timedelta(days=1)
-                else:
-                    end_of_month = target_date.replace(month=target_date.month + 1, day=1) - timedelta(days=1)
-                
-                revenue = db.session.query(
-                    func.sum(Service.price).label('total')
-                ).join(
-                    Appointment, Service.id == Appointment.service_id
-                ).filter(
-                    Appointment.professional_id == professional.id,
-                    Appointment.appointment_date >= start_of_month,
-                    Appointment.appointment_date <= end_of_month,
-                    Appointment.status.in_(['confirmado', 'concluido']),
-                    Service.price.isnot(None)
-                ).first()
-                
-                revenue_data.append({
-                    'period': start_of_month.strftime('%Y-%m'),
-                    'period_label': start_of_month.strftime('%b/%Y'),
-                    'revenue': float(revenue.total) if revenue.total else 0
-                })
-            
-            revenue_data.reverse()  # Ordem cronológica
-            
-        elif period == 'week':
-            # Receita por semana nas últimas 8 semanas
-            revenue_data = []
-            for i in range(8):
-                start_of_week = date.today() - timedelta(days=date.today().weekday() + i*7)
-                end_of_week = start_of_week + timedelta(days=6)
-                
-                revenue = db.session.query(
-                    func.sum(Service.price).label('total')
-                ).join(
-                    Appointment, Service.id == Appointment.service_id
-                ).filter(
-                    Appointment.professional_id == professional.id,
-                    Appointment.appointment_date >= start_of_week,
-                    Appointment.appointment_date <= end_of_week,
-                    Appointment.status.in_(['confirmado', 'concluido']),
-                    Service.price.isnot(None)
-                ).first()
-                
-                revenue_data.append({
-                    'period': start_of_week.strftime('%Y-W%U'),
-                    'period_label': f"{start_of_week.strftime('%d/%m')} - {end_of_week.strftime('%d/%m')}",
-                    'revenue': float(revenue.total) if revenue.total else 0
-                })
-            
-            revenue_data.reverse()
-            
-        else:  # year
-            # Receita por ano
-            revenue_data = []
-            current_year = date.today().year
-            
-            for year in range(current_year - 2, current_year + 1):
-                revenue = db.session.query(
-                    func.sum(Service.price).label('total')
-                ).join(
-                    Appointment, Service.id == Appointment.service_id
-                ).filter(
-                    Appointment.professional_id == professional.id,
-                    extract('year', Appointment.appointment_date) == year,
-                    Appointment.status.in_(['confirmado', 'concluido']),
-                    Service.price.isnot(None)
-                ).first()
-                
-                revenue_data.append({
-                    'period': str(year),
-                    'period_label': str(year),
-                    'revenue': float(revenue.total) if revenue.total else 0
-                })
+        try:
+            report = _revenue_report(professional, request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        return jsonify({
-            'revenue_data': revenue_data,
-            'period': period
-        }), 200
+        return jsonify(report), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@reports_bp.route('/reports/revenue/export', methods=['GET'])
+def export_revenue_report():
+    try:
+        professional = require_auth()
+        if not professional:
+            return jsonify({'error': 'Não autenticado'}), 401
+        
+        export_format = request.args.get('format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({'error': 'Formato de exportação inválido'}), 400
+        if export_format != 'csv' and not report_export.arrow_available():
+            return jsonify({'error': 'Exportação em Parquet/Arrow requer o pacote pyarrow'}), 501
+        
+        try:
+            report = _revenue_report(professional, request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        rows = report['revenue_data']
+        if export_format == 'csv':
+            body = report_export.iter_csv(rows, report_export.REVENUE_COLUMNS)
+        elif export_format == 'parquet':
+            body = report_export.iter_parquet(rows, report_export.revenue_schema())
+        else:
+            body = report_export.iter_arrow_stream(rows, report_export.revenue_schema())
+        
+        return _export_response(body, export_format, 'receita')
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -288,51 +623,64 @@ def get_services_performance():
         days = int(request.args.get('days', 30))
         start_date = date.today() - timedelta(days=days)
         
-        # Performance por serviço
+        # Performance por serviço a partir do agregado diário
         services_performance = db.session.query(
             Service.id,
             Service.name,
             Service.price,
             Service.duration_minutes,
-            func.count(Appointment.id).label('total_appointments'),
+            func.sum(DailyRollup.appointment_count).label('total_appointments'),
             func.sum(
-                func.case(
-                    (Appointment.status == 'concluido', 1),
+                case(
+                    (DailyRollup.status == 'concluido', DailyRollup.appointment_count),
                     else_=0
                 )
             ).label('completed_appointments'),
             func.sum(
-                func.case(
-                    (Appointment.status == 'cancelado', 1),
+                case(
+                    (DailyRollup.status == 'cancelado', DailyRollup.appointment_count),
                     else_=0
                 )
             ).label('cancelled_appointments'),
             func.sum(
-                func.case(
-                    (Appointment.status.in_(['confirmado', 'concluido']), Service.price),
+                case(
+                    (DailyRollup.status.in_(['confirmado', 'concluido']), DailyRollup.revenue),
                     else_=0
                 )
             ).label('total_revenue')
         ).outerjoin(
-            Appointment, Service.id == Appointment.service_id
+            DailyRollup, db.and_(
+                DailyRollup.service_id == Service.id,
+                DailyRollup.day >= start_date
+            )
         ).filter(
             Service.professional_id == professional.id,
             Service.is_active == True
-        ).filter(
-            db.or_(
-                Appointment.appointment_date >= start_date,
-                Appointment.appointment_date.is_(None)
-            )
         ).group_by(
             Service.id, Service.name, Service.price, Service.duration_minutes
-        ).all()
+        ).order_by(Service.id).all()
+        
+        # Ocorrências geradas das séries até hoje, por serviço
+        today = date.today()
+        series_totals = {}
+        series_revenue = {}
+        series, exceptions = recurrence_expansion.load_series(
+            db.session, start_date, today, (Appointment.service_id, Appointment.status), professional.id
+        )
+        for row in series:
+            count = recurrence_expansion.series_count(
+                tuple(row[1:6]), start_date, today, exceptions.get(row.rule_id, ())
+            )
+            series_totals[row.service_id] = series_totals.get(row.service_id, 0) + count
+            if recurrence_expansion.occurrence_status(row.status) == 'confirmado':
+                series_revenue[row.service_id] = series_revenue.get(row.service_id, 0) + count
         
         performance_data = []
         for service in services_performance:
-            total = service.total_appointments or 0
+            total = (service.total_appointments or 0) + series_totals.get(service.id, 0)
             completed = service.completed_appointments or 0
             cancelled = service.cancelled_appointments or 0
-            revenue = service.total_revenue or 0
+            revenue = (service.total_revenue or 0) + series_revenue.get(service.id, 0) * (service.price or 0)
             
             completion_rate = (completed / total * 100) if total > 0 else 0
             cancellation_rate = (cancelled / total * 100) if total > 0 else 0
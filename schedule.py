@@ -13,6 +13,10 @@ class Schedule(db.Model):
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_schedule_professional_day', 'professional_id', 'day_of_week'),
+    )
+
     def __repr__(self):
         return f'<Schedule {self.day_of_week} {self.start_time}-{self.end_time}>'
 
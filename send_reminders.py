@@ -0,0 +1,44 @@
+"""
+Envia os lembretes dos agendamentos de amanhã (ou de outro intervalo).
+
+Uso (agendado no cron, por exemplo todo dia às 18h):
+    python send_reminders.py
+    python send_reminders.py --date 2025-07-10 --days 2
+
+A concorrência e o limite de taxa do gateway vêm de NOTIFICATION_CONCURRENCY,
+NOTIFICATION_RATE_LIMIT e NOTIFICATION_RATE_BURST.
+"""
+import argparse
+import os
+from datetime import date, timedelta
+
+# Este processo só envia os lembretes; a fila é consumida pela aplicação
+os.environ.setdefault('NOTIFICATION_WORKERS', '0')
+
+from src.main import app
+from src.services.reminder_dispatcher import ReminderDispatcher
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument('--date', type=date.fromisoformat, help='Primeiro dia (padrão: amanhã)')
+parser.add_argument('--days', type=int, default=1, help='Quantidade de dias a partir de --date')
+parser.add_argument('--batch-size', type=int, default=500, help='Agendamentos por lote')
+args = parser.parse_args()
+
+start_date = args.date or date.today() + timedelta(days=1)
+end_date = start_date + timedelta(days=args.days - 1)
+
+with app.app_context():
+    dispatcher = ReminderDispatcher(batch_size=args.batch_size)
+    stats = dispatcher.dispatch(start_date, end_date)
+    for number, batch in enumerate(stats['batches'], 1):
+        latency = batch['latency_ms']
+        print(
+            f"Lote {number}: {batch['sent']}/{batch['messages']} enviados, "
+            f"{batch['throughput_per_second']}/s, latência p50 {latency['p50']}ms "
+            f"p95 {latency['p95']}ms p99 {latency['p99']}ms"
+        )
+    print(
+        f"Lembretes de {start_date} a {end_date}: {stats['sent']} enviados, "
+        f"{stats['failed']} na fila para nova tentativa, de {stats['selected']} "
+        f"agendamentos em {stats['elapsed_seconds']}s"
+    )
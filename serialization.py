@@ -0,0 +1,136 @@
+import json
+from functools import lru_cache
+from flask.json.provider import DefaultJSONProvider
+from src.models.professional import Professional
+from src.models.service import Service
+from src.models.schedule import Schedule
+from src.models.appointment import Appointment
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional; sem ele, usa o json da biblioteca padrão
+    orjson = None
+
+
+@lru_cache(maxsize=8192)
+def format_date(value):
+    """
+    Data em ISO 8601 (o mesmo de `date.isoformat()`), com cache: listas
+    repetem poucas datas distintas
+    """
+    return value.isoformat() if value is not None else None
+
+
+@lru_cache(maxsize=2048)
+def format_time(value):
+    """
+    Horário no formato HH:MM usado pela API
+    """
+    return f"{value.hour:02d}:{value.minute:02d}" if value is not None else None
+
+
+def format_datetime(value):
+    # Carimbos de criação quase nunca se repetem: cache não compensa
+    return value.isoformat() if value is not None else None
+
+
+def dumps_line(obj):
+    """
+    Um objeto por linha (NDJSON): chaves na ordem do dict, sem escapar acentos
+    """
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, ensure_ascii=False)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Provedor JSON do Flask que usa orjson quando disponível.
+
+    Mantém o comportamento do provedor padrão (chaves ordenadas, datas no
+    formato HTTP, o mesmo tratamento de tipos especiais); sem orjson, ou
+    com opções que ele não suporta, delega para o provedor padrão.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def response(self, *args, **kwargs):
+        if orjson is None or self.app.debug:
+            # Em modo debug o provedor padrão indenta a resposta
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self.app.response_class(f"{self.dumps(obj)}\n", mimetype=self.mimetype)
+
+
+class RowSerializer:
+    """
+    Converte linhas de consultas por colunas em dicts, sem montar objetos
+    do ORM.
+
+    `fields` é uma sequência de (chave, coluna, formatador ou None). Use
+    `columns` no select e `serialize`/`serialize_all` nas linhas obtidas:
+    o resultado é o mesmo do `to_dict` do modelo correspondente.
+    """
+
+    def __init__(self, fields):
+        self.keys = tuple(key for key, _, _ in fields)
+        self.columns = tuple(column for _, column, _ in fields)
+        self._formatters = tuple(
+            (position, formatter)
+            for position, (_, _, formatter) in enumerate(fields)
+            if formatter is not None
+        )
+
+    def serialize(self, row):
+        if not self._formatters:
+            return dict(zip(self.keys, row))
+        values = list(row)
+        for position, formatter in self._formatters:
+            values[position] = formatter(values[position])
+        return dict(zip(self.keys, values))
+
+    def serialize_all(self, rows):
+        serialize = self.serialize
+        return [serialize(row) for row in rows]
+
+
+def _model_fields(model, names, formatters):
+    return [(name, getattr(model, name), formatters.get(name)) for name in names]
+
+
+# Mesmos campos e formatos dos métodos to_dict dos modelos
+professional_serializer = RowSerializer(_model_fields(
+    Professional,
+    ('id', 'name', 'email', 'phone', 'description', 'address', 'is_public', 'created_at'),
+    {'created_at': format_datetime}
+))
+
+service_serializer = RowSerializer(_model_fields(
+    Service,
+    ('id', 'professional_id', 'name', 'description', 'duration_minutes', 'price',
+     'is_active', 'requires_address', 'created_at'),
+    {'created_at': format_datetime}
+))
+
+schedule_serializer = RowSerializer(_model_fields(
+    Schedule,
+    ('id', 'professional_id', 'day_of_week', 'start_time', 'end_time', 'break_start',
+     'break_end', 'max_appointments_per_slot', 'is_active', 'created_at'),
+    {'start_time': format_time, 'end_time': format_time, 'break_start': format_time,
+     'break_end': format_time, 'created_at': format_datetime}
+))
+
+appointment_serializer = RowSerializer(_model_fields(
+    Appointment,
+    ('id', 'professional_id', 'service_id', 'client_name', 'client_phone', 'client_email',
+     'client_address', 'appointment_date', 'appointment_time', 'status', 'notes',
+     'created_at', 'updated_at', 'notification_sent', 'reminder_sent'),
+    {'appointment_date': format_date, 'appointment_time': format_time,
+     'created_at': format_datetime, 'updated_at': format_datetime}
+))
@@ -15,6 +15,10 @@ class Service(db.Model):
     # Relacionamentos
     appointments = db.relationship('Appointment', backref='service', lazy=True)
 
+    __table_args__ = (
+        db.Index('ix_service_professional_active', 'professional_id', 'is_active'),
+    )
+
     def __repr__(self):
         return f'<Service {self.name}>'
 
@@ -0,0 +1,30 @@
+from src.models.professional import db
+
+class SlotOccupancy(db.Model):
+    """
+    Ocupação de um intervalo de minutos da agenda de um profissional.
+
+    Cada agendamento ativo ocupa todos os intervalos que cobre; a reserva é
+    um UPDATE condicional (`occupied < capacity`), o que impede que dois
+    agendamentos simultâneos ultrapassem o limite do horário. Mantida por
+    src/services/slot_reservation.py.
+    """
+    __tablename__ = 'slot_occupancy'
+
+    professional_id = db.Column(db.Integer, db.ForeignKey('professional.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    minute = db.Column(db.Integer, primary_key=True)  # Minuto do dia em que o intervalo começa
+    capacity = db.Column(db.Integer, nullable=False, default=1)
+    occupied = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<SlotOccupancy {self.professional_id} {self.day} {self.minute}>'
+
+    def to_dict(self):
+        return {
+            'professional_id': self.professional_id,
+            'day': self.day.isoformat() if self.day else None,
+            'minute': self.minute,
+            'capacity': self.capacity,
+            'occupied': self.occupied
+        }
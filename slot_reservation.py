@@ -0,0 +1,475 @@
+from datetime import date, timedelta
+from sqlalchemy import event, inspect, select
+from sqlalchemy.dialects import postgresql, sqlite
+from src.models.appointment import Appointment
+from src.models.service import Service
+from src.models.schedule import Schedule
+from src.models.slot_occupancy import SlotOccupancy
+from src.models.recurrence_rule import RecurrenceRule
+from src.models.recurrence_exception import RecurrenceException
+from src.services.recurrence_expansion import RECURRENCE_HORIZON_DAYS, expand, load_series, series_dates
+
+occupancy_table = SlotOccupancy.__table__
+
+SLOT_MINUTES = 5  # Resolução dos intervalos reservados
+MINUTES_PER_DAY = 24 * 60
+CANCELLED_STATUS = 'cancelado'
+# Limite fora do expediente e nos intervalos: a rota valida o horário de
+# funcionamento; aqui só se impede a sobreposição de agendamentos
+DEFAULT_CAPACITY = 1
+
+
+class SlotUnavailable(Exception):
+    """
+    O horário pedido já atingiu o limite de agendamentos
+    """
+
+    def __init__(self, professional_id, day, minute):
+        self.professional_id = professional_id
+        self.day = day
+        self.minute = minute
+        super().__init__(
+            f"Horário indisponível: {day.isoformat()} {minute // 60:02d}:{minute % 60:02d} já está lotado"
+        )
+
+
+def _to_minute(value):
+    return value.hour * 60 + value.minute
+
+
+def _slot_range(start, duration):
+    """
+    Minutos iniciais dos intervalos cobertos por [start, start + duration)
+    """
+    first = start - start % SLOT_MINUTES
+    end = min(start + max(int(duration or 1), 1), MINUTES_PER_DAY)
+    return range(first, end, SLOT_MINUTES)
+
+
+def _capacities(schedules, minutes):
+    """
+    Limite de cada intervalo segundo os horários ativos do dia (mesma regra
+    do motor de disponibilidade: o maior limite entre os horários abertos)
+    """
+    capacity = dict.fromkeys(minutes, DEFAULT_CAPACITY)
+    for schedule in schedules:
+        start, end = _to_minute(schedule.start_time), _to_minute(schedule.end_time)
+        limit = max(schedule.max_appointments_per_slot or 1, 1)
+        for minute in minutes:
+            if start <= minute < end:
+                capacity[minute] = max(capacity[minute], limit)
+    for schedule in schedules:
+        if schedule.break_start and schedule.break_end:
+            start, end = _to_minute(schedule.break_start), _to_minute(schedule.break_end)
+            for minute in minutes:
+                if start <= minute < end:
+                    capacity[minute] = DEFAULT_CAPACITY
+    return capacity
+
+
+def _day_schedules(connection, professional_id, day):
+    return connection.execute(
+        select(
+            Schedule.start_time, Schedule.end_time, Schedule.break_start,
+            Schedule.break_end, Schedule.max_appointments_per_slot
+        ).where(
+            Schedule.professional_id == professional_id,
+            Schedule.day_of_week == day.weekday(),
+            Schedule.is_active == True
+        )
+    ).all()
+
+
+SERIES_SLOT_COLUMNS = (Appointment.appointment_time, Service.duration_minutes)
+
+
+def _series_occupancy(connection, professional_id, start, end):
+    """
+    {(dia, minuto): ocorrências} das séries recorrentes no intervalo; as
+    ocorrências geradas não têm linha em `appointment`
+    """
+    occupied = {}
+    for row, day in expand(*load_series(connection, start, end, SERIES_SLOT_COLUMNS, professional_id), start, end):
+        for minute in _slot_range(_to_minute(row.appointment_time), row.duration_minutes):
+            occupied[(day, minute)] = occupied.get((day, minute), 0) + 1
+    return occupied
+
+
+def _ensure_slots(connection, professional_id, day, minutes):
+    """
+    Cria as linhas de ocupação que ainda não existem para os intervalos,
+    já contando as ocorrências das séries recorrentes do dia
+    """
+    capacity = _capacities(_day_schedules(connection, professional_id, day), minutes)
+    series = _series_occupancy(connection, professional_id, day, day)
+    rows = [
+        {'professional_id': professional_id, 'day': day, 'minute': minute,
+         'capacity': capacity[minute], 'occupied': series.get((day, minute), 0)}
+        for minute in minutes
+    ]
+
+    if connection.dialect.name in ('sqlite', 'postgresql'):
+        insert = sqlite.insert if connection.dialect.name == 'sqlite' else postgresql.insert
+        connection.execute(insert(occupancy_table).on_conflict_do_nothing(
+            index_elements=['professional_id', 'day', 'minute']
+        ), rows)
+        return
+
+    existing = set(connection.execute(
+        select(occupancy_table.c.minute).where(
+            occupancy_table.c.professional_id == professional_id,
+            occupancy_table.c.day == day,
+            occupancy_table.c.minute.in_(list(minutes))
+        )
+    ).scalars())
+    missing = [row for row in rows if row['minute'] not in existing]
+    if missing:
+        connection.execute(occupancy_table.insert(), missing)
+
+
+def _slot_filter(professional_id, day, minutes):
+    return (
+        occupancy_table.c.professional_id == professional_id,
+        occupancy_table.c.day == day,
+        occupancy_table.c.minute >= minutes[0],
+        occupancy_table.c.minute <= minutes[-1]
+    )
+
+
+def _duration(connection, service_id):
+    return connection.execute(
+        select(Service.duration_minutes).where(Service.id == service_id)
+    ).scalar()
+
+
+def _tracked(slot):
+    """
+    Só agendamentos ativos de hoje em diante ocupam intervalos
+    """
+    professional_id, service_id, day, appointment_time, status = slot
+    return (
+        professional_id is not None and day is not None and appointment_time is not None
+        and status != CANCELLED_STATUS and day >= date.today()
+    )
+
+
+def reserve(connection, slot):
+    """
+    Ocupa os intervalos de um agendamento ou levanta SlotUnavailable.
+
+    A verificação e a reserva são um único UPDATE condicional: com vários
+    processos disputando o mesmo horário, o banco serializa as escritas nas
+    mesmas linhas e só os que ainda encontram vaga as alteram.
+    """
+    if not _tracked(slot):
+        return
+    professional_id, service_id, day, appointment_time, status = slot
+    minutes = list(_slot_range(_to_minute(appointment_time), _duration(connection, service_id)))
+    _ensure_slots(connection, professional_id, day, minutes)
+
+    result = connection.execute(
+        occupancy_table.update().where(
+            *_slot_filter(professional_id, day, minutes),
+            occupancy_table.c.occupied < occupancy_table.c.capacity
+        ).values(occupied=occupancy_table.c.occupied + 1)
+    )
+    if result.rowcount != len(minutes):
+        # Algum intervalo estava lotado; a exceção desfaz a transação inteira,
+        # inclusive os intervalos que chegaram a ser incrementados
+        full = connection.execute(
+            select(occupancy_table.c.minute).where(
+                *_slot_filter(professional_id, day, minutes),
+                occupancy_table.c.occupied >= occupancy_table.c.capacity
+            ).order_by(occupancy_table.c.minute)
+        ).scalar()
+        raise SlotUnavailable(professional_id, day, full if full is not None else minutes[0])
+
+
+def release(connection, slot):
+    """
+    Libera os intervalos de um agendamento
+    """
+    if not _tracked(slot):
+        return
+    professional_id, service_id, day, appointment_time, status = slot
+    minutes = list(_slot_range(_to_minute(appointment_time), _duration(connection, service_id)))
+    connection.execute(
+        occupancy_table.update().where(
+            *_slot_filter(professional_id, day, minutes),
+            occupancy_table.c.occupied > 0
+        ).values(occupied=occupancy_table.c.occupied - 1)
+    )
+
+
+SLOT_FIELDS = ('professional_id', 'service_id', 'appointment_date', 'appointment_time', 'status')
+
+
+def _previous_value(state, name):
+    history = state.attrs[name].history
+    values = history.deleted or history.unchanged
+    return values[0] if values else getattr(state.obj(), name)
+
+
+def _current_slot(target):
+    return tuple(getattr(target, name) for name in SLOT_FIELDS)
+
+
+def _previous_slot(target):
+    state = inspect(target)
+    return tuple(_previous_value(state, name) for name in SLOT_FIELDS)
+
+
+@event.listens_for(Appointment, 'after_insert')
+def _reserve_appointment_insert(mapper, connection, target):
+    reserve(connection, _current_slot(target))
+
+
+@event.listens_for(Appointment, 'after_update')
+def _reserve_appointment_update(mapper, connection, target):
+    before, after = _previous_slot(target), _current_slot(target)
+    # Troca entre status ativos (agendado -> confirmado) não mexe na ocupação
+    if _tracked(before) != _tracked(after) or before[:4] != after[:4]:
+        # Libera antes de reservar: remarcar para um horário que se sobrepõe
+        # ao atual não deve contar o próprio agendamento
+        release(connection, before)
+        reserve(connection, after)
+
+
+@event.listens_for(Appointment, 'after_update')
+def _reserve_template_update(mapper, connection, target):
+    # Horário ou serviço do agendamento de origem valem para toda a série
+    before, after = _previous_slot(target), _current_slot(target)
+    if before[:4] == after[:4]:
+        return
+    rule = connection.execute(
+        select(RecurrenceRule.professional_id).where(RecurrenceRule.appointment_id == target.id)
+    ).first()
+    if rule is not None:
+        rebuild_slot_occupancy(connection, rule.professional_id)
+        if before[0] != rule.professional_id:
+            rebuild_slot_occupancy(connection, before[0])
+
+
+@event.listens_for(Appointment, 'after_delete')
+def _reserve_appointment_delete(mapper, connection, target):
+    release(connection, _previous_slot(target))
+
+
+def _series_days(connection, target):
+    """
+    Linha da série (com horário e duração) e os dias de hoje em diante em
+    que ela ocupa a agenda: o horizonte das listagens e os dias que já têm
+    linhas de ocupação
+    """
+    today = date.today()
+    last_day = connection.execute(
+        select(occupancy_table.c.day).where(
+            occupancy_table.c.professional_id == target.professional_id
+        ).order_by(occupancy_table.c.day.desc()).limit(1)
+    ).scalar()
+    end = max(today + timedelta(days=RECURRENCE_HORIZON_DAYS), last_day or today)
+    row = connection.execute(
+        select(RecurrenceRule.start_date, RecurrenceRule.frequency, RecurrenceRule.interval,
+               RecurrenceRule.until, RecurrenceRule.count, *SERIES_SLOT_COLUMNS).select_from(
+            RecurrenceRule
+        ).join(
+            Appointment, Appointment.id == RecurrenceRule.appointment_id
+        ).join(
+            Service, Service.id == Appointment.service_id
+        ).where(RecurrenceRule.id == target.id)
+    ).first()
+    return row, series_dates(tuple(row[:5]), today, end)
+
+
+@event.listens_for(RecurrenceRule, 'after_insert')
+def _reserve_rule_insert(mapper, connection, target):
+    """
+    Reserva as ocorrências da nova série até o horizonte ou levanta
+    SlotUnavailable na primeira que cair num horário lotado
+    """
+    row, days = _series_days(connection, target)
+    for day in days:
+        minutes = list(_slot_range(_to_minute(row.appointment_time), row.duration_minutes))
+        existing = list(connection.execute(
+            select(occupancy_table.c.minute).where(*_slot_filter(target.professional_id, day, minutes))
+        ).scalars())
+        # Linhas novas já nascem contando a série; as existentes são incrementadas
+        _ensure_slots(connection, target.professional_id, day, minutes)
+        if existing:
+            connection.execute(
+                occupancy_table.update().where(
+                    *_slot_filter(target.professional_id, day, minutes),
+                    occupancy_table.c.minute.in_(existing)
+                ).values(occupied=occupancy_table.c.occupied + 1)
+            )
+        full = connection.execute(
+            select(occupancy_table.c.minute).where(
+                *_slot_filter(target.professional_id, day, minutes),
+                occupancy_table.c.occupied > occupancy_table.c.capacity
+            ).order_by(occupancy_table.c.minute)
+        ).scalar()
+        if full is not None:
+            raise SlotUnavailable(target.professional_id, day, full)
+
+
+@event.listens_for(RecurrenceRule, 'after_update')
+def _reserve_rule_update(mapper, connection, target):
+    state = inspect(target)
+    if any(
+        state.attrs[name].history.has_changes()
+        for name in ('frequency', 'interval', 'start_date', 'until', 'count')
+    ):
+        rebuild_slot_occupancy(connection, target.professional_id)
+
+
+@event.listens_for(RecurrenceRule, 'after_delete')
+def _reserve_rule_delete(mapper, connection, target):
+    rebuild_slot_occupancy(connection, target.professional_id)
+
+
+@event.listens_for(RecurrenceException, 'after_insert')
+def _reserve_exception_insert(mapper, connection, target):
+    # A data deixa de ser gerada pela regra: libera o que ela ocupava
+    row = connection.execute(
+        select(RecurrenceRule.professional_id, Appointment.service_id, Appointment.appointment_time).join(
+            Appointment, Appointment.id == RecurrenceRule.appointment_id
+        ).where(RecurrenceRule.id == target.rule_id)
+    ).first()
+    if row is not None:
+        release(connection, (row.professional_id, row.service_id, target.occurrence_date,
+                             row.appointment_time, None))
+
+
+@event.listens_for(RecurrenceException, 'after_delete')
+def _reserve_exception_delete(mapper, connection, target):
+    professional_id = connection.execute(
+        select(RecurrenceRule.professional_id).where(RecurrenceRule.id == target.rule_id)
+    ).scalar()
+    if professional_id is not None:
+        rebuild_slot_occupancy(connection, professional_id)
+
+
+@event.listens_for(Service, 'after_update')
+def _reserve_service_duration_update(mapper, connection, target):
+    # Os agendamentos existentes passam a ocupar a nova duração
+    if inspect(target).attrs.duration_minutes.history.has_changes():
+        rebuild_slot_occupancy(connection, target.professional_id)
+
+
+@event.listens_for(Schedule, 'after_insert')
+@event.listens_for(Schedule, 'after_update')
+@event.listens_for(Schedule, 'after_delete')
+def _reserve_schedule_change(mapper, connection, target):
+    # Os limites vêm dos horários; a ocupação é preservada
+    refresh_capacity(connection, target.professional_id)
+
+
+def refresh_capacity(connection, professional_id):
+    """
+    Recalcula o limite das linhas futuras de um profissional após mudança
+    nos horários de atendimento
+    """
+    schedules_by_weekday = {}
+    for schedule in connection.execute(
+        select(
+            Schedule.day_of_week, Schedule.start_time, Schedule.end_time, Schedule.break_start,
+            Schedule.break_end, Schedule.max_appointments_per_slot
+        ).where(Schedule.professional_id == professional_id, Schedule.is_active == True)
+    ):
+        schedules_by_weekday.setdefault(schedule.day_of_week, []).append(schedule)
+
+    minutes_by_day = {}
+    for day, minute, capacity in connection.execute(
+        select(occupancy_table.c.day, occupancy_table.c.minute, occupancy_table.c.capacity).where(
+            occupancy_table.c.professional_id == professional_id,
+            occupancy_table.c.day >= date.today()
+        )
+    ):
+        minutes_by_day.setdefault(day, {})[minute] = capacity
+
+    for day, current in minutes_by_day.items():
+        capacity = _capacities(schedules_by_weekday.get(day.weekday(), []), list(current))
+        for minute, limit in capacity.items():
+            if limit != current[minute]:
+                connection.execute(
+                    occupancy_table.update().where(
+                        occupancy_table.c.professional_id == professional_id,
+                        occupancy_table.c.day == day,
+                        occupancy_table.c.minute == minute
+                    ).values(capacity=limit)
+                )
+
+
+def rebuild_slot_occupancy(connection, professional_id=None):
+    """
+    Recalcula a ocupação a partir dos agendamentos de hoje em diante (todos
+    ou de um profissional).
+
+    Necessário após cargas feitas sem passar pelo ORM e para popular a
+    tabela em bancos já existentes. Horários que já estavam acima do limite
+    ficam com `occupied > capacity` e não aceitam novos agendamentos.
+    """
+    delete = occupancy_table.delete()
+    if professional_id is not None:
+        delete = delete.where(occupancy_table.c.professional_id == professional_id)
+    connection.execute(delete)
+
+    appointments = select(
+        Appointment.professional_id, Appointment.appointment_date,
+        Appointment.appointment_time, Service.duration_minutes
+    ).join(
+        Service, Service.id == Appointment.service_id
+    ).where(
+        Appointment.appointment_date >= date.today(),
+        (Appointment.status != CANCELLED_STATUS) | (Appointment.status == None)
+    )
+    if professional_id is not None:
+        appointments = appointments.where(Appointment.professional_id == professional_id)
+
+    occupied = {}
+    for row_professional, day, appointment_time, duration in connection.execute(appointments):
+        for minute in _slot_range(_to_minute(appointment_time), duration):
+            key = (row_professional, day, minute)
+            occupied[key] = occupied.get(key, 0) + 1
+
+    # Ocorrências geradas das séries só entram nas linhas que os agendamentos
+    # gravados criaram; as demais são criadas sob demanda por `_ensure_slots`
+    if occupied:
+        today = date.today()
+        last_day = max(day for _, day, _ in occupied)
+        series = load_series(
+            connection, today, last_day, (RecurrenceRule.professional_id, *SERIES_SLOT_COLUMNS), professional_id
+        )
+        for row, day in expand(*series, today, last_day):
+            for minute in _slot_range(_to_minute(row.appointment_time), row.duration_minutes):
+                key = (row.professional_id, day, minute)
+                if key in occupied:
+                    occupied[key] += 1
+
+    schedules = {}
+    source = select(
+        Schedule.professional_id, Schedule.day_of_week, Schedule.start_time, Schedule.end_time,
+        Schedule.break_start, Schedule.break_end, Schedule.max_appointments_per_slot
+    ).where(Schedule.is_active == True)
+    if professional_id is not None:
+        source = source.where(Schedule.professional_id == professional_id)
+    for schedule in connection.execute(source):
+        schedules.setdefault((schedule.professional_id, schedule.day_of_week), []).append(schedule)
+
+    minutes_by_day = {}
+    for row_professional, day, minute in occupied:
+        minutes_by_day.setdefault((row_professional, day), []).append(minute)
+
+    rows = []
+    for (row_professional, day), minutes in minutes_by_day.items():
+        capacity = _capacities(schedules.get((row_professional, day.weekday()), []), minutes)
+        rows.extend(
+            {'professional_id': row_professional, 'day': day, 'minute': minute,
+             'capacity': capacity[minute], 'occupied': occupied[(row_professional, day, minute)]}
+            for minute in minutes
+        )
+        if len(rows) >= 50_000:
+            connection.execute(occupancy_table.insert(), rows)
+            rows = []
+    if rows:
+        connection.execute(occupancy_table.insert(), rows)
@@ -0,0 +1,146 @@
+from flask import Blueprint, request, jsonify
+from src.models.professional import db, Professional
+from src.models.service import Service
+from src.models.waitlist_entry import WaitlistEntry
+from src.services.authentication import require_auth
+from src.services.waitlist_backfill import WAITING, BOOKED, CANCELLED
+from datetime import datetime, date
+
+waitlist_bp = Blueprint('waitlist', __name__)
+
+WAITLIST_STATUSES = (WAITING, BOOKED, CANCELLED)
+
+
+def _parse_time(value):
+    return datetime.strptime(value, '%H:%M').time()
+
+
+@waitlist_bp.route('/waitlist', methods=['POST'])
+def join_waitlist():
+    """
+    Coloca o cliente na lista de espera de um dia e faixa de horário
+    """
+    try:
+        data = request.get_json() or {}
+
+        required_fields = ['professional_id', 'service_id', 'client_name', 'client_phone',
+                           'desired_date', 'window_start', 'window_end']
+        for field in required_fields:
+            if not data.get(field):
+                return jsonify({'error': f'Campo {field} é obrigatório'}), 400
+
+        try:
+            desired_date = datetime.strptime(data['desired_date'], '%Y-%m-%d').date()
+            window_start = _parse_time(data['window_start'])
+            window_end = _parse_time(data['window_end'])
+        except ValueError:
+            return jsonify({'error': 'Formato de data ou horário inválido'}), 400
+
+        if desired_date < date.today():
+            return jsonify({'error': 'A data deve ser hoje ou futura'}), 400
+        if window_start > window_end:
+            return jsonify({'error': 'O início da faixa deve ser anterior ao fim'}), 400
+
+        professional = db.session.get(Professional, int(data['professional_id']))
+        if not professional or not professional.is_public:
+            return jsonify({'error': 'Profissional não encontrado'}), 404
+
+        service = Service.query.filter_by(
+            id=int(data['service_id']),
+            professional_id=professional.id,
+            is_active=True
+        ).first()
+        if not service:
+            return jsonify({'error': 'Serviço não encontrado'}), 404
+
+        existing = WaitlistEntry.query.filter_by(
+            professional_id=professional.id,
+            desired_date=desired_date,
+            client_phone=data['client_phone'],
+            status=WAITING
+        ).first()
+        if existing:
+            return jsonify({'error': 'Você já está na lista de espera deste dia'}), 409
+
+        entry = WaitlistEntry(
+            professional_id=professional.id,
+            service_id=service.id,
+            client_name=data['client_name'],
+            client_phone=data['client_phone'],
+            client_email=data.get('client_email'),
+            client_address=data.get('client_address'),
+            notes=data.get('notes'),
+            desired_date=desired_date,
+            window_start=window_start,
+            window_end=window_end
+        )
+        db.session.add(entry)
+        db.session.commit()
+
+        return jsonify({
+            'message': 'Você entrou na lista de espera',
+            'entry': entry.to_dict()
+        }), 201
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
+@waitlist_bp.route('/waitlist', methods=['GET'])
+def list_waitlist():
+    """
+    Lista de espera do profissional logado (filtros opcionais: date, status)
+    """
+    try:
+        professional = require_auth()
+        if not professional:
+            return jsonify({'error': 'Não autenticado'}), 401
+
+        query = WaitlistEntry.query.filter_by(professional_id=professional.id)
+
+        date_str = request.args.get('date')
+        if date_str:
+            try:
+                query = query.filter_by(desired_date=datetime.strptime(date_str, '%Y-%m-%d').date())
+            except ValueError:
+                return jsonify({'error': 'Formato de data inválido'}), 400
+        else:
+            query = query.filter(WaitlistEntry.desired_date >= date.today())
+
+        status = request.args.get('status', WAITING)
+        if status not in WAITLIST_STATUSES:
+            return jsonify({'error': 'Status inválido'}), 400
+        query = query.filter_by(status=status)
+
+        entries = query.order_by(WaitlistEntry.desired_date, WaitlistEntry.id).all()
+        return jsonify({'entries': [entry.to_dict() for entry in entries]}), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@waitlist_bp.route('/waitlist/<int:entry_id>', methods=['DELETE'])
+def remove_from_waitlist(entry_id):
+    """
+    Retira um cliente da lista de espera do profissional logado
+    """
+    try:
+        professional = require_auth()
+        if not professional:
+            return jsonify({'error': 'Não autenticado'}), 401
+
+        entry = WaitlistEntry.query.filter_by(id=entry_id, professional_id=professional.id).first()
+        if not entry:
+            return jsonify({'error': 'Entrada não encontrada'}), 404
+        if entry.status != WAITING:
+            return jsonify({'error': 'A entrada não está mais aguardando'}), 409
+
+        entry.status = CANCELLED
+        db.session.commit()
+
+        return jsonify({'message': 'Cliente retirado da lista de espera'}), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,325 @@
+import heapq
+import logging
+import os
+import threading
+import time as clock
+from collections import deque
+from datetime import date, datetime
+from sqlalchemy import event, inspect, select, update
+from flask import current_app
+from sqlalchemy.orm import Session
+from src.models.professional import db
+from src.models.appointment import Appointment
+from src.models.service import Service
+from src.models.waitlist_entry import WaitlistEntry
+from src.services.availability_engine import availability_engine
+from src.services.slot_reservation import SlotUnavailable, CANCELLED_STATUS
+from src.services.notification_service import notification_service
+
+logger = logging.getLogger(__name__)
+
+WAITING = 'aguardando'
+BOOKED = 'agendado'
+CANCELLED = 'cancelado'
+# Candidatos testados por horário liberado (os demais continuam na fila)
+MAX_ATTEMPTS_PER_SLOT = 10
+
+
+def _to_minute(value):
+    return value.hour * 60 + value.minute
+
+
+class WaitlistIndex:
+    """
+    Índice em memória da lista de espera.
+
+    Um heap de ids (ordem de chegada) por (profissional, dia, faixa de
+    horário). Para um horário liberado, só as faixas do dia que o contêm são
+    consultadas, e os primeiros candidatos saem da frente dos heaps em
+    O(k log n), sem percorrer a fila. Entradas atendidas ou canceladas são
+    removidas de forma preguiçosa: ficam no heap até chegarem à frente.
+
+    A tabela `waitlist_entry` é a fonte de verdade: o índice é montado no
+    primeiro uso e remontado a cada `ttl_seconds`, para incluir entradas
+    gravadas por outros workers.
+    """
+
+    def __init__(self, ttl_seconds=60):
+        self.ttl_seconds = ttl_seconds
+        self._heaps = {}    # (profissional, dia, início, fim) -> heap de ids
+        self._windows = {}  # (profissional, dia) -> {(início, fim)}
+        self._active = {}   # id -> chave do heap
+        self._loaded_at = None
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_env(cls):
+        return cls(ttl_seconds=float(os.environ.get('WAITLIST_INDEX_TTL', 60)))
+
+    def _ensure_loaded(self):
+        if self._loaded_at is not None and clock.monotonic() - self._loaded_at < self.ttl_seconds:
+            return
+        rows = db.session.execute(
+            select(
+                WaitlistEntry.id, WaitlistEntry.professional_id, WaitlistEntry.desired_date,
+                WaitlistEntry.window_start, WaitlistEntry.window_end
+            ).where(WaitlistEntry.status == WAITING, WaitlistEntry.desired_date >= date.today())
+        ).all()
+        heaps, windows, active = {}, {}, {}
+        for entry_id, professional_id, day, window_start, window_end in rows:
+            window = (_to_minute(window_start), _to_minute(window_end))
+            key = (professional_id, day) + window
+            heaps.setdefault(key, []).append(entry_id)
+            windows.setdefault((professional_id, day), set()).add(window)
+            active[entry_id] = key
+        for heap in heaps.values():
+            heapq.heapify(heap)
+        with self._lock:
+            self._heaps, self._windows, self._active = heaps, windows, active
+            self._loaded_at = clock.monotonic()
+
+    def add(self, entry_id, professional_id, day, window_start, window_end):
+        window = (_to_minute(window_start), _to_minute(window_end))
+        key = (professional_id, day) + window
+        with self._lock:
+            if self._loaded_at is None:
+                return  # Entra na primeira montagem
+            self._discard(entry_id)
+            heapq.heappush(self._heaps.setdefault(key, []), entry_id)
+            self._windows.setdefault((professional_id, day), set()).add(window)
+            self._active[entry_id] = key
+
+    def discard(self, entry_id):
+        with self._lock:
+            self._discard(entry_id)
+
+    def _discard(self, entry_id):
+        key = self._active.pop(entry_id, None)
+        if key is not None:
+            self._prune(key)
+
+    def _prune(self, key):
+        # Remove da frente do heap as entradas que já não aguardam
+        heap = self._heaps.get(key)
+        while heap and self._active.get(heap[0]) != key:
+            heapq.heappop(heap)
+        if not heap:
+            self._heaps.pop(key, None)
+            windows = self._windows.get(key[:2])
+            if windows is not None:
+                windows.discard(key[2:])
+                if not windows:
+                    del self._windows[key[:2]]
+
+    def candidates(self, professional_id, day, minute, limit):
+        """
+        Até `limit` ids, em ordem de chegada, das entradas cuja faixa contém
+        o horário (minuto do dia)
+        """
+        self._ensure_loaded()
+        with self._lock:
+            keys = [
+                (professional_id, day) + window
+                for window in self._windows.get((professional_id, day), ())
+                if window[0] <= minute <= window[1]
+            ]
+            # Os k menores de vários heaps binários: a fronteira começa pelas
+            # raízes e cada item retirado acrescenta os seus dois filhos
+            frontier = []
+            for key in keys:
+                self._prune(key)
+                heap = self._heaps.get(key)
+                if heap:
+                    frontier.append((heap[0], key, 0))
+            heapq.heapify(frontier)
+            found = []
+            while frontier and len(found) < limit:
+                entry_id, key, position = heapq.heappop(frontier)
+                heap = self._heaps[key]
+                # Uma entrada regravada na mesma faixa aparece duas vezes no heap
+                if self._active.get(entry_id) == key and entry_id not in found:
+                    found.append(entry_id)
+                for child in (2 * position + 1, 2 * position + 2):
+                    if child < len(heap):
+                        heapq.heappush(frontier, (heap[child], key, child))
+            return found
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+
+
+class Waitlist:
+    """
+    Preenche com a lista de espera os horários liberados por cancelamentos.
+
+    Os cancelamentos confirmados (commit) entram numa fila de horários
+    liberados, processada depois que a resposta da requisição que os gerou
+    foi enviada (`init_app`) ou por `process_pending` em scripts. Para cada
+    horário, os candidatos são testados em ordem de chegada: o primeiro
+    cujo serviço cabe no expediente do dia e no horário (reserva atômica de
+    src/services/slot_reservation.py) recebe o agendamento e a confirmação
+    pelo WhatsApp.
+    """
+
+    def __init__(self, index):
+        self.index = index
+        self._pending = deque()
+
+    def init_app(self, app):
+        app.after_request(self._after_request)
+
+    def _after_request(self, response):
+        # Só ao fechar a resposta: quem cancelou não espera pela lista de espera
+        if self._pending:
+            app = current_app._get_current_object()
+            response.call_on_close(lambda: self._process_in_context(app))
+        return response
+
+    def _process_in_context(self, app):
+        with app.app_context():
+            try:
+                self.process_pending()
+            except Exception as e:
+                db.session.rollback()
+                logger.error("Erro ao preencher horários pela lista de espera: %s", e)
+
+    def slot_freed(self, professional_id, day, appointment_time):
+        self._pending.append((professional_id, day, appointment_time))
+
+    def process_pending(self):
+        """
+        Processa os horários liberados; retorna os agendamentos criados
+        """
+        created = []
+        while True:
+            try:
+                professional_id, day, appointment_time = self._pending.popleft()
+            except IndexError:
+                return created
+            appointment = self.backfill(professional_id, day, appointment_time)
+            if appointment is not None:
+                created.append(appointment)
+
+    def backfill(self, professional_id, day, appointment_time):
+        """
+        Agenda o primeiro candidato que cabe no horário liberado, ou None
+        """
+        if datetime.combine(day, appointment_time) <= datetime.now():
+            return None
+        candidates = self.index.candidates(
+            professional_id, day, _to_minute(appointment_time), MAX_ATTEMPTS_PER_SLOT
+        )
+        if not candidates:
+            return None
+        # A reserva de horários não conhece o expediente: confere aqui
+        hours = availability_engine.get_day(professional_id, day)
+        for entry_id in candidates:
+            appointment = self._book(entry_id, appointment_time, hours)
+            if appointment is not None:
+                notification_service.send_appointment_confirmation(appointment.id)
+                return appointment
+        return None
+
+    def _book(self, entry_id, appointment_time, hours):
+        entry = db.session.get(WaitlistEntry, entry_id)
+        if entry is None or entry.status != WAITING:
+            self.index.discard(entry_id)
+            return None
+        service = db.session.get(Service, entry.service_id)
+        if service is None or not hours.within_hours(_to_minute(appointment_time), service.duration_minutes):
+            # Passaria do fim do expediente ou invadiria o intervalo: continua na fila
+            return None
+        # Outro worker pode ter atendido a mesma entrada: só um UPDATE a encontra aguardando
+        claimed = db.session.execute(
+            update(WaitlistEntry)
+            .where(WaitlistEntry.id == entry_id, WaitlistEntry.status == WAITING)
+            .values(status=BOOKED, fulfilled_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not claimed:
+            db.session.rollback()
+            self.index.discard(entry_id)
+            return None
+
+        appointment = Appointment(
+            professional_id=entry.professional_id,
+            service_id=entry.service_id,
+            client_name=entry.client_name,
+            client_phone=entry.client_phone,
+            client_email=entry.client_email,
+            client_address=entry.client_address,
+            appointment_date=entry.desired_date,
+            appointment_time=appointment_time,
+            notes=entry.notes
+        )
+        db.session.add(appointment)
+        try:
+            db.session.flush()
+        except SlotUnavailable:
+            # O serviço deste candidato não cabe no horário: continua na fila
+            db.session.rollback()
+            return None
+        db.session.execute(
+            update(WaitlistEntry).where(WaitlistEntry.id == entry_id).values(appointment_id=appointment.id)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        self.index.discard(entry_id)
+        return appointment
+
+
+def _freed_slot(appointment, deleted):
+    """
+    (profissional, dia, horário) que o agendamento ocupava antes do flush, se
+    foi cancelado ou excluído
+    """
+    state = inspect(appointment)
+    values = {}
+    for name in ('professional_id', 'appointment_date', 'appointment_time', 'status'):
+        history = state.attrs[name].history
+        previous = history.deleted or history.unchanged
+        values[name] = previous[0] if previous else getattr(appointment, name)
+    if values['status'] == CANCELLED_STATUS or values['appointment_date'] is None:
+        return None
+    if not deleted and appointment.status != CANCELLED_STATUS:
+        return None
+    return values['professional_id'], values['appointment_date'], values['appointment_time']
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_waitlist_changes(session, flush_context):
+    freed = session.info.setdefault('waitlist_freed', [])
+    entries = session.info.setdefault('waitlist_entries', [])
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Appointment):
+            slot = _freed_slot(obj, obj in session.deleted)
+            if slot is not None:
+                freed.append(slot)
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, WaitlistEntry):
+            active = obj not in session.deleted and obj.status == WAITING
+            entries.append((
+                obj.id, active, obj.professional_id, obj.desired_date, obj.window_start, obj.window_end
+            ))
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_waitlist_changes(session):
+    for entry_id, active, professional_id, day, window_start, window_end in session.info.pop('waitlist_entries', ()):
+        if active:
+            waitlist.index.add(entry_id, professional_id, day, window_start, window_end)
+        else:
+            waitlist.index.discard(entry_id)
+    for slot in session.info.pop('waitlist_freed', ()):
+        waitlist.slot_freed(*slot)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_waitlist_changes(session):
+    session.info.pop('waitlist_freed', None)
+    session.info.pop('waitlist_entries', None)
+
+
+# Instância global da lista de espera
+waitlist = Waitlist(WaitlistIndex.from_env())
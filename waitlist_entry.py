@@ -0,0 +1,59 @@
+from src.models.professional import db
+from datetime import datetime
+
+class WaitlistEntry(db.Model):
+    """
+    Cliente na lista de espera de um dia e faixa de horário de um profissional.
+
+    Quando um agendamento do dia é cancelado, o primeiro da fila cuja faixa
+    contém o horário liberado recebe o agendamento automaticamente
+    (src/services/waitlist.py).
+    """
+    __tablename__ = 'waitlist_entry'
+
+    id = db.Column(db.Integer, primary_key=True)
+    professional_id = db.Column(db.Integer, db.ForeignKey('professional.id'), nullable=False)
+    service_id = db.Column(db.Integer, db.ForeignKey('service.id'), nullable=False)
+
+    # Dados do cliente (os mesmos do agendamento)
+    client_name = db.Column(db.String(100), nullable=False)
+    client_phone = db.Column(db.String(20), nullable=False)
+    client_email = db.Column(db.String(120))
+    client_address = db.Column(db.String(255))
+    notes = db.Column(db.Text)
+
+    # Dia e faixa em que o cliente aceita ser atendido (início do atendimento)
+    desired_date = db.Column(db.Date, nullable=False)
+    window_start = db.Column(db.Time, nullable=False)
+    window_end = db.Column(db.Time, nullable=False)
+
+    status = db.Column(db.String(20), nullable=False, default='aguardando')  # aguardando, agendado, cancelado
+    appointment_id = db.Column(db.Integer, db.ForeignKey('appointment.id'))  # Agendamento criado pela fila
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    fulfilled_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index('ix_waitlist_entry_professional_date_status', 'professional_id', 'desired_date', 'status'),
+    )
+
+    def __repr__(self):
+        return f'<WaitlistEntry {self.client_name} - {self.desired_date} {self.window_start}-{self.window_end}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'professional_id': self.professional_id,
+            'service_id': self.service_id,
+            'client_name': self.client_name,
+            'client_phone': self.client_phone,
+            'client_email': self.client_email,
+            'client_address': self.client_address,
+            'notes': self.notes,
+            'desired_date': self.desired_date.isoformat() if self.desired_date else None,
+            'window_start': self.window_start.strftime('%H:%M') if self.window_start else None,
+            'window_end': self.window_end.strftime('%H:%M') if self.window_end else None,
+            'status': self.status,
+            'appointment_id': self.appointment_id,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'fulfilled_at': self.fulfilled_at.isoformat() if self.fulfilled_at else None
+        }
@@ -0,0 +1,115 @@
+import os
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class WebhookClient:
+    """
+    Cliente HTTP com pool de conexões persistentes (keep-alive) para os
+    webhooks do n8n / Evolution API.
+
+    Uma única `requests.Session` é compartilhada pelos workers de
+    notificação, de modo que a conexão TCP/TLS é reaproveitada entre
+    mensagens em vez de aberta a cada envio.
+    """
+
+    def __init__(self, pool_connections=4, pool_maxsize=10, connect_timeout=3.05,
+                 read_timeout=10, max_retries=2, backoff_factor=0.2):
+        self.timeout = (connect_timeout, read_timeout)
+        # POST não é idempotente: só repete quando a conexão nem chegou a ser
+        # estabelecida (ou em leituras com GET/HEAD), nunca após o envio do corpo
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=max_retries,
+            status=0,
+            other=0,
+            allowed_methods=frozenset(['GET', 'HEAD', 'OPTIONS']),
+            backoff_factor=backoff_factor,
+            raise_on_status=False
+        )
+        self.adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=retry,
+            pool_block=False
+        )
+        self.session = requests.Session()
+        self.session.headers['Connection'] = 'keep-alive'
+        self.session.mount('http://', self.adapter)
+        self.session.mount('https://', self.adapter)
+
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._requests = 0
+        self._failures = 0
+
+    @classmethod
+    def from_env(cls):
+        """
+        Cria o cliente a partir das variáveis WEBHOOK_* do ambiente
+        """
+        return cls(
+            pool_maxsize=int(os.environ.get('WEBHOOK_POOL_SIZE', 10)),
+            connect_timeout=float(os.environ.get('WEBHOOK_CONNECT_TIMEOUT', 3.05)),
+            read_timeout=float(os.environ.get('WEBHOOK_READ_TIMEOUT', 10)),
+            max_retries=int(os.environ.get('WEBHOOK_MAX_RETRIES', 2))
+        )
+
+    def post(self, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        with self._lock:
+            self._in_flight += 1
+            self._requests += 1
+        try:
+            return self.session.post(url, **kwargs)
+        except requests.RequestException:
+            with self._lock:
+                self._failures += 1
+            raise
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def stats(self):
+        """
+        Estatísticas do pool: requisições, conexões abertas e taxa de reaproveitamento
+        """
+        # Cada pool do urllib3 conta as conexões novas e as requisições feitas;
+        # o PoolManager é lido pela interface de mapeamento, sem atributos privados
+        manager_pools = self.adapter.poolmanager.pools
+        pools = [pool for pool in map(manager_pools.get, list(manager_pools.keys())) if pool is not None]
+        connections_opened = sum(pool.num_connections for pool in pools)
+        pool_requests = sum(pool.num_requests for pool in pools)
+        with self._lock:
+            stats = {
+                'requests': self._requests,
+                'failures': self._failures,
+                'in_flight': self._in_flight
+            }
+        stats.update({
+            'hosts': len(pools),
+            'connections_opened': connections_opened,
+            'reuse_rate': round(1 - connections_opened / pool_requests, 4) if pool_requests else 0.0
+        })
+        idle = self._idle_connections(pools)
+        if idle is not None:
+            stats['idle_connections'] = idle
+        return stats
+
+    @staticmethod
+    def _idle_connections(pools):
+        # A fila de conexões ociosas não é interface pública do urllib3: se mudar,
+        # a estatística é omitida em vez de quebrar /metrics e os scripts
+        idle = 0
+        for pool in pools:
+            queue = getattr(getattr(pool, 'pool', None), 'queue', None)
+            if queue is None:
+                return None
+            idle += sum(1 for connection in list(queue) if connection is not None)
+        return idle
+
+    def close(self):
+        self.session.close()